@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+RoboEyes Benchmark
+Renders RoboEyes headless for every combination of mood, eye shape,
+cyclops mode and animation, and reports frames/sec, per-frame allocations
+and peak RSS. Results can be saved as a JSON baseline and later compared
+against it, failing (exit code 1) on regressions.
+
+Examples:
+    python benchmark.py --save baseline.json
+    python benchmark.py --compare baseline.json --tolerance 0.15
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+
+# Render without a window or video driver
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+from robo_eyes import RoboEyes
+from utils.clock_utils import SimulationClock
+from utils.display_utils import SurfaceSink
+from utils.moods_utils import DEFAULT, TIRED, SAD, EXCITED, ANGRY
+
+MOODS = {"DEFAULT": DEFAULT, "TIRED": TIRED, "SAD": SAD, "EXCITED": EXCITED, "ANGRY": ANGRY}
+SHAPES = ["round", "square", "pill", "oval", "angry", "squircle", "teardrop"]  # ShapesHandler.valid_shapes
+ANIMATIONS = ["blink", "wink", "laugh", "confused", "flicker", "idle"]
+
+SCREEN_WIDTH = 640
+SCREEN_HEIGHT = 320
+FPS = 60
+
+
+def create_eyes(mood, shape, cyclops, animation, seed):
+    """Create a headless RoboEyes instance set up for one combination"""
+    eyes = RoboEyes()
+    eyes.set_time_source(SimulationClock(frame_time=1.0 / FPS), seed=seed)
+    eyes.begin(SCREEN_WIDTH, SCREEN_HEIGHT, FPS, sink=SurfaceSink())
+
+    eyes.set_width(80, 80)
+    eyes.set_height(80, 80)
+    eyes.set_space_between(40)
+    eyes.eye_l_width_default = 80
+    eyes.eye_r_width_default = 80
+    eyes.eye_l_height_default = 80
+    eyes.eye_r_height_default = 80
+
+    # Mood first, since it picks its own eye shape
+    eyes.set_mood(MOODS[mood])
+    eyes.shapes.set_eye_shape(shape)
+    eyes.set_cyclops(cyclops)
+
+    # Only the animation under test runs
+    eyes.set_auto_blinker(animation == "idle")
+    eyes.set_idle_mode(animation == "idle")
+    if animation == "flicker":
+        eyes.set_h_flicker(True, 3)
+        eyes.set_v_flicker(True, 3)
+    return eyes
+
+
+def render_frame(eyes, animation):
+    """Render one frame, restarting one-shot animations as soon as they end"""
+    if animation == "blink":
+        eyes.blink()
+    elif animation == "wink":
+        eyes.wink(left_eye=True)
+    elif animation == "laugh":
+        eyes.anim_laugh()
+    elif animation == "confused":
+        eyes.anim_confused()
+    eyes.update()
+
+
+def run_combination(mood, shape, cyclops, animation, args):
+    """Benchmark one combination, returns its result dictionary"""
+    eyes = create_eyes(mood, shape, cyclops, animation, args.seed)
+    for _ in range(args.warmup):
+        render_frame(eyes, animation)
+
+    # Timed pass
+    start = time.perf_counter()
+    for _ in range(args.frames):
+        render_frame(eyes, animation)
+    elapsed = time.perf_counter() - start
+
+    # Allocation pass (tracemalloc slows frames down, so it is separate)
+    alloc_bytes = 0
+    alloc_blocks = 0
+    if args.alloc_frames > 0:
+        tracemalloc.start()
+        for _ in range(args.alloc_frames):
+            before_bytes = tracemalloc.get_traced_memory()[0]
+            before_blocks = sys.getallocatedblocks()
+            tracemalloc.reset_peak()
+            render_frame(eyes, animation)
+            alloc_bytes += tracemalloc.get_traced_memory()[1] - before_bytes
+            alloc_blocks += max(0, sys.getallocatedblocks() - before_blocks)
+        tracemalloc.stop()
+        alloc_bytes /= args.alloc_frames
+        alloc_blocks /= args.alloc_frames
+
+    return {
+        'fps': args.frames / elapsed if elapsed > 0 else 0.0,
+        'frame_ms': elapsed / args.frames * 1000.0,
+        'alloc_bytes_per_frame': alloc_bytes,
+        'alloc_blocks_per_frame': alloc_blocks,
+        'peak_rss_kib': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    }
+
+
+def run_benchmark(args):
+    """Run every selected combination and collect the results"""
+    results = {}
+    total = len(args.moods) * len(args.shapes) * 2 * len(args.animations)
+    done = 0
+    for mood in args.moods:
+        for shape in args.shapes:
+            for cyclops in (False, True):
+                for animation in args.animations:
+                    key = f"{mood}/{shape}/{'cyclops' if cyclops else 'two'}/{animation}"
+                    results[key] = run_combination(mood, shape, cyclops, animation, args)
+                    done += 1
+                    if not args.quiet:
+                        r = results[key]
+                        print(f"[{done:3}/{total}] {key:36} {r['fps']:9.1f} fps  "
+                              f"{r['alloc_bytes_per_frame']:9.0f} B/frame")
+
+    fps_values = sorted(r['fps'] for r in results.values())
+    return {
+        'meta': {
+            'frames': args.frames,
+            'warmup': args.warmup,
+            'alloc_frames': args.alloc_frames,
+            'seed': args.seed,
+            'resolution': [SCREEN_WIDTH, SCREEN_HEIGHT],
+            'python': platform.python_version(),
+            'pygame': pygame.version.ver,
+            'machine': platform.machine()
+        },
+        'summary': {
+            'combinations': len(results),
+            'min_fps': fps_values[0] if fps_values else 0.0,
+            'median_fps': fps_values[len(fps_values) // 2] if fps_values else 0.0,
+            'peak_rss_kib': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        },
+        'results': results
+    }
+
+
+def compare(report, baseline, tolerance):
+    """Compare against a baseline, returns a list of regression messages"""
+    regressions = []
+    for key, old in baseline['results'].items():
+        new = report['results'].get(key)
+        if new is None:
+            continue
+        if new['fps'] < old['fps'] * (1.0 - tolerance):
+            regressions.append(f"{key}: {new['fps']:.1f} fps vs baseline {old['fps']:.1f}")
+        # Small absolute slack keeps tiny allocation counts from flapping
+        limit = old['alloc_bytes_per_frame'] * (1.0 + tolerance) + 256
+        if new['alloc_bytes_per_frame'] > limit:
+            regressions.append(f"{key}: {new['alloc_bytes_per_frame']:.0f} B/frame vs baseline "
+                               f"{old['alloc_bytes_per_frame']:.0f}")
+    old_rss = baseline['summary']['peak_rss_kib']
+    new_rss = report['summary']['peak_rss_kib']
+    if new_rss > old_rss * (1.0 + tolerance):
+        regressions.append(f"peak RSS: {new_rss} KiB vs baseline {old_rss} KiB")
+    return regressions
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark RoboEyes rendering headless")
+    parser.add_argument("--frames", type=int, default=300, help="timed frames per combination")
+    parser.add_argument("--warmup", type=int, default=30, help="untimed frames before timing")
+    parser.add_argument("--alloc-frames", type=int, default=30, help="frames traced for allocations (0 disables)")
+    parser.add_argument("--seed", type=int, default=1, help="random seed for reproducible runs")
+    parser.add_argument("--moods", nargs="+", default=list(MOODS), choices=list(MOODS))
+    parser.add_argument("--shapes", nargs="+", default=SHAPES, choices=SHAPES)
+    parser.add_argument("--animations", nargs="+", default=ANIMATIONS, choices=ANIMATIONS)
+    parser.add_argument("--save", metavar="PATH", help="save the results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="compare against a JSON baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression")
+    parser.add_argument("--quiet", action="store_true", help="only print the summary")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    report = run_benchmark(args)
+
+    summary = report['summary']
+    print(f"{summary['combinations']} combinations: min {summary['min_fps']:.1f} fps, "
+          f"median {summary['median_fps']:.1f} fps, peak RSS {summary['peak_rss_kib']} KiB")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved baseline to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} regression(s) against {args.compare}:")
+            for message in regressions:
+                print(f"  {message}")
+            return 1
+        print(f"No regressions against {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
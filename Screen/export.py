@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+RoboEyes Export
+Renders RoboEyes offline (faster than real time, without a window) and
+records every frame as a PNG sequence, a raw RGB stream or a y4m stream.
+
+What the eyes do comes from a script of timed commands, one per line, in
+the command server format (see utils/server_utils.py):
+
+    0.0  set_mood DEFAULT
+    2.5  blink
+    4.0  set_mood SAD; gaze -0.5 0.2
+
+Without a script the eyes run their idle behaviour and change mood now and
+then, the same for every run with the same seed.
+
+Examples:
+    python export.py --seconds 600 --format y4m --output eyes.y4m
+    python export.py --seconds 20 --format png --output frames/
+    python export.py --format rgb --output - | ffmpeg -f rawvideo -pix_fmt rgb24 -s 640x320 -r 60 -i - eyes.mp4
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+# Render without a window or video driver
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from robo_eyes import RoboEyes
+from utils.clock_utils import SimulationClock
+from utils.display_utils import SurfaceSink
+from utils.recorder_utils import FORMATS
+from utils.server_utils import MOOD_NAMES, parse_command, apply_command
+
+# Commands picked from when no script is given
+DEMO_COMMANDS = ["set_mood " + name for name in MOOD_NAMES] + ["laugh", "confused", "wink L", "wink R"]
+DEMO_INTERVAL = 4.0  # seconds between demo commands
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Export RoboEyes animations as frames or video streams")
+    parser.add_argument("--output", required=True, help="output directory (png) or file, - for stdout")
+    parser.add_argument("--format", choices=FORMATS, default="png", help="output format (default: png)")
+    parser.add_argument("--seconds", type=float, default=10.0, help="length of the export (default: 10)")
+    parser.add_argument("--fps", type=int, default=60, help="frames per second (default: 60)")
+    parser.add_argument("--width", type=int, default=640, help="frame width (default: 640)")
+    parser.add_argument("--height", type=int, default=320, help="frame height (default: 320)")
+    parser.add_argument("--script", help="file of timed commands, one '<seconds> <command>' per line")
+    parser.add_argument("--seed", type=int, default=42, help="random seed (default: 42)")
+    parser.add_argument("--quiet", action="store_true", help="only print the summary")
+    return parser.parse_args()
+
+
+def load_script(path):
+    """Read '<seconds> <command>[; <command>...]' lines into a sorted list of (time, name, args)"""
+    events = []
+    with open(path) as f:
+        for number, line in enumerate(f, 1):
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            when, _, commands = line.partition(" ")
+            try:
+                when = float(when)
+            except ValueError:
+                print(f"Warning: Line {number} of {path} does not start with a time")
+                continue
+            for command in commands.split(";"):
+                parsed = parse_command(command)
+                if parsed is None:
+                    print(f"Warning: Invalid command on line {number} of {path}: {command.strip()}")
+                    continue
+                events.append((when, parsed[0], parsed[1]))
+    events.sort(key=lambda event: event[0])
+    return events
+
+
+def demo_script(seconds, seed):
+    """Timed commands for a varied, repeatable demo"""
+    rng = random.Random(seed)
+    events = []
+    when = DEMO_INTERVAL
+    while when < seconds:
+        parsed = parse_command(rng.choice(DEMO_COMMANDS))
+        events.append((when, parsed[0], parsed[1]))
+        when += DEMO_INTERVAL * rng.uniform(0.5, 1.5)
+    return events
+
+
+def export(args):
+    """Render and record the frames, returns the recorder statistics"""
+    events = load_script(args.script) if args.script else demo_script(args.seconds, args.seed)
+
+    eyes = RoboEyes()
+    eyes.set_time_source(SimulationClock(frame_time=1.0 / args.fps), seed=args.seed)
+    if not eyes.begin(args.width, args.height, args.fps, sink=SurfaceSink()):
+        return None
+    eyes.set_manual_control(False)
+    if not eyes.start_recording(args.output, args.format, offline=True):
+        return None
+
+    frames = int(round(args.seconds * args.fps))
+    next_event = 0
+    for frame in range(frames):
+        now = frame / args.fps
+        while next_event < len(events) and events[next_event][0] <= now:
+            _, name, command_args = events[next_event]
+            apply_command(eyes, name, command_args)
+            next_event += 1
+        eyes.update()
+        if not args.quiet and frame % (args.fps * 10) == 0:
+            print(f"{now:.0f}/{args.seconds:.0f} s", file=sys.stderr)
+    return eyes.stop_recording()
+
+
+def main():
+    args = parse_args()
+    start = time.perf_counter()
+    stats = export(args)
+    if stats is None:
+        return 1
+    elapsed = time.perf_counter() - start
+
+    # Keep stdout clean when the frames are streamed there
+    print(f"{stats['written']} frames in {elapsed:.1f} s "
+          f"({args.seconds / elapsed:.1f}x real time), dropped {stats['dropped']}", file=sys.stderr)
+    if stats['error']:
+        print(f"Warning: Recording failed: {stats['error']}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -23,17 +23,8 @@ def main():
         print("Failed to initialize RoboEyes")
         return
     
-    # Configure eye properties
-    eyes.set_width(80, 80)
-    eyes.set_height(80, 80)
+    # Configure eye properties (sizes and spacing already scale with the screen)
     eyes.set_border_radius(20, 20)
-    eyes.set_space_between(40)
-    
-    # Store default values for reset
-    eyes.eye_l_width_default = 80
-    eyes.eye_r_width_default = 80
-    eyes.eye_l_height_default = 80
-    eyes.eye_r_height_default = 80
     
     # Set default mood
     eyes.set_mood(DEFAULT)
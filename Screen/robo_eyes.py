@@ -9,13 +9,28 @@ Python implementation created as a standalone version
 
 import pygame
 import random
-import time
 import math
+import threading
 
 # Import utility modules
 from utils.animations_utils import AnimationsHandler
-from utils.moods_utils import MoodsHandler, DEFAULT, TIRED, SAD, EXCITED, ANGRY
-from utils.shapes_utils import ShapesHandler, N, NE, E, SE, S, SW, W, NW
+from utils.moods_utils import MoodsHandler, DEFAULT, SAD, EXCITED
+from utils.shapes_utils import ShapesHandler, SPRITE_MARGIN
+from utils.gaze_utils import GazeController
+from utils.state_utils import EyeState, FIELDS, SIZE, SIZE_DEFAULT, state_property
+from utils.easing_utils import Interpolator
+from utils.render_utils import DirtyRectTracker
+from utils.display_utils import WindowSink
+from utils.layout_utils import get_layout
+from utils.clock_utils import MonotonicClock, SimulationClock
+from utils.profiler_utils import FrameProfiler
+from utils.server_utils import CommandServer
+from utils.recorder_utils import FrameRecorder
+from utils.scheduler_utils import FrameScheduler
+from utils.command_utils import CommandQueue, render_thread_command
+from utils.sprites_utils import SpriteCache, new_sprite
+from utils.compositor_utils import Compositor
+from utils.background_utils import Background
 
 # Colors
 BLACK = (0, 0, 0)
@@ -29,9 +44,48 @@ class RoboEyes:
         self.screen_height = 320  # Default window height
         self.max_fps = 60  # Default max frame rate
         self.screen = None
+        self.layout = get_layout(self.screen_width, self.screen_height)  # Face geometry in pixels
+        self.sink = None  # Where frames are presented (window, surface, framebuffer...)
         self.clock = None
         self.running = False
         
+        # Simulation time: an injectable clock drives fixed-size update steps
+        self.time_source = MonotonicClock()
+        self.random = random.Random()  # Seedable for exact replays
+        self.sim_step = 1.0 / 60  # Fixed simulation timestep in seconds
+        self.max_sim_steps = 5  # Catch-up limit per frame
+        self.sim_time = self.time_source.now()
+        self.sim_last_time = self.sim_time
+        self.sim_accumulator = 0.0
+        
+        # Dirty-rect rendering: only clear, redraw and present changed regions
+        self.dirty_rect_mode = True
+        self.dirty_rects = None
+        
+        # Setter calls from other threads, applied at the start of each frame
+        self.commands = CommandQueue()
+        
+        # Network command server for external processes (None when not started)
+        self.command_server = None
+        
+        # Per-stage frame timing (None when disabled, so it costs nothing)
+        self.profiler = None
+        
+        # Frame recorder (None when not recording)
+        self.recorder = None
+        
+        # Power saving: lower frame rates and sleeps while the face is idle
+        self.scheduler = FrameScheduler(self)
+        
+        # Pre-rendered mouths keyed by (mood, width, height, curve)
+        self.mouth_cache = SpriteCache(max_entries=32)
+        
+        # Face layers, bottom first; each is only re-rendered when its inputs change
+        self.layers = Compositor(("eye_l", "eye_r", "tear_l", "tear_r", "mouth", "sparkles"))
+        
+        # What the face is drawn on; images and gradients are cached per screen
+        self.background = Background(BLACK)
+        
         # Force default mood on startup
         self.startup_complete = False
         
@@ -40,55 +94,25 @@ class RoboEyes:
         self.moods = None
         self.shapes = None
 
-        # Eye properties
-        self.eye_l_width = 36
-        self.eye_l_height = 36
-        self.eye_l_border_radius = 8
-        self.eye_r_width = 36
-        self.eye_r_height = 36
-        self.eye_r_border_radius = 8
+        # Eye state: sizes, positions and eyelids of both eyes in one record
+        # (see utils.state_utils; RoboEyes forwards the field names to it)
+        self.state = state = EyeState()
+        state.eye_l_width = 36
+        state.eye_l_height = 36
+        state.eye_l_border_radius = 8
+        state.eye_r_width = 36
+        state.eye_r_height = 36
+        state.eye_r_border_radius = 8
         self.space_between = 10
+        self.layout_dirty = False  # Eye sizes changed, recenter before the next frame
 
-        # Current and target values for smooth transitions
-        self.eye_l_width_current = self.eye_l_width
-        self.eye_l_height_current = self.eye_l_height
-        self.eye_l_border_radius_current = self.eye_l_border_radius
-        self.eye_r_width_current = self.eye_r_width
-        self.eye_r_height_current = self.eye_r_height
-        self.eye_r_border_radius_current = self.eye_r_border_radius
-
-        # Default values (used for resetting)
-        self.eye_l_width_default = self.eye_l_width
-        self.eye_l_height_default = self.eye_l_height
-        self.eye_l_border_radius_default = self.eye_l_border_radius
-        self.eye_r_width_default = self.eye_r_width
-        self.eye_r_height_default = self.eye_r_height
-        self.eye_r_border_radius_default = self.eye_r_border_radius
-
-        # Eye positions
-        self.eye_l_x = 0
-        self.eye_l_y = 0
-        self.eye_r_x = 0
-        self.eye_r_y = 0
-
-        # Target positions for smooth transitions
-        self.eye_l_x_next = 0
-        self.eye_l_y_next = 0
-        self.eye_r_x_next = 0
-        self.eye_r_y_next = 0
-
-        # Eyelid properties
-        self.eyelids_closed_height = 0
-        self.eyelids_closed_height_next = 0
-        self.eyelids_tired_height = 0
-        self.eyelids_tired_height_next = 0
-        self.eyelids_angry_height = 0
-        self.eyelids_angry_height_next = 0
-        self.eyelids_happy_bottom_offset = 0
-        self.eyelids_happy_bottom_offset_next = 0
+        state.array[SIZE_DEFAULT] = state.array[SIZE]  # Default values (used for resetting)
+        
+        # Eases every current value towards its target, per-property easing
+        self.interpolator = Interpolator(state)
+        self.interpolator.snap()
 
         # Animation properties - delegated to handlers
-        self.mood = DEFAULT
         self.cyclops = False
         self.curiosity = False
         self.h_flicker = False
@@ -96,14 +120,15 @@ class RoboEyes:
         self.v_flicker = False
         self.v_flicker_amplitude = 0
         self.position = DEFAULT
+        
+        # Continuous gaze (look_at), smoothed towards its target every step
+        self.gaze = GazeController(self)
+        self.gaze_last_look_time = float("-inf")  # Last look_at from outside idle mode
 
         # Animation state - delegated to animations handler
         # (removed duplicate state variables)
         self.is_laughing_mouth = False  # Special state for mouth during laugh animation
         
-        # Eye shape variations
-        self.eye_shape = "square"  # Can be "round", "square", "oval", "teardrop", "pill"
-        
         # Manual eye control with arrow keys (enabled by default)
         self.manual_control = True
         self.manual_x_offset = 0
@@ -114,28 +139,53 @@ class RoboEyes:
         self.manual_velocity_accel = 0.5  # Acceleration factor
         self.manual_velocity_decel = 0.9  # Deceleration factor (friction)
         self.manual_offset_max = 50  # Maximum pixel offset for manual control
-        self.last_key_press_time = time.time()
+        self.last_key_press_time = self.sim_time
         self.auto_center_delay = 5.0  # Seconds of inactivity before auto-centering
-        
-        # Initialize eyelid properties
-        self.eyelids_closed_height = 0
-        self.eyelids_closed_height_next = 0
-        self.eyelids_tired_height = 0
-        self.eyelids_tired_height_next = 0
-        
 
+    @property
+    def mood(self):
+        """Current mood (owned by the moods handler)"""
+        return self.moods.current_mood if self.moods is not None else DEFAULT
 
-    def begin(self, screen_width, screen_height, max_fps=60):
-        """Initialize the RoboEyes with screen dimensions and frame rate"""
+    @property
+    def eye_shape(self):
+        """Current eye shape (owned by the shapes handler)"""
+        return self.shapes.eye_shape if self.shapes is not None else "square"
+
+    def begin(self, screen_width, screen_height, max_fps=60, sink=None):
+        """Initialize the RoboEyes with screen dimensions, frame rate and display sink
+        
+        sink is one of the sinks from utils.display_utils (WindowSink,
+        SurfaceSink, FramebufferSink, ArraySink); defaults to a pygame window.
+        """
         self.screen_width = screen_width
         self.screen_height = screen_height
         self.max_fps = max_fps
+        if self.profiler is not None:
+            self.profiler.frame_budget = 1.0 / max_fps
         
         # Initialize pygame
         pygame.init()
-        self.screen = pygame.display.set_mode((screen_width, screen_height))
-        pygame.display.set_caption("RoboEyes Python")
+        self.sink = sink if sink is not None else WindowSink()
+        self.screen = self.sink.open(screen_width, screen_height)
+        if self.screen is None:
+            print("Warning: Display sink could not be opened")
+            return False
         self.clock = pygame.time.Clock()
+        self.commands.render_thread = threading.get_ident()
+        self.dirty_rects = DirtyRectTracker(self.screen.get_rect())
+        self.background.invalidate()
+        
+        # Size the face for this screen (set_width() etc. can change it after begin())
+        self.layout = layout = get_layout(screen_width, screen_height)
+        self.state.eye_l_width = self.state.eye_l_height = layout.eye_size
+        self.state.eye_r_width = self.state.eye_r_height = layout.eye_size
+        self.state.array[SIZE_DEFAULT] = self.state.array[SIZE]
+        self.space_between = layout.space_between
+        self.manual_offset_max = layout.manual_offset_max
+        
+        # Start the simulation at the clock's current time
+        self._reset_simulation_time()
         
         # Initialize utility handlers
         self.animations = AnimationsHandler(self)
@@ -149,11 +199,15 @@ class RoboEyes:
         self.shapes.set_eye_shape("square")
         
         # Add some size variability between eyes
-        self.eye_r_width = int(self.eye_r_width * 0.95)  # Right eye slightly narrower
-        self.eye_r_height = int(self.eye_r_height * 1.05)  # Right eye slightly taller
+        self.state.eye_r_width = int(self.state.eye_r_width * 0.95)  # Right eye slightly narrower
+        self.state.eye_r_height = int(self.state.eye_r_height * 1.05)  # Right eye slightly taller
         
         # Force default mood on startup
         self.moods.set_mood(DEFAULT)
+        self._calculate_eye_positions()
+        
+        # Start without easing in from the initial values
+        self.interpolator.snap()
         
         self.running = True
         self.startup_complete = True
@@ -163,35 +217,40 @@ class RoboEyes:
         """Calculate the eye positions based on screen size and eye properties"""
         if self.cyclops:
             # Cyclops mode: single centered eye using left eye properties
-            self.eye_l_x = (self.screen_width - self.eye_l_width) // 2
-            self.eye_l_y = (self.screen_height - self.eye_l_height) // 2
+            self.state.eye_l_x = (self.screen_width - self.state.eye_l_width) // 2
+            self.state.eye_l_y = (self.screen_height - self.state.eye_l_height) // 2
             # Right eye is not used in cyclops mode
-            self.eye_r_x = -1000  # Off-screen
-            self.eye_r_y = -1000  # Off-screen
+            self.state.eye_r_x = -1000  # Off-screen
+            self.state.eye_r_y = -1000  # Off-screen
         else:
             # Normal mode: two eyes side by side
-            total_width = self.eye_l_width + self.eye_r_width + self.space_between
-            self.eye_l_x = (self.screen_width - total_width) // 2
-            self.eye_l_y = (self.screen_height - self.eye_l_height) // 2
-            self.eye_r_x = self.eye_l_x + self.eye_l_width + self.space_between
-            self.eye_r_y = (self.screen_height - self.eye_r_height) // 2
-        
-        self.eye_l_x_next = self.eye_l_x
-        self.eye_l_y_next = self.eye_l_y
-        self.eye_r_x_next = self.eye_r_x
-        self.eye_r_y_next = self.eye_r_y
+            total_width = self.state.eye_l_width + self.state.eye_r_width + self.space_between
+            self.state.eye_l_x = (self.screen_width - total_width) // 2
+            self.state.eye_l_y = (self.screen_height - self.state.eye_l_height) // 2
+            self.state.eye_r_x = self.state.eye_l_x + self.state.eye_l_width + self.space_between
+            self.state.eye_r_y = (self.screen_height - self.state.eye_r_height) // 2
+        
+        self.state.eye_l_x_next = self.state.eye_l_x
+        self.state.eye_l_y_next = self.state.eye_l_y
+        self.state.eye_r_x_next = self.state.eye_r_x
+        self.state.eye_r_y_next = self.state.eye_r_y
+        self.layout_dirty = False
 
     def update(self):
         """Update eyes drawings with frame rate limitation"""
         if not self.running:
             return False
+        
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.begin_frame()
             
-        # Handle pygame events
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                self.running = False
-                pygame.quit()
-                return False
+        # Handle pygame events (only windows deliver them)
+        if self.sink.interactive:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    self.quit()
+                    return False
                 
         # Force default mood on first frame
         if not self.startup_complete:
@@ -199,16 +258,115 @@ class RoboEyes:
             self.startup_complete = True
         
         # Handle arrow key input for manual eye control with velocity
-        keys = pygame.key.get_pressed()
-        key_pressed = keys[pygame.K_UP] or keys[pygame.K_DOWN] or keys[pygame.K_LEFT] or keys[pygame.K_RIGHT]
+        if self.sink.interactive:
+            keys = pygame.key.get_pressed()
+            key_up = keys[pygame.K_UP]
+            key_down = keys[pygame.K_DOWN]
+            key_left = keys[pygame.K_LEFT]
+            key_right = keys[pygame.K_RIGHT]
+        else:
+            key_up = key_down = key_left = key_right = False
+        
+        # Apply setter calls queued by other threads since the last frame
+        self.commands.render_thread = threading.get_ident()
+        self.commands.apply_pending()
+        
+        # Apply commands that external processes sent since the last frame
+        if self.command_server is not None:
+            self.command_server.poll()
+        
+        # However many sizes changed since the last frame, recenter only once
+        if self.layout_dirty:
+            self._calculate_eye_positions()
+        if profiler is not None:
+            profiler.lap("events")
+        
+        # Advance the simulation in fixed steps, independent of the frame rate
+        if not self.time_source.realtime:
+            self.time_source.advance_frame()
+        now = self.time_source.now()
+        self.sim_accumulator += now - self.sim_last_time
+        self.sim_last_time = now
+        steps = 0
+        while self.sim_accumulator >= self.sim_step - 1e-9:  # Tolerate float drift
+            self.sim_time += self.sim_step
+            self.sim_accumulator -= self.sim_step
+            self._step_simulation(key_up, key_down, key_left, key_right)
+            steps += 1
+            if steps >= self.max_sim_steps:
+                # Too far behind (e.g. after a stall): drop the backlog
+                self.sim_accumulator = 0.0
+                break
+        
+        # Clear the screen (dirty-rect mode only restores what the face covered)
+        if not self.dirty_rect_mode:
+            self.background.restore(self.screen)
+        
+        # Draw the eyes
+        self._draw_eyes()
+        
+        # Draw the profiler overlay on top of everything
+        overlay_changed = False
+        if profiler is not None and profiler.overlay:
+            overlay_changed = profiler.draw_overlay(self.screen, self.background)
+        
+        # Update display
+        if not self.dirty_rect_mode:
+            self.sink.present()
+        elif self.dirty_rects.changed:
+            rects = self.dirty_rects.update_rects
+            if overlay_changed:
+                rects = rects + [profiler.overlay_rect]
+            self.sink.present(rects)
+        elif overlay_changed:
+            self.sink.present([profiler.overlay_rect])
+        elif getattr(self.sink, "behind", False):
+            # A slow display skipped frames, let it catch up
+            self.sink.present([])
+        # Else: nothing changed, skip the present entirely
+        
+        # Record every frame, unchanged ones too, so videos keep their timing
+        if self.recorder is not None:
+            changed = not self.dirty_rect_mode or self.dirty_rects.changed or overlay_changed
+            self.recorder.capture(self.screen, changed)
+        if profiler is not None:
+            profiler.lap("present")
+        
+        # Limit frame rate (simulated clocks render as fast as possible)
+        if self.time_source.realtime:
+            if self.scheduler.enabled:
+                self.scheduler.wait()
+            else:
+                self.clock.tick(self.max_fps)
+        if profiler is not None:
+            profiler.lap("tick")
+            profiler.end_frame()
+        
+        return True
+
+    def _step_simulation(self, key_up, key_down, key_left, key_right):
+        """Advance manual control, animations and smoothing by one fixed step"""
+        profiler = self.profiler
+        self._update_manual_control(key_up, key_down, key_left, key_right)
+        if profiler is not None:
+            profiler.lap("manual_control")
+        self._update_animations()
+        self.moods.update_transition(self.sim_time)
+        self.gaze.step(self.sim_step)
         
-        if key_pressed:
+        # Ease all sizes, positions and eyelids towards their targets at once
+        self.interpolator.step(self.sim_step)
+        if profiler is not None:
+            profiler.lap("animations")
+
+    def _update_manual_control(self, key_up, key_down, key_left, key_right):
+        """Move the manual control offsets with velocity and friction"""
+        if key_up or key_down or key_left or key_right:
             # Update last key press time when any arrow key is pressed
-            self.last_key_press_time = time.time()
+            self.last_key_press_time = self.sim_time
         
         # Check if we should auto-center due to inactivity
-        current_time = time.time()
-        if current_time - self.last_key_press_time > self.auto_center_delay:
+        if self.sim_time - self.last_key_press_time > self.auto_center_delay:
             # Gradually move back to center
             self.manual_x_offset *= 0.95
             self.manual_y_offset *= 0.95
@@ -220,13 +378,13 @@ class RoboEyes:
                 self.manual_y_offset = 0
         
         # Apply acceleration based on arrow keys
-        if keys[pygame.K_UP]:
+        if key_up:
             self.manual_y_velocity -= self.manual_velocity_accel
-        if keys[pygame.K_DOWN]:
+        if key_down:
             self.manual_y_velocity += self.manual_velocity_accel
-        if keys[pygame.K_LEFT]:
+        if key_left:
             self.manual_x_velocity -= self.manual_velocity_accel
-        if keys[pygame.K_RIGHT]:
+        if key_right:
             self.manual_x_velocity += self.manual_velocity_accel
             
         # Apply velocity limits
@@ -234,9 +392,9 @@ class RoboEyes:
         self.manual_y_velocity = max(-self.manual_velocity_max, min(self.manual_velocity_max, self.manual_y_velocity))
         
         # Apply deceleration (friction) when no keys are pressed
-        if not (keys[pygame.K_LEFT] or keys[pygame.K_RIGHT]):
+        if not (key_left or key_right):
             self.manual_x_velocity *= self.manual_velocity_decel
-        if not (keys[pygame.K_UP] or keys[pygame.K_DOWN]):
+        if not (key_up or key_down):
             self.manual_y_velocity *= self.manual_velocity_decel
             
         # Apply velocity to position
@@ -252,200 +410,223 @@ class RoboEyes:
             self.manual_x_velocity = 0
         if abs(self.manual_y_velocity) < 0.1:
             self.manual_y_velocity = 0
-        
-        # Clear the screen
-        self.screen.fill(BLACK)
-        
-        # Update animations
-        self._update_animations()
-        
-        # Draw the eyes
-        self._draw_eyes()
-        
-        # Update display
-        pygame.display.flip()
-        
-        # Limit frame rate
-        self.clock.tick(self.max_fps)
-        
-        return True
 
     def _update_animations(self):
         """Update all active animations"""
-        current_time = time.time()
-        
         # Use the animations handler to update all animations
-        self.animations.update_animations(current_time)
+        self.animations.update_animations(self.sim_time)
         
         # Update flicker (keeping this in main class for now)
         if self.h_flicker:
-            offset = random.randint(-self.h_flicker_amplitude, self.h_flicker_amplitude)
-            self.eye_l_x_next = self.eye_l_x + offset
-            self.eye_r_x_next = self.eye_r_x + offset
+            offset = self.random.randint(-self.h_flicker_amplitude, self.h_flicker_amplitude)
+            self.state.eye_l_x_next = self.state.eye_l_x + offset
+            self.state.eye_r_x_next = self.state.eye_r_x + offset
         
         if self.v_flicker:
-            offset = random.randint(-self.v_flicker_amplitude, self.v_flicker_amplitude)
-            self.eye_l_y_next = self.eye_l_y + offset
-            self.eye_r_y_next = self.eye_r_y + offset
+            offset = self.random.randint(-self.v_flicker_amplitude, self.v_flicker_amplitude)
+            self.state.eye_l_y_next = self.state.eye_l_y + offset
+            self.state.eye_r_y_next = self.state.eye_r_y + offset
 
-    def _draw_eyes(self):
-        """Draw the eyes with current properties"""
-        # Smooth transitions for all properties
-        self.eye_l_width_current = (self.eye_l_width_current + self.eye_l_width) / 2
-        self.eye_l_height_current = (self.eye_l_height_current + self.eye_l_height) / 2
-        self.eye_l_border_radius_current = (self.eye_l_border_radius_current + self.eye_l_border_radius) / 2
-        self.eye_r_width_current = (self.eye_r_width_current + self.eye_r_width) / 2
-        self.eye_r_height_current = (self.eye_r_height_current + self.eye_r_height) / 2
-        self.eye_r_border_radius_current = (self.eye_r_border_radius_current + self.eye_r_border_radius) / 2
-        
-        # Smooth transitions for positions
-        eye_l_x_current = (self.eye_l_x + self.eye_l_x_next) / 2
-        eye_l_y_current = (self.eye_l_y + self.eye_l_y_next) / 2
-        eye_r_x_current = (self.eye_r_x + self.eye_r_x_next) / 2
-        eye_r_y_current = (self.eye_r_y + self.eye_r_y_next) / 2
-        
-        # Apply manual control offsets if enabled
+    def _eye_geometry(self):
+        """Integer x, y, width and height of both eyes for this frame
+        
+        Computed once per frame and handed to every handler, in the order
+        (eye_l_x, eye_l_y, eye_r_x, eye_r_y, eye_l_width, eye_l_height,
+        eye_r_width, eye_r_height).
+        """
+        state = self.state
+        gaze_l_x, gaze_l_y, gaze_r_x, gaze_r_y, left_height_scale, right_height_scale = self.gaze.offsets
+        # Keyframed animations shake and scale the eyes on top of everything
+        animations = self.animations
+        offset_x = animations.offset_x
+        offset_y = animations.offset_y
+        scale = animations.size_scale
         if self.manual_control:
-            eye_l_x_current += self.manual_x_offset
-            eye_l_y_current += self.manual_y_offset
-            eye_r_x_current += self.manual_x_offset
-            eye_r_y_current += self.manual_y_offset
-        
-        # Use the shapes handler to draw the eyes
-        self.shapes.draw_eyes(
-            self.screen,
-            eye_l_x_current, eye_l_y_current,
-            eye_r_x_current, eye_r_y_current,
-            self.eye_l_width_current, self.eye_l_height_current,
-            self.eye_r_width_current, self.eye_r_height_current,
-            CYAN
+            offset_x += self.manual_x_offset
+            offset_y += self.manual_y_offset
+        return (
+            int(state.eye_l_x_current + gaze_l_x + offset_x),
+            int(state.eye_l_y_current + gaze_l_y + offset_y),
+            int(state.eye_r_x_current + gaze_r_x + offset_x),
+            int(state.eye_r_y_current + gaze_r_y + offset_y),
+            # Curiosity stretches the eye on the side the gaze points to
+            int(state.eye_l_width_current * scale),
+            int(state.eye_l_height_current * scale * left_height_scale),
+            int(state.eye_r_width_current * scale),
+            int(state.eye_r_height_current * scale * right_height_scale)
         )
+
+    def _draw_eyes(self):
+        """Update the face layers that changed and composite them onto the screen"""
+        geometry = self._eye_geometry()
+        eye_l_x, eye_l_y, eye_r_x, eye_r_y, eye_l_width, eye_l_height, eye_r_width, eye_r_height = geometry
         
-        # Use the animations handler to draw eyelids for blinking/winking
-        self.animations.draw_eyelids(
-            self.screen,
-            eye_l_x_current, eye_l_y_current,
-            eye_r_x_current, eye_r_y_current,
-            self.eye_l_width_current, self.eye_l_height_current,
-            self.eye_r_width_current, self.eye_r_height_current
-        )
+        profiler = self.profiler
+        layers = self.layers
+        mood = self.moods.current_mood
         
-        # Use the moods handler to draw mood-specific elements
-        self.moods.draw_mood_elements(
-            self.screen,
-            eye_l_x_current, eye_l_y_current,
-            eye_r_x_current, eye_r_y_current,
-            self.eye_l_width_current, self.eye_l_height_current,
-            self.eye_r_width_current, self.eye_r_height_current
-        )
+        # Each eye is a cached sprite from the shapes handler, clipped to the
+        # rows its eyelids leave open
+        self._update_eye_layer("eye_l", eye_l_x, eye_l_y, eye_l_width, eye_l_height, True)
+        self._update_eye_layer("eye_r", eye_r_x, eye_r_y, eye_r_width, eye_r_height, False)
+        if profiler is not None:
+            profiler.lap("draw_eyes")
         
         # Draw tears for SAD mood
-        self.moods.draw_tears(
-            self.screen,
-            eye_l_x_current, eye_l_y_current,
-            eye_r_x_current, eye_r_y_current,
-            self.eye_l_width_current, self.eye_l_height_current,
-            self.eye_r_width_current, self.eye_r_height_current
-        )
+        # A tear only depends on the layout, so each is rendered once and
+        # gaze only moves it
+        if mood == SAD:
+            layout = self.layout
+            pad = max(layout.tear_radius, layout.tear_glow) + 1
+            size = (2 * pad, 2 * pad)
+            tear_y = layout.tear_gap - pad
+            layers.update("tear_l", layout, (eye_l_x + eye_l_width // 2 - pad, eye_l_y + eye_l_height + tear_y),
+                          size, self.moods.draw_tear, pad, pad)
+            layers.update("tear_r", layout, (eye_r_x + eye_r_width // 2 - pad, eye_r_y + eye_r_height + tear_y),
+                          size, self.moods.draw_tear, pad, pad)
+        else:
+            layers.hide("tear_l")
+            layers.hide("tear_r")
+        if profiler is not None:
+            profiler.lap("tears")
+        
+        # The mouth goes on top of all other elements so it's visible
+        self._update_mouth_layers(self._mouth_geometry(geometry))
+        if profiler is not None:
+            profiler.lap("mouth")
+        
+        # In dirty-rect mode, skip unchanged frames and restore only old regions
+        if self.dirty_rect_mode:
+            if not self.dirty_rects.begin_frame(layers.signature(), layers.rects):
+                return
+            for rect in self.dirty_rects.clear_rects:
+                self.background.restore(self.screen, rect)
+        layers.composite(self.screen)
+        if profiler is not None:
+            profiler.lap("composite")
+
+    def _update_eye_layer(self, name, x, y, width, height, is_left_eye):
+        """Show one eye, leaving out what blinking, winking or tired eyelids cover"""
+        if width <= 0 or height <= 0 or (self.cyclops and not is_left_eye):
+            self.layers.set_sprite(name, None, None, None)
+            return
+        # Blinks close the eye from the top and the bottom; tired eyelids
+        # cover the top, whatever the eye heights
+        bottom = self.animations.get_closed_height(is_left_eye)
+        top = max(bottom, self.moods.get_tired_height())
+        area = self.shapes.get_eye_area(width, height, top, bottom)
+        if area is not None and area.height == 0:
+            self.layers.set_sprite(name, None, None, None)
+            return
+        sprite = self.shapes.get_fade_sprite(width, height, CYAN, is_left_eye)
+        origin = (x - SPRITE_MARGIN, y - SPRITE_MARGIN + (area.top if area is not None else 0))
+        self.layers.set_sprite(name, sprite, origin, sprite, area)
+
+    def _mouth_geometry(self, geometry):
+        """Calculate mouth position, size and curve for the current mood"""
+        eye_l_x, eye_l_y, eye_r_x, eye_r_y, eye_l_width, eye_l_height, eye_r_width, eye_r_height = geometry
         
-        # Draw tired eyelids if in TIRED mood
-        if self.mood == TIRED and self.eyelids_tired_height > 0:
-            # Left eye (or single eye in cyclops mode)
-            pygame.draw.rect(
-                self.screen,
-                BLACK,
-                (
-                    eye_l_x_current,
-                    eye_l_y_current,
-                    self.eye_l_width_current,
-                    self.eyelids_tired_height
-                ),
-                0
-            )
-            
-            # Right eye (if not in cyclops mode)
-            if not self.cyclops:
-                pygame.draw.rect(
-                    self.screen,
-                    BLACK,
-                    (
-                        eye_r_x_current,
-                        eye_r_y_current,
-                        self.eye_r_width_current,
-                        self.eyelids_tired_height
-                    ),
-                    0
-                )
-        
-        # Draw the mouth AFTER all other elements so it's visible
-        self._draw_mouth(eye_l_x_current, eye_l_y_current, eye_r_x_current, eye_r_y_current)
-
-    def _draw_mouth(self, eye_l_x_current, eye_l_y_current, eye_r_x_current, eye_r_y_current):
-        """Draw a D-shaped mouth below the eyes with unique expressions for each mood"""
         # Calculate mouth position - perfectly centered below the eyes, positioned lower
         # Use the center point between both eyes for perfect centering
-        left_eye_center_x = eye_l_x_current + self.eye_l_width_current / 2
-        right_eye_center_x = eye_r_x_current + self.eye_r_width_current / 2
+        left_eye_center_x = eye_l_x + eye_l_width / 2
+        right_eye_center_x = eye_r_x + eye_r_width / 2
         mouth_x = (left_eye_center_x + right_eye_center_x) / 2
-        mouth_y = max(eye_l_y_current, eye_r_y_current) + 100  # Position lower for better centering
+        mouth_y = max(eye_l_y, eye_r_y) + self.layout.mouth_gap  # Position lower for better centering
         
         # Special case: laughing mouth (overrides all other moods)
         if self.is_laughing_mouth:
             # Extra wide, animated laughing smile with teeth
-            mouth_width = 75  # Extra wide for big laugh
-            mouth_height = 18  # Extra tall for big smile
-            mouth_y += 0  # Position higher for excited look
-            # Draw the main D-shaped laughing mouth with teeth
-            self._draw_laughing_d_mouth(mouth_x, mouth_y, mouth_width, mouth_height)
-            return
+            mouth_width = self.layout.laugh_mouth_width  # Extra wide for big laugh
+            mouth_height = self.layout.laugh_mouth_height  # Extra tall for big smile
+            return self._animate_mouth((mouth_x, mouth_y, mouth_width, mouth_height, 0.0, True))
+        
+        # Mood-specific size, curve and offset (blended during mood transitions)
+        mouth_width, mouth_height, mouth_curve, mouth_y_offset = self.moods.get_mouth()
+        mouth_y += mouth_y_offset
+        
+        return self._animate_mouth((mouth_x, mouth_y, mouth_width, mouth_height, mouth_curve, False))
+
+    def _animate_mouth(self, mouth):
+        """Apply the keyframed mouth offset, scale and curve to a mood's mouth"""
+        animations = self.animations
+        if (animations.mouth_offset_x == 0.0 and animations.mouth_offset_y == 0.0
+                and animations.mouth_scale == 1.0 and animations.mouth_curve == 0.0):
+            return mouth
+        mouth_x, mouth_y, mouth_width, mouth_height, mouth_curve, laughing = mouth
+        scale = animations.mouth_scale
+        # Curves are rounded so the mouth sprite cache stays small
+        return (
+            mouth_x + animations.mouth_offset_x,
+            mouth_y + animations.mouth_offset_y,
+            max(1, int(mouth_width * scale)),
+            max(1, int(mouth_height * scale)),
+            round(max(-1.0, min(1.0, mouth_curve + animations.mouth_curve)), 1),
+            laughing
+        )
+
+    def _update_mouth_layers(self, mouth):
+        """Show a D-shaped mouth below the eyes with unique expressions for each mood"""
+        mouth_x, mouth_y, mouth_width, mouth_height, mouth_curve, laughing = mouth
+        
+        # The mouth and its glow come from a cached sprite
+        mood = "laugh" if laughing else self.moods.get_current_mood()
+        key = (mood, mouth_width, mouth_height, mouth_curve)
+        sprite = self.mouth_cache.get(
+            key, self._render_mouth_sprite, mouth_width, mouth_height, mouth_curve, laughing
+        )
+        pad = self._mouth_glow(mouth_curve, laughing)[0]
+        origin = (int(mouth_x) - mouth_width // 2 - pad, int(mouth_y) - pad)
+        self.layers.set_sprite("mouth", key, origin, sprite)
+        
+        # Only the rotating sparkles of the laughing mouth change every step;
+        # they stay inside the mouth's region
+        self.layers.draw(
+            "sparkles", self.sim_time if laughing else None, (),
+            self._draw_laugh_sparkles, mouth_x, mouth_y, mouth_width, mouth_height
+        )
+
+    def _mouth_glow(self, curve, laughing):
+        """Glow box around the mouth as (padding, extra width/height, alpha)"""
+        if laughing:
+            return (7, 15, 35)  # Slightly more visible glow for laughing
+        if curve == 0:
+            return (4, 8, 25)
+        return (5, 10, 25)
+
+    def _render_mouth_sprite(self, width, height, curve, laughing):
+        """Rasterize a mouth with its glow baked into a translucent sprite"""
+        pad, extra, alpha = self._mouth_glow(curve, laughing)
+        size = (width + extra, height + extra)
+        x = pad + width // 2
+        y = pad
+        
+        # Mouth shape alone on a transparent layer
+        shape = pygame.Surface(size, pygame.SRCALPHA)
+        if laughing:
+            self._draw_laughing_d_mouth(shape, x, y, width, height)
+        else:
+            self._draw_d_shaped_mouth(shape, x, y, width, height, curve)
+        
+        # Mouth colors as they look once the glow is blended over them
+        flat = pygame.Surface(size, pygame.SRCALPHA)
+        flat.fill(BLACK)
+        flat.blit(shape, (0, 0))
+        glow_surface = pygame.Surface(size)
+        glow_surface.set_alpha(alpha)
+        glow_surface.fill(CYAN)
+        flat.blit(glow_surface, (0, 0))
         
-        # Get current mood for mouth expression
-        current_mood = self.moods.get_current_mood()
-        
-        # Base mouth properties - increased sizes for all moods
-        mouth_width = 50  # Increased from 40
-        mouth_height = 10  # Increased from 8
-        
-        # Mood-specific mouth properties - all bigger now
-        if current_mood == TIRED:
-            # Tired: Medium, slightly downturned D
-            mouth_width = 42  # Increased from 32
-            mouth_height = 8   # Increased from 6
-            mouth_y += 5  # Even lower for tired look
-            mouth_curve = -0.4  # More downturn
-        elif current_mood == SAD:
-            # Sad: Medium, downturned D
-            mouth_width = 38   # Increased from 28
-            mouth_height = 7   # Increased from 5
-            mouth_y += 8  # Much lower for sad look
-            mouth_curve = -0.8  # Strong downturn
-        elif current_mood == EXCITED:
-            # Excited: Wide, upturned D (happy smile)
-            mouth_width = 58   # Increased from 48
-            mouth_height = 14  # Increased from 12
-            mouth_y += 2  # Slightly lower but still happy
-            mouth_curve = 0.6  # Strong upturn for smile
-        elif current_mood == ANGRY:
-            # Angry: Large, strongly downturned D
-            mouth_width = 46   # Increased from 36
-            mouth_height = 9   # Increased from 7
-            mouth_y += 10  # Much lower for angry look
-            mouth_curve = -1.0  # Strongest downturn
-        else:  # DEFAULT
-            # Default: Balanced D with slight smile
-            mouth_width = 50   # Increased from 40
-            mouth_height = 10  # Increased from 8
-            mouth_y += 3  # Slightly lower
-            mouth_curve = 0.2  # Slight upturn for friendly look
-        
-        # Draw the D-shaped mouth
-        self._draw_d_shaped_mouth(mouth_x, mouth_y, mouth_width, mouth_height, mouth_curve)
+        # Mouth pixels are opaque, everywhere else only the translucent glow
+        sprite = new_sprite(size[0], size[1])
+        sprite.fill((CYAN[0], CYAN[1], CYAN[2], alpha))
+        pygame.mask.from_surface(shape).to_surface(sprite, setsurface=flat, unsetcolor=None)
+        return sprite
     
-    def _draw_laughing_d_mouth(self, x, y, width, height):
+    def _draw_laughing_d_mouth(self, surface, x, y, width, height):
         """Draw a special laughing D-shaped mouth with wide smile and teeth segments"""
         # Main mouth body (extra wide rectangle for laughing)
         pygame.draw.rect(
-            self.screen,
+            surface,
             CYAN,
             (
                 x - width // 2,
@@ -460,14 +641,14 @@ class RoboEyes:
         corner_radius = 6  # Larger corners for bigger mouth
         # Left corner
         pygame.draw.circle(
-            self.screen,
+            surface,
             CYAN,
             (x - width // 2 + corner_radius, y + height // 2),
             corner_radius
         )
         # Right corner
         pygame.draw.circle(
-            self.screen,
+            surface,
             CYAN,
             (x + width // 2 - corner_radius, y + height // 2),
             corner_radius
@@ -477,7 +658,7 @@ class RoboEyes:
         smile_width = width - 6
         smile_height = 10  # Taller smile curve
         pygame.draw.ellipse(
-            self.screen,
+            surface,
             CYAN,
             (
                 x - smile_width // 2,
@@ -494,7 +675,7 @@ class RoboEyes:
         for i in range(1, num_teeth):
             tooth_x = x - width // 2 + 6 + (i * tooth_spacing)
             pygame.draw.line(
-                self.screen,
+                surface,
                 BLACK,
                 (tooth_x, y + 3),
                 (tooth_x, y + height - 3),
@@ -505,7 +686,7 @@ class RoboEyes:
         highlight_width = width - 8
         highlight_height = 4
         pygame.draw.rect(
-            self.screen,
+            surface,
             WHITE,
             (
                 x - highlight_width // 2,
@@ -515,15 +696,11 @@ class RoboEyes:
             ),
             0
         )
-        
-        # Add extra glow effect for laughing
-        glow_surface = pygame.Surface((width + 15, height + 15))
-        glow_surface.set_alpha(35)  # Slightly more visible glow
-        glow_surface.fill(CYAN)
-        self.screen.blit(glow_surface, (x - width // 2 - 7, y - 7))
-        
+
+    def _draw_laugh_sparkles(self, surface, x, y, width, height):
+        """Draw the rotating sparkles over the laughing mouth"""
         # Add animated sparkle effect for extra expressiveness
-        current_time = time.time()
+        current_time = self.sim_time
         for i in range(3):  # 3 sparkles
             sparkle_angle = (current_time * 10 + i * 2.1) % (2 * math.pi)  # Rotating sparkles
             sparkle_radius = width // 3
@@ -532,31 +709,31 @@ class RoboEyes:
             
             # Draw small sparkle
             pygame.draw.circle(
-                self.screen,
+                surface,
                 WHITE,
                 (int(sparkle_x), int(sparkle_y)),
                 2
             )
 
-    def _draw_d_shaped_mouth(self, x, y, width, height, curve):
+    def _draw_d_shaped_mouth(self, surface, x, y, width, height, curve):
         """Draw a proper D-shaped mouth with the specified curve"""
         # Create a proper D shape using multiple drawing elements
         
         if curve > 0:  # Happy/Smile expression
             # Draw the main D shape for happy expression
-            self._draw_happy_d_mouth(x, y, width, height)
+            self._draw_happy_d_mouth(surface, x, y, width, height)
         elif curve < 0:  # Sad/Angry expression
             # Draw the main D shape for sad expression
-            self._draw_sad_d_mouth(x, y, width, height, curve)
+            self._draw_sad_d_mouth(surface, x, y, width, height, curve)
         else:  # Neutral expression
             # Draw a neutral D shape
-            self._draw_neutral_d_mouth(x, y, width, height)
+            self._draw_neutral_d_mouth(surface, x, y, width, height)
     
-    def _draw_happy_d_mouth(self, x, y, width, height):
+    def _draw_happy_d_mouth(self, surface, x, y, width, height):
         """Draw a happy D-shaped mouth (upturned)"""
         # Main mouth body (rectangle)
         pygame.draw.rect(
-            self.screen,
+            surface,
             CYAN,
             (
                 x - width // 2,
@@ -571,14 +748,14 @@ class RoboEyes:
         corner_radius = 4
         # Left corner
         pygame.draw.circle(
-            self.screen,
+            surface,
             CYAN,
             (x - width // 2 + corner_radius, y + height // 2),
             corner_radius
         )
         # Right corner
         pygame.draw.circle(
-            self.screen,
+            surface,
             CYAN,
             (x + width // 2 - corner_radius, y + height // 2),
             corner_radius
@@ -588,7 +765,7 @@ class RoboEyes:
         smile_width = width - 8
         smile_height = 6
         pygame.draw.ellipse(
-            self.screen,
+            surface,
             CYAN,
             (
                 x - smile_width // 2,
@@ -603,7 +780,7 @@ class RoboEyes:
         highlight_width = width - 6
         highlight_height = 3
         pygame.draw.rect(
-            self.screen,
+            surface,
             WHITE,
             (
                 x - highlight_width // 2,
@@ -613,18 +790,12 @@ class RoboEyes:
             ),
             0
         )
-        
-        # Add glow effect
-        glow_surface = pygame.Surface((width + 10, height + 10))
-        glow_surface.set_alpha(25)
-        glow_surface.fill(CYAN)
-        self.screen.blit(glow_surface, (x - width // 2 - 5, y - 5))
     
-    def _draw_sad_d_mouth(self, x, y, width, height, curve):
+    def _draw_sad_d_mouth(self, surface, x, y, width, height, curve):
         """Draw a sad D-shaped mouth (downturned)"""
         # Main mouth body (rectangle)
         pygame.draw.rect(
-            self.screen,
+            surface,
             CYAN,
             (
                 x - width // 2,
@@ -639,14 +810,14 @@ class RoboEyes:
         corner_radius = 4
         # Left corner
         pygame.draw.circle(
-            self.screen,
+            surface,
             CYAN,
             (x - width // 2 + corner_radius, y + height // 2),
             corner_radius
         )
         # Right corner
         pygame.draw.circle(
-            self.screen,
+            surface,
             CYAN,
             (x + width // 2 - corner_radius, y + height // 2),
             corner_radius
@@ -656,7 +827,7 @@ class RoboEyes:
         frown_width = width - 8
         frown_height = 6
         pygame.draw.ellipse(
-            self.screen,
+            surface,
             CYAN,
             (
                 x - frown_width // 2,
@@ -671,7 +842,7 @@ class RoboEyes:
         highlight_width = width - 6
         highlight_height = 2
         pygame.draw.rect(
-            self.screen,
+            surface,
             WHITE,
             (
                 x - highlight_width // 2,
@@ -681,18 +852,12 @@ class RoboEyes:
             ),
             0
         )
-        
-        # Add glow effect
-        glow_surface = pygame.Surface((width + 10, height + 10))
-        glow_surface.set_alpha(25)
-        glow_surface.fill(CYAN)
-        self.screen.blit(glow_surface, (x - width // 2 - 5, y - 5))
     
-    def _draw_neutral_d_mouth(self, x, y, width, height):
+    def _draw_neutral_d_mouth(self, surface, x, y, width, height):
         """Draw a neutral D-shaped mouth"""
         # Main mouth body (rectangle)
         pygame.draw.rect(
-            self.screen,
+            surface,
             CYAN,
             (
                 x - width // 2,
@@ -707,14 +872,14 @@ class RoboEyes:
         corner_radius = 4
         # Left corner
         pygame.draw.circle(
-            self.screen,
+            surface,
             CYAN,
             (x - width // 2 + corner_radius, y + height // 2),
             corner_radius
         )
         # Right corner
         pygame.draw.circle(
-            self.screen,
+            surface,
             CYAN,
             (x + width // 2 - corner_radius, y + height // 2),
             corner_radius
@@ -724,7 +889,7 @@ class RoboEyes:
         highlight_width = width - 6
         highlight_height = 2
         pygame.draw.rect(
-            self.screen,
+            surface,
             WHITE,
             (
                 x - highlight_width // 2,
@@ -735,200 +900,341 @@ class RoboEyes:
             0
         )
         
-        # Add glow effect
-        glow_surface = pygame.Surface((width + 8, height + 8))
-        glow_surface.set_alpha(25)
-        glow_surface.fill(CYAN)
-        self.screen.blit(glow_surface, (x - width // 2 - 4, y - 4))
-        
 
 
     # Eye shape configuration methods
+    @render_thread_command
     def set_width(self, left_eye, right_eye):
         """Set the width of both eyes"""
-        self.eye_l_width = left_eye
-        self.eye_r_width = right_eye
+        self.state.eye_l_width = left_eye
+        self.state.eye_r_width = right_eye
         self._calculate_eye_positions()
         return True
 
+    @render_thread_command
     def set_height(self, left_eye, right_eye):
         """Set the height of both eyes"""
-        self.eye_l_height = left_eye
-        self.eye_r_height = right_eye
+        self.state.eye_l_height = left_eye
+        self.state.eye_r_height = right_eye
         self._calculate_eye_positions()
         return True
 
+    @render_thread_command
     def set_border_radius(self, left_eye, right_eye):
         """Set the border radius of both eyes"""
-        self.eye_l_border_radius = left_eye
-        self.eye_r_border_radius = right_eye
+        self.state.eye_l_border_radius = left_eye
+        self.state.eye_r_border_radius = right_eye
         return True
 
+    @render_thread_command
     def set_space_between(self, space):
         """Set the space between eyes"""
         self.space_between = space
         self._calculate_eye_positions()
         return True
 
+    def _reset_simulation_time(self):
+        """Restart simulation time and all timers from the time source"""
+        self.sim_time = self.time_source.now()
+        self.sim_last_time = self.sim_time
+        self.sim_accumulator = 0.0
+        self.last_key_press_time = self.sim_time
+        self.gaze_last_look_time = float("-inf")
+        if self.animations is not None:
+            self.animations.reset_timers(self.sim_time)
+
+    def set_time_source(self, time_source, seed=None):
+        """Drive the simulation from another clock (see utils.clock_utils)
+        
+        With a SimulationClock and a seed, a session replays exactly.
+        """
+        self.time_source = time_source
+        if seed is not None:
+            self.random.seed(seed)
+        self._reset_simulation_time()
+        return True
+
+    def set_simulation_rate(self, steps_per_second):
+        """Set the fixed simulation timestep (motion speed is tuned for 60)"""
+        self.sim_step = 1.0 / steps_per_second
+        if self.animations is not None:
+            self.animations.set_step(self.sim_step)
+        return True
+
+    def set_profiler(self, state, overlay=False, window=300):
+        """Enable/disable per-stage frame timing over a rolling window of frames"""
+        if state:
+            self.profiler = FrameProfiler(self.max_fps, window)
+            self.profiler.overlay = overlay
+        else:
+            self.profiler = None
+        # Redraw everything so a removed overlay does not linger
+        if self.dirty_rects is not None:
+            self.dirty_rects.invalidate()
+        return True
+
+    @render_thread_command
+    def set_power_save(self, state, idle_fps=15, hold=1.0):
+        """Enable/disable power saving while the face is idle (see utils.scheduler_utils)
+        
+        Animations render at max_fps; idle wandering and easing tails at
+        idle_fps; a face that can't change sleeps until the next blink or
+        idle retarget, or until a command arrives. Commands and look_at()
+        keep the full frame rate for hold seconds.
+        """
+        return self.scheduler.set_enabled(state, idle_fps, hold)
+
+    def get_power_stats(self):
+        """Get frames rendered per scheduler mode, time slept and steps skipped"""
+        return self.scheduler.get_stats()
+
+    def get_layer_stats(self):
+        """Get renders, reuses and version of every face layer"""
+        return self.layers.get_stats()
+
+    def get_command_stats(self):
+        """Get depth and latency statistics of the cross-thread command queue"""
+        return self.commands.get_stats()
+
+    def get_profiler_stats(self):
+        """Get rolling frame and stage percentiles (None if profiling is off)"""
+        if self.profiler is None:
+            return None
+        return self.profiler.get_stats()
+
+    @render_thread_command
+    def set_dirty_rect_mode(self, state):
+        """Enable/disable dirty-rect rendering (off means full fill + flip)"""
+        self.dirty_rect_mode = state
+        if self.dirty_rects is not None:
+            self.dirty_rects.invalidate()
+        return True
+
+    @render_thread_command
+    def set_background_color(self, color):
+        """Draw the face on a flat color (the default is black)"""
+        self.background.clear()
+        return self._set_background(self.background.set_color(color))
+
+    @render_thread_command
+    def set_background_image(self, image, fit="cover"):
+        """Draw the face on an image file or surface (fit: cover, contain, stretch or center)"""
+        return self._set_background(self.background.set_image(image, fit))
+
+    @render_thread_command
+    def set_background_gradient(self, start, end, vertical=True):
+        """Draw the face on a linear gradient between two colors"""
+        return self._set_background(self.background.set_gradient(start, end, vertical))
+
+    def _set_background(self, changed):
+        """Repaint the whole screen after the background changed"""
+        if changed and self.dirty_rects is not None:
+            self.dirty_rects.invalidate()
+        return changed
+
+    @render_thread_command
+    def set_easing(self, group, easing, parameter):
+        """Set how a property group eases to its targets (see utils.easing_utils)
+        
+        e.g. set_easing("size", "spring", 20.0) or set_easing("position", "cubic", 0.3)
+        """
+        return self.interpolator.set_easing(group, easing, parameter)
+
+    @render_thread_command
     def set_cyclops(self, state):
         """Set cyclops mode (single eye)"""
         self.cyclops = state
         self._calculate_eye_positions()
+        self.interpolator.snap("position")
         return True
         
+    @render_thread_command
     def toggle_cyclops(self):
         """Toggle cyclops mode on/off"""
         self.cyclops = not self.cyclops
         self._calculate_eye_positions()
+        self.interpolator.snap("position")
         return self.cyclops
 
     # Mood and expression methods
+    @render_thread_command
     def set_mood(self, mood):
         """Set the mood expression"""
         return self.moods.set_mood(mood)
-        
-        return True
 
+    @render_thread_command
+    def set_mood_transition(self, duration):
+        """Set how long mood changes cross-fade, in seconds (0 switches instantly)"""
+        return self.moods.set_transition_duration(duration)
+
+    @render_thread_command
     def set_position(self, position):
         """Set the eye position using cardinal directions"""
-        self.position = position
-        
-        # Calculate base positions
-        base_l_x = (self.screen_width - (self.eye_l_width + self.eye_r_width + self.space_between)) // 2
-        base_l_y = (self.screen_height - self.eye_l_height) // 2
-        base_r_x = base_l_x + self.eye_l_width + self.space_between
-        base_r_y = (self.screen_height - self.eye_r_height) // 2
-        
-        # Offset for eye movement (about 10% of eye size)
-        offset_x = int(self.eye_l_width * 0.1)
-        offset_y = int(self.eye_l_height * 0.1)
-        
-        # Set positions based on direction
-        if position == DEFAULT:
-            self.eye_l_x_next = base_l_x
-            self.eye_l_y_next = base_l_y
-            self.eye_r_x_next = base_r_x
-            self.eye_r_y_next = base_r_y
-        elif position == N:  # North (top)
-            self.eye_l_x_next = base_l_x
-            self.eye_l_y_next = base_l_y - offset_y
-            self.eye_r_x_next = base_r_x
-            self.eye_r_y_next = base_r_y - offset_y
-        elif position == NE:  # Northeast (top right)
-            self.eye_l_x_next = base_l_x + offset_x
-            self.eye_l_y_next = base_l_y - offset_y
-            self.eye_r_x_next = base_r_x + offset_x
-            self.eye_r_y_next = base_r_y - offset_y
-        elif position == E:  # East (right)
-            self.eye_l_x_next = base_l_x + offset_x
-            self.eye_l_y_next = base_l_y
-            self.eye_r_x_next = base_r_x + offset_x
-            self.eye_r_y_next = base_r_y
-        elif position == SE:  # Southeast (bottom right)
-            self.eye_l_x_next = base_l_x + offset_x
-            self.eye_l_y_next = base_l_y + offset_y
-            self.eye_r_x_next = base_r_x + offset_x
-            self.eye_r_y_next = base_r_y + offset_y
-        elif position == S:  # South (bottom)
-            self.eye_l_x_next = base_l_x
-            self.eye_l_y_next = base_l_y + offset_y
-            self.eye_r_x_next = base_r_x
-            self.eye_r_y_next = base_r_y + offset_y
-        elif position == SW:  # Southwest (bottom left)
-            self.eye_l_x_next = base_l_x - offset_x
-            self.eye_l_y_next = base_l_y + offset_y
-            self.eye_r_x_next = base_r_x - offset_x
-            self.eye_r_y_next = base_r_y + offset_y
-        elif position == W:  # West (left)
-            self.eye_l_x_next = base_l_x - offset_x
-            self.eye_l_y_next = base_l_y
-            self.eye_r_x_next = base_r_x - offset_x
-            self.eye_r_y_next = base_r_y
-        elif position == NW:  # Northwest (top left)
-            self.eye_l_x_next = base_l_x - offset_x
-            self.eye_l_y_next = base_l_y - offset_y
-            self.eye_r_x_next = base_r_x - offset_x
-            self.eye_r_y_next = base_r_y - offset_y
-        
-        # Apply curiosity effect if enabled
-        if self.curiosity and (position == E or position == W):
-            if position == E:
-                self.eye_r_height = int(self.eye_r_height_default * 1.2)
-            elif position == W:
-                self.eye_l_height = int(self.eye_l_height_default * 1.2)
-        else:
-            self.eye_l_height = self.eye_l_height_default
-            self.eye_r_height = self.eye_r_height_default
-        
-        return True
+        return self.shapes.set_position(position)
+
+    def look_at(self, x, y):
+        """Look towards a normalized target, x and y in [-1, 1] (-1, -1 is top left)
+        
+        Safe to call from any thread, e.g. a face tracker at 30 Hz: the eyes
+        move there smoothly on the render thread. Idle mode pauses its random
+        looking around until auto_center_delay has passed without a call.
+        """
+        self.gaze_last_look_time = self.sim_time
+        return self.gaze.look_at(x, y)
 
+    @render_thread_command
     def set_curiosity(self, state):
         """Enable/disable curiosity effect"""
         self.curiosity = state
         return True
 
+    @render_thread_command
     def open(self, left_eye=True, right_eye=True):
         """Open eyes"""
         if left_eye:
-            self.eyelids_closed_height_next = 0
+            self.state.eyelids_closed_height_next = 0
         if right_eye and not self.cyclops:
-            self.eyelids_closed_height_next = 0
+            self.state.eyelids_closed_height_next = 0
         return True
 
+    @render_thread_command
     def close(self, left_eye=True, right_eye=True):
         """Close eyes"""
         if left_eye:
-            self.eyelids_closed_height_next = self.eye_l_height
+            self.state.eyelids_closed_height_next = self.state.eye_l_height
         if right_eye and not self.cyclops:
-            self.eyelids_closed_height_next = self.eye_r_height
+            self.state.eyelids_closed_height_next = self.state.eye_r_height
         return True
 
     # Flicker methods
+    @render_thread_command
     def set_h_flicker(self, state, amplitude=2):
         """Set horizontal flicker"""
         self.h_flicker = state
         self.h_flicker_amplitude = amplitude
+        if not state:
+            self.state.eye_l_x_next = self.state.eye_l_x
+            self.state.eye_r_x_next = self.state.eye_r_x
         return True
 
+    @render_thread_command
     def set_v_flicker(self, state, amplitude=2):
         """Set vertical flicker"""
         self.v_flicker = state
         self.v_flicker_amplitude = amplitude
+        if not state:
+            self.state.eye_l_y_next = self.state.eye_l_y
+            self.state.eye_r_y_next = self.state.eye_r_y
         return True
 
     # Animation methods
+    @render_thread_command
     def blink(self, left_eye=True, right_eye=True):
         """Blink animation"""
         return self.animations.blink()
         
+    @render_thread_command
     def wink(self, left_eye=True):
         """Wink animation (blink with only one eye)"""
         return self.animations.wink(left_eye)
 
+    @render_thread_command
     def anim_laugh(self):
         """Laughing animation"""
         return self.animations.anim_laugh()
 
+    @render_thread_command
     def anim_confused(self):
         """Confused animation"""
         return self.animations.anim_confused()
 
+    @render_thread_command
+    def play_animation(self, name):
+        """Play an animation clip by name (see utils.timeline_utils)"""
+        return self.animations.play(name)
+
+    @render_thread_command
+    def stop_animation(self, name):
+        """Stop an animation clip by name"""
+        return self.animations.stop(name)
+
+    @render_thread_command
+    def add_animation(self, clip):
+        """Add or replace an animation clip (a utils.timeline_utils.Clip)"""
+        return self.animations.add_clip(clip)
+
+    @render_thread_command
+    def load_animations(self, directory):
+        """Load the JSON animation clips of a directory (see utils.clip_utils)"""
+        return self.animations.load_clips(directory)
+
     # Macro animators
+    @render_thread_command
     def set_auto_blinker(self, state, interval=3, variation=2):
         """Set auto blinker"""
         return self.animations.set_auto_blinker(state, interval, variation)
 
+    @render_thread_command
     def set_idle_mode(self, state, interval=2, variation=2):
         """Set idle mode"""
         return self.animations.set_idle_mode(state, interval, variation)
         
+    @render_thread_command
     def set_eye_shape(self, shape):
         """Set the eye shape"""
-        if shape in ["round", "square", "oval", "teardrop", "pill"]:
-            self.eye_shape = shape
-            return True
-        return False
-        
+        return self.shapes.set_eye_shape(shape)
+
+    @render_thread_command
+    def add_eye_shape(self, name, **params):
+        """Add an eye shape from signed distance field parameters (see utils.sdf_utils)"""
+        return self.shapes.add_shape(name, **params)
+
+    def start_command_server(self, udp_port=5005, unix_path=None, host="127.0.0.1"):
+        """Accept commands over UDP and/or a Unix socket (see utils.server_utils)"""
+        self.stop_command_server()
+        server = CommandServer(self, host, udp_port, unix_path)
+        if not server.start():
+            return False
+        self.command_server = server
+        return True
+
+    def stop_command_server(self):
+        """Stop the command server if it is running"""
+        if self.command_server is not None:
+            self.command_server.stop()
+            self.command_server = None
+        return True
+
+    def start_recording(self, path, format="png", offline=False, pool_size=8):
+        """Record every frame as a PNG sequence, raw RGB or y4m (see utils.recorder_utils)
+        
+        Frames are written on background threads. Live recording drops a
+        frame rather than stall the render loop; offline recording keeps
+        every frame and switches to a simulated clock, so update() renders
+        as fast as the frames can be written.
+        """
+        self.stop_recording()
+        if self.screen is None:
+            print("Warning: Call begin() before start_recording()")
+            return False
+        recorder = FrameRecorder(path, format, self.max_fps, pool_size, blocking=offline)
+        if not recorder.start(self.screen):
+            return False
+        if offline and self.time_source.realtime:
+            self.set_time_source(SimulationClock(frame_time=1.0 / self.max_fps))
+        self.recorder = recorder
+        return True
+
+    def stop_recording(self):
+        """Finish writing the recording, returns its statistics (None if not recording)"""
+        if self.recorder is None:
+            return None
+        self.recorder.stop()
+        stats = self.recorder.get_stats()
+        self.recorder = None
+        return stats
+        
+    @render_thread_command
     def set_manual_control(self, state):
         """Enable/disable manual control with arrow keys"""
         self.manual_control = state
@@ -940,6 +1246,7 @@ class RoboEyes:
             self.manual_y_velocity = 0
         return True
         
+    @render_thread_command
     def anim_excited(self):
         """Excited animation - rapidly changing eye size"""
         self.set_mood(EXCITED)
@@ -954,4 +1261,13 @@ class RoboEyes:
     def quit(self):
         """Quit pygame and clean up"""
         self.running = False
+        self.stop_command_server()
+        self.stop_recording()
+        if self.sink is not None:
+            self.sink.close()
         pygame.quit()
+
+
+# Eye state fields stay reachable as RoboEyes attributes (e.g. eye_l_width_default)
+for _name in FIELDS:
+    setattr(RoboEyes, _name, state_property(_name))
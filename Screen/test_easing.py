@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Easing tests: changing the easing of one property group must not disturb
+the transitions still running in the other groups.
+
+    python test_easing.py            # also runs under pytest
+"""
+
+import os
+import sys
+
+# Add the current directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy
+
+from utils.easing_utils import Interpolator, GROUPS, CUBIC, SPRING
+from utils.state_utils import EyeState, TARGET, CURRENT
+
+STEP = 1.0 / 60
+
+
+def start_transitions():
+    """An interpolator with every group halfway through a transition"""
+    state = EyeState()
+    interpolator = Interpolator(state)
+    state.array[TARGET] = 100.0
+    for _ in range(5):
+        interpolator.step(STEP)
+    return state, interpolator
+
+
+def other_channels(group):
+    """Channel indices of every group but the given one"""
+    return [c for name, channels in GROUPS.items() if name != group for c in channels]
+
+
+def test_set_easing_keeps_other_groups_moving():
+    """Other groups follow exactly the path they would have without the change"""
+    state, interpolator = start_transitions()
+    reference_state, reference = start_transitions()
+    # Mid-flight: a cubic ease (eyelids_tired) and a spring (position)
+    assert 0 < state.eyelids_tired_height < 100
+    assert interpolator.velocity[GROUPS["position"][0]] != 0
+
+    interpolator.set_easing("size", SPRING, 20.0)
+    others = other_channels("size")
+    for _ in range(10):
+        before = state.array[CURRENT][others].copy()
+        interpolator.step(STEP)
+        reference.step(STEP)
+        numpy.testing.assert_array_equal(state.array[CURRENT][others], reference_state.array[CURRENT][others])
+        # Still easing, not jumping to the target
+        assert (state.array[CURRENT][others] > before).any()
+        assert (state.array[CURRENT][others] < 100.0).any()
+
+
+def test_set_easing_continues_from_current_value():
+    """The changed group restarts from where it is, without a jump"""
+    state, interpolator = start_transitions()
+    channels = list(GROUPS["eyelids_tired"])
+    before = state.array[CURRENT][channels].copy()
+
+    interpolator.set_easing("eyelids_tired", CUBIC, 0.5)
+    interpolator.step(STEP)
+    after = state.array[CURRENT][channels]
+    assert (after >= before).all()
+    assert (after - before < 5.0).all()
+
+
+def main():
+    tests = [test_set_easing_keeps_other_groups_moving, test_set_easing_continues_from_current_value]
+    for test in tests:
+        test()
+        print(f"✓ {test.__name__}")
+    print(f"{len(tests)}/{len(tests)} easing tests passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
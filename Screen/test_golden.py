@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Golden-image tests: render canonical states headless and compare them with
+the images stored in golden/, so drawing optimizations can't change pixels
+unnoticed. Cases render in parallel across a process pool.
+
+    python test_golden.py            # compare (also runs under pytest)
+    python test_golden.py --update   # re-render the golden images
+
+GOLDEN_UPDATE=1 updates the images when run under pytest. Failing cases
+leave the rendered image and a diff image in the system temp directory.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+# Render without a window or video driver
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+# Add the current directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy
+import pygame
+
+GOLDEN_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden")
+FAILURE_DIRECTORY = os.path.join(tempfile.gettempdir(), "roboeyes_golden_failures")
+
+SCREEN_WIDTH = 640
+SCREEN_HEIGHT = 320
+STEPS_PER_SECOND = 120  # Blink progress of 25/50/75% falls on whole steps
+
+# A pixel differs when a channel of the blurred images differs by more than
+# CHANNEL_TOLERANCE; a case fails when more than MAX_CHANGED_PIXELS differ.
+# The blur forgives 1px anti-aliasing shifts but not moved or missing shapes.
+CHANNEL_TOLERANCE = 24
+MAX_CHANGED_PIXELS = 40
+
+MOODS = ("DEFAULT", "TIRED", "SAD", "EXCITED", "ANGRY")
+SHAPES = ("round", "square", "pill", "oval", "angry", "squircle", "teardrop")
+
+
+def golden_cases():
+    """Name and description of every case: (setup, animation, seconds into it)"""
+    cases = {}
+    for mood in MOODS:
+        cases[f"mood_{mood.lower()}"] = ({"mood": mood}, None, 0.0)
+    for shape in SHAPES:
+        cases[f"shape_{shape}"] = ({"shape": shape}, None, 0.0)
+    cases["cyclops"] = ({"cyclops": True}, None, 0.0)
+    for percent in (25, 50, 75):
+        cases[f"blink_{percent}"] = ({}, "blink", 0.3 * percent / 100)
+    cases["wink_50"] = ({}, "wink", 0.15)
+    for percent in (25, 50):
+        cases[f"laugh_{percent}"] = ({}, "laugh", 1.0 * percent / 100)
+    # Eyelids and glows over a background that isn't black
+    cases["background_gradient"] = ({"mood": "SAD", "gradient": ((60, 0, 90), (0, 90, 120))}, "blink", 0.075)
+    return cases
+
+
+def render_case(name):
+    """Render one case, returns its RGB pixels as an (height, width, 3) array"""
+    from robo_eyes import RoboEyes
+    from utils.clock_utils import SimulationClock
+    from utils.display_utils import SurfaceSink
+    from utils.server_utils import MOOD_NAMES
+
+    setup, animation, seconds = golden_cases()[name]
+
+    eyes = RoboEyes()
+    eyes.set_time_source(SimulationClock(frame_time=1.0 / STEPS_PER_SECOND), seed=1)
+    eyes.begin(SCREEN_WIDTH, SCREEN_HEIGHT, STEPS_PER_SECOND, sink=SurfaceSink())
+    eyes.set_simulation_rate(STEPS_PER_SECOND)
+    eyes.set_auto_blinker(False)
+    eyes.set_idle_mode(False)
+    eyes.set_manual_control(False)
+    eyes.set_dirty_rect_mode(False)
+    eyes.set_width(80, 80)
+    eyes.set_height(80, 80)
+    eyes.set_space_between(40)
+    eyes.eye_l_width_default = 80
+    eyes.eye_r_width_default = 80
+    eyes.eye_l_height_default = 80
+    eyes.eye_r_height_default = 80
+
+    eyes.set_mood(MOOD_NAMES[setup.get("mood", "DEFAULT")])
+    if "shape" in setup:
+        eyes.set_eye_shape(setup["shape"])
+    eyes.set_cyclops(setup.get("cyclops", False))
+    if "gradient" in setup:
+        eyes.set_background_gradient(*setup["gradient"])
+
+    # Let every transition settle
+    for _ in range(STEPS_PER_SECOND):
+        eyes.update()
+
+    if animation == "blink":
+        eyes.blink()
+    elif animation == "wink":
+        eyes.wink(left_eye=True)
+    elif animation == "laugh":
+        eyes.anim_laugh()
+    for _ in range(int(round(seconds * STEPS_PER_SECOND))):
+        eyes.update()
+
+    # Draw the pose exactly at this point, without easing lag
+    eyes.interpolator.snap()
+    eyes.background.restore(eyes.screen)
+    eyes._draw_eyes()
+    pixels = pygame.surfarray.array3d(eyes.screen).transpose(1, 0, 2).copy()
+    eyes.quit()
+    return pixels
+
+
+def blur(image):
+    """3x3 box blur of an (height, width, channels) image, vectorized"""
+    padded = numpy.pad(image.astype(numpy.int32), ((1, 1), (1, 1), (0, 0)), mode="edge")
+    height, width = image.shape[:2]
+    total = numpy.zeros(image.shape, dtype=numpy.int32)
+    for dy in range(3):
+        for dx in range(3):
+            total += padded[dy:dy + height, dx:dx + width]
+    return total // 9
+
+
+def image_diff(actual, expected, tolerance=CHANNEL_TOLERANCE):
+    """Compare two images, returns (changed pixels, largest channel difference, diff mask)"""
+    if actual.shape != expected.shape:
+        return actual.shape[0] * actual.shape[1], 255, None
+    difference = numpy.abs(blur(actual) - blur(expected)).max(axis=2)
+    mask = difference > tolerance
+    return int(mask.sum()), int(difference.max()), mask
+
+
+def save_image(path, pixels):
+    """Save an (height, width, 3) array as an image"""
+    surface = pygame.surfarray.make_surface(numpy.ascontiguousarray(pixels.transpose(1, 0, 2)))
+    pygame.image.save(surface, path)
+
+
+def load_image(path):
+    """Load an image as an (height, width, 3) array"""
+    return pygame.surfarray.array3d(pygame.image.load(path)).transpose(1, 0, 2)
+
+
+def check_case(name, update=False):
+    """Render a case and compare or update its golden image, returns (name, ok, message)"""
+    pixels = render_case(name)
+    path = os.path.join(GOLDEN_DIRECTORY, f"{name}.png")
+    if update:
+        os.makedirs(GOLDEN_DIRECTORY, exist_ok=True)
+        save_image(path, pixels)
+        return name, True, "updated"
+    if not os.path.exists(path):
+        return name, False, f"no golden image {path} (run with --update)"
+
+    changed, largest, mask = image_diff(pixels, load_image(path))
+    if changed <= MAX_CHANGED_PIXELS:
+        return name, True, f"{changed} pixels differ"
+
+    # Keep the evidence: the rendered frame and the differing pixels in red
+    os.makedirs(FAILURE_DIRECTORY, exist_ok=True)
+    save_image(os.path.join(FAILURE_DIRECTORY, f"{name}.png"), pixels)
+    if mask is not None:
+        diff = pixels // 3
+        diff[mask] = (255, 0, 0)
+        save_image(os.path.join(FAILURE_DIRECTORY, f"{name}_diff.png"), diff)
+    return name, False, f"{changed} pixels differ (largest difference {largest}), see {FAILURE_DIRECTORY}"
+
+
+def run_cases(update=False, workers=None, names=None):
+    """Check all (or the named) cases across a process pool"""
+    names = list(names or golden_cases())
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(check_case, names, [update] * len(names)))
+
+
+def test_golden_images():
+    """Every canonical state matches its golden image"""
+    results = run_cases(update=os.environ.get("GOLDEN_UPDATE") == "1")
+    failures = [f"{name}: {message}" for name, ok, message in results if not ok]
+    assert not failures, "\n".join(failures)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare rendered states with the golden images")
+    parser.add_argument("--update", action="store_true", help="re-render the golden images")
+    parser.add_argument("--workers", type=int, help="processes to render with (default: one per CPU)")
+    parser.add_argument("cases", nargs="*", help=f"cases to run (default: all of {', '.join(golden_cases())})")
+    args = parser.parse_args()
+
+    unknown = [name for name in args.cases if name not in golden_cases()]
+    if unknown:
+        print(f"Unknown cases: {', '.join(unknown)}")
+        return 2
+
+    results = run_cases(args.update, args.workers, args.cases)
+    for name, ok, message in results:
+        print(f"{'✓' if ok else '✗'} {name}: {message}")
+    failed = sum(1 for _, ok, _ in results if not ok)
+    print(f"{len(results) - failed}/{len(results)} golden images match")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
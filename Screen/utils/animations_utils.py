@@ -4,213 +4,181 @@ Handles all animation-related functionality including blinking, winking,
 laughing, confused animations, and idle mode.
 """
 
-import random
-import time
-import math
-import pygame
+from utils.shapes_utils import DIRECTION_VECTORS
+from utils.timeline_utils import Timeline, Clip, Track, oscillation_keyframes
+from utils.clip_utils import ClipLoader
+
+
+def default_clips():
+    """Built-in animation clips (the original hand-written animations as tracks)"""
+    return [
+        # First half closes the eyes, second half opens them; the top and
+        # bottom eyelid each cover half of the eye when closed
+        Clip("blink", [
+            Track("eyelids", [(0.0, 0.0), (0.15, 0.5), (0.3, 0.0)]),
+        ]),
+        Clip("laugh", [
+            # Fast oscillation up and down
+            Track("y", oscillation_keyframes(8, 20, 1.0, truncate=True), "cubic", blend="add"),
+            # Slight horizontal shake
+            Track("x", oscillation_keyframes(3, 25, 1.0, truncate=True), "cubic"),
+            # Size pulsing between 0.7x and 1.3x
+            Track("scale", [(t, 1.0 + v) for t, v in oscillation_keyframes(0.3, 15, 1.0)], "cubic"),
+        ]),
+        # Eyes shaking left and right; overrides the laugh's horizontal shake
+        Clip("confused", [
+            Track("x", oscillation_keyframes(5, 10, 1.0, truncate=True), "cubic", priority=1),
+        ]),
+    ]
+
 
 class AnimationsHandler:
     def __init__(self, parent):
         """Initialize animations with reference to parent RoboEyes object"""
         self.parent = parent
         
-        # Animation state flags
-        self.is_blinking = False
-        self.is_winking = False
-        self.blink_start_time = 0
-        self.blink_duration = 0.3  # seconds
-        self.wink_left_eye = True  # Which eye to wink
+        # Keyframed animations, sampled once per simulation step
+        self.timeline = Timeline(parent.sim_step)
+        for clip in default_clips():
+            self.timeline.add_clip(clip)
+        
+        # Clips from files (see utils.clip_utils), may replace built-in ones
+        self.clip_loaders = [ClipLoader()]
+        self.load_clips()
         
-        self.is_laughing = False
-        self.laugh_start_time = 0
-        self.laugh_duration = 1.0  # seconds
+        # Blended timeline output, applied on top of the eased geometry
+        self.offset_x = 0.0
+        self.offset_y = 0.0
+        self.size_scale = 1.0
+        self.mouth_offset_x = 0.0
+        self.mouth_offset_y = 0.0
+        self.mouth_scale = 1.0
+        self.mouth_curve = 0.0
         
-        self.is_confused = False
-        self.confused_start_time = 0
-        self.confused_duration = 1.0  # seconds
+        # Winking reuses the blink clip on one eye
+        self.is_winking = False
+        self.wink_left_eye = True  # Which eye to wink
         
         # Auto animations
         self.auto_blinker = True
         self.auto_blinker_interval = 3  # Minimum 3 seconds as mentioned in the video
         self.auto_blinker_variation = 2  # Random variation 0-2 seconds as mentioned in the video
-        self.auto_blinker_last_time = time.time()
+        self.auto_blinker_next_time = parent.sim_time  # Drawn by _schedule_blink
+        self._schedule_blink(parent.sim_time)
         
-        # Idle mode with smooth movement
+        # Idle mode: look around at random, the gaze smoothing does the movement
         self.idle_mode = True
         self.idle_mode_interval = 1  # Minimum 1 second as mentioned in the video
         self.idle_mode_variation = 3  # Random variation to make it 1-4 seconds as mentioned in the video
-        self.idle_mode_last_time = time.time()
-        self.idle_target_position = 0  # Target position to move to
-        self.idle_current_position = 0  # Current position
-        self.idle_velocity_x = 0  # X velocity for smooth movement
-        self.idle_velocity_y = 0  # Y velocity for smooth movement
-        self.idle_acceleration = 0.2  # Acceleration factor
-        self.idle_deceleration = 0.9  # Deceleration factor (friction)
-        self.idle_max_velocity = 3  # Maximum velocity
-        self.idle_moving = False  # Whether currently moving to a target
+        self.idle_mode_last_time = parent.sim_time
+        self.idle_next_time = parent.sim_time  # When to pick the next target
+        self.idle_target_position = 0  # Direction currently looked at
+        self.idle_gaze_amount = 0.5  # How far to look, as a fraction of the gaze range
         
-        # Eyelid properties
-        self.eyelids_closed_height = 0
-        self.eyelids_closed_height_next = 0
+        # Eyelid heights live in the parent's EyeState
+    
+    @property
+    def is_blinking(self):
+        """Check if a blink or wink is playing"""
+        return self.timeline.is_playing("blink")
+    
+    @property
+    def is_laughing(self):
+        """Check if the laugh animation is playing"""
+        return self.timeline.is_playing("laugh")
+    
+    @property
+    def is_confused(self):
+        """Check if the confused animation is playing"""
+        return self.timeline.is_playing("confused")
     
     def update_animations(self, current_time):
         """Update all active animations"""
         # Update auto blinker
-        if self.auto_blinker and not self.is_blinking:
-            if current_time - self.auto_blinker_last_time > self.auto_blinker_interval + random.uniform(0, self.auto_blinker_variation):
-                self.blink()
-                self.auto_blinker_last_time = current_time
+        if self.auto_blinker and not self.is_blinking and current_time >= self.auto_blinker_next_time:
+            self.blink()
+            self._schedule_blink(current_time)
         
-        # Update idle mode with smooth movement
-        if self.idle_mode:
-            # Import the constants directly from shapes_utils
-            from utils.shapes_utils import DEFAULT, N, NE, E, SE, S, SW, W, NW
-            
-            # Check if it's time to select a new target position
-            if not self.idle_moving or (current_time - self.idle_mode_last_time > self.idle_mode_interval + random.uniform(0, self.idle_mode_variation)):
-                # Randomly select a new position
-                directions = [DEFAULT, N, NE, E, SE, S, SW, W, NW]
-                self.idle_target_position = random.choice(directions)
-                self.idle_moving = True
+        # Update idle mode: look somewhere new every 1-4 seconds, unless
+        # someone else chose where to look recently
+        if self.idle_mode and current_time >= self.idle_next_time:
+            if current_time - self.parent.gaze_last_look_time > self.parent.auto_center_delay:
+                directions = list(DIRECTION_VECTORS)
+                self.idle_target_position = self.parent.random.choice(directions)
+                gaze_x, gaze_y = DIRECTION_VECTORS[self.idle_target_position]
+                self.parent.gaze.look_at(gaze_x * self.idle_gaze_amount, gaze_y * self.idle_gaze_amount)
                 self.idle_mode_last_time = current_time
-                
-                # Set target coordinates based on the selected position
-                if self.idle_target_position == N:
-                    target_x = 0
-                    target_y = -1
-                elif self.idle_target_position == NE:
-                    target_x = 1
-                    target_y = -1
-                elif self.idle_target_position == E:
-                    target_x = 1
-                    target_y = 0
-                elif self.idle_target_position == SE:
-                    target_x = 1
-                    target_y = 1
-                elif self.idle_target_position == S:
-                    target_x = 0
-                    target_y = 1
-                elif self.idle_target_position == SW:
-                    target_x = -1
-                    target_y = 1
-                elif self.idle_target_position == W:
-                    target_x = -1
-                    target_y = 0
-                elif self.idle_target_position == NW:
-                    target_x = -1
-                    target_y = -1
-                else:  # DEFAULT
-                    target_x = 0
-                    target_y = 0
-                
-                # Apply acceleration toward target
-                self.idle_velocity_x += target_x * self.idle_acceleration
-                self.idle_velocity_y += target_y * self.idle_acceleration
-                
-                # Apply velocity limits
-                self.idle_velocity_x = max(-self.idle_max_velocity, min(self.idle_max_velocity, self.idle_velocity_x))
-                self.idle_velocity_y = max(-self.idle_max_velocity, min(self.idle_max_velocity, self.idle_velocity_y))
-            
-            # Apply deceleration when close to target
-            if self.idle_moving and self.idle_target_position == DEFAULT:
-                self.idle_velocity_x *= self.idle_deceleration
-                self.idle_velocity_y *= self.idle_deceleration
-                
-                # Stop when velocity is very small
-                if abs(self.idle_velocity_x) < 0.1 and abs(self.idle_velocity_y) < 0.1:
-                    self.idle_velocity_x = 0
-                    self.idle_velocity_y = 0
-                    self.idle_moving = False
-            
-            # Apply the velocity to the eye position
-            base_offset = 10  # Base offset for eye movement
-            self.parent.eye_l_x_next = self.parent.eye_l_x + int(self.idle_velocity_x * base_offset)
-            self.parent.eye_l_y_next = self.parent.eye_l_y + int(self.idle_velocity_y * base_offset)
-            self.parent.eye_r_x_next = self.parent.eye_r_x + int(self.idle_velocity_x * base_offset)
-            self.parent.eye_r_y_next = self.parent.eye_r_y + int(self.idle_velocity_y * base_offset)
+            self.idle_next_time = current_time + self.idle_mode_interval + self.parent.random.uniform(0, self.idle_mode_variation)
         
-        # Update blinking animation
-        if self.is_blinking:
-            progress = (current_time - self.blink_start_time) / self.blink_duration
-            if progress >= 1.0:
-                self.is_blinking = False
-                self.eyelids_closed_height_next = 0
-                self.is_winking = False  # Reset winking state when done
-            else:
-                # First half closes eyes, second half opens them
-                if progress < 0.5:
-                    self.eyelids_closed_height_next = int(self.parent.eye_l_height * (progress * 2))
-                else:
-                    self.eyelids_closed_height_next = int(self.parent.eye_l_height * (1 - (progress - 0.5) * 2))
+        # Blend the playing clips; the cost grows with active tracks only
+        values, released = self.timeline.evaluate(current_time)
+        if not values and not released:
+            return
+        # Clip offsets are in pixels of the reference screen (see utils.layout_utils)
+        scale = self.parent.layout.scale
+        self.offset_x = values.get("x", 0.0) * scale
+        self.offset_y = values.get("y", 0.0) * scale
+        self.size_scale = values.get("scale", 1.0)
+        self.mouth_offset_x = values.get("mouth_x", 0.0) * scale
+        self.mouth_offset_y = values.get("mouth_y", 0.0) * scale
+        self.mouth_scale = values.get("mouth_scale", 1.0)
+        self.mouth_curve = values.get("mouth_curve", 0.0)
         
-        # Update laughing animation
-        if self.is_laughing:
-            progress = (current_time - self.laugh_start_time) / self.laugh_duration
-            if progress >= 1.0:
-                self.is_laughing = False
-                # Reset to original positions and sizes
-                self.parent.eye_l_y_next = self.parent.eye_l_y
-                self.parent.eye_r_y_next = self.parent.eye_r_y
-                self.parent.eye_l_width = self.parent.eye_l_width_default
-                self.parent.eye_r_width = self.parent.eye_r_width_default
-                self.parent.eye_l_height = self.parent.eye_l_height_default
-                self.parent.eye_r_height = self.parent.eye_r_height_default
-                # Reset mouth laughing state
-                self.parent.is_laughing_mouth = False
-            else:
-                # Create multiple laugh effects:
-                # 1. Fast oscillation up and down
-                vertical_offset = int(math.sin(progress * 20) * 8)  # Faster and more pronounced
-                self.parent.eye_l_y_next = self.parent.eye_l_y + vertical_offset
-                self.parent.eye_r_y_next = self.parent.eye_r_y + vertical_offset
-                
-                # 2. Slight horizontal shake for more dynamic movement
-                horizontal_offset = int(math.sin(progress * 25) * 3)  # Small horizontal shake
-                self.parent.eye_l_x_next = self.parent.eye_l_x + horizontal_offset
-                self.parent.eye_r_x_next = self.parent.eye_r_x + horizontal_offset
-                
-                # 3. Dynamic size pulsing - eyes get bigger when laughing
-                size_multiplier = 1.0 + math.sin(progress * 15) * 0.3  # Pulsing between 0.7x and 1.3x size
-                self.parent.eye_l_width = int(self.parent.eye_l_width_default * size_multiplier)
-                self.parent.eye_r_width = int(self.parent.eye_r_width_default * size_multiplier)
-                self.parent.eye_l_height = int(self.parent.eye_l_height_default * size_multiplier)
-                self.parent.eye_r_height = int(self.parent.eye_r_height_default * size_multiplier)
-        
-        # Update confused animation
-        if self.is_confused:
-            progress = (current_time - self.confused_start_time) / self.confused_duration
-            if progress >= 1.0:
-                self.is_confused = False
-                self.parent.eye_l_x_next = self.parent.eye_l_x
-                self.parent.eye_r_x_next = self.parent.eye_r_x
-            else:
-                # Oscillate the eyes left and right
-                offset = int(math.sin(progress * 10) * 5)
-                self.parent.eye_l_x_next = self.parent.eye_l_x + offset
-                self.parent.eye_r_x_next = self.parent.eye_r_x + offset
+        # Eyelids are eased like open()/close(), so they go through the state
+        if "eyelids" in values:
+            self.parent.state.eyelids_closed_height_next = int(values["eyelids"] * self.parent.state.eye_l_height)
+        elif "eyelids" in released:
+            self.parent.state.eyelids_closed_height_next = 0
+    
+    def play(self, name, on_end=None):
+        """Start an animation clip by name"""
+        return self.timeline.play(name, self.parent.sim_time, on_end)
+    
+    def stop(self, name):
+        """Stop an animation clip by name"""
+        return self.timeline.stop(name)
+    
+    def add_clip(self, clip):
+        """Add or replace an animation clip"""
+        return self.timeline.add_clip(clip)
+    
+    def load_clips(self, directory=None):
+        """Load the clip files of a directory (default: the clips directory)"""
+        if directory is not None:
+            loader = ClipLoader(directory)
+            self.clip_loaders.append(loader)
+            loaders = [loader]
+        else:
+            loaders = self.clip_loaders
+        for loader in loaders:
+            for compiled in loader.load_directory(self.timeline.step):
+                self.timeline.add_compiled(compiled)
+        return True
+    
+    def set_step(self, step):
+        """Resample all clips for a new simulation step"""
+        self.timeline.set_step(step)
+        return self.load_clips()
     
     def blink(self):
         """Blink animation with both eyes"""
         if not self.is_blinking:
-            self.is_blinking = True
             self.is_winking = False  # Not winking, normal blink
-            self.blink_start_time = time.time()
+            self.play("blink", self._end_blink)
         return True
     
     def wink(self, left_eye=True):
         """Wink animation (blink with only one eye)"""
         if not self.is_blinking:
-            self.is_blinking = True
             self.is_winking = True
             self.wink_left_eye = left_eye  # Which eye to wink
-            self.blink_start_time = time.time()
+            self.play("blink", self._end_blink)
         return True
     
     def anim_laugh(self):
         """Laughing animation - eyes shaking up and down with size pulsing"""
         if not self.is_laughing:
-            self.is_laughing = True
-            self.laugh_start_time = time.time()
+            self.play("laugh", self._end_laugh)
             # Set parent laughing state for mouth expression
             self.parent.is_laughing_mouth = True
         return True
@@ -218,16 +186,23 @@ class AnimationsHandler:
     def anim_confused(self):
         """Confused animation - eyes shaking left and right"""
         if not self.is_confused:
-            self.is_confused = True
-            self.confused_start_time = time.time()
+            self.play("confused")
         return True
     
+    def _end_blink(self):
+        """Reset winking state when a blink or wink is done"""
+        self.is_winking = False
+    
+    def _end_laugh(self):
+        """Reset mouth laughing state"""
+        self.parent.is_laughing_mouth = False
+    
     def set_auto_blinker(self, state, interval=3, variation=2):
         """Set auto blinker state and timing parameters"""
         self.auto_blinker = state
         self.auto_blinker_interval = interval
         self.auto_blinker_variation = variation
-        self.auto_blinker_last_time = time.time()
+        self._schedule_blink(self.parent.sim_time)
         return True
     
     def set_idle_mode(self, state, interval=1, variation=3):
@@ -235,127 +210,26 @@ class AnimationsHandler:
         self.idle_mode = state
         self.idle_mode_interval = interval
         self.idle_mode_variation = variation
-        self.idle_mode_last_time = time.time()
+        self.idle_mode_last_time = self.parent.sim_time
+        self.idle_next_time = self.parent.sim_time
         return True
     
-    def draw_eyelids(self, screen, eye_l_x_current, eye_l_y_current, eye_r_x_current, eye_r_y_current, 
-                    eye_l_width_current, eye_l_height_current, eye_r_width_current, eye_r_height_current):
-        """Draw eyelids based on current animation state"""
-        # Convert all position and size values to integers to avoid float errors
-        eye_l_x = int(eye_l_x_current)
-        eye_l_y = int(eye_l_y_current)
-        eye_r_x = int(eye_r_x_current)
-        eye_r_y = int(eye_r_y_current)
-        eye_l_width = int(eye_l_width_current)
-        eye_l_height = int(eye_l_height_current)
-        eye_r_width = int(eye_r_width_current)
-        eye_r_height = int(eye_r_height_current)
-        
-        # Check if we're in cyclops mode
-        cyclops_mode = getattr(self.parent, 'cyclops', False)
-        
-        # Smooth transitions for eyelids
-        eyelids_closed_height = int((self.eyelids_closed_height + self.eyelids_closed_height_next) / 2)
-        
-        # Draw closed eyelids if needed
-        if eyelids_closed_height > 0:
-            # For winking, only close one eye
-            if self.is_winking:
-                # Left eye wink
-                if self.wink_left_eye:
-                    pygame.draw.rect(
-                        screen,
-                        (0, 0, 0),  # BLACK
-                        (
-                            eye_l_x,
-                            eye_l_y,
-                            eye_l_width,
-                            eyelids_closed_height
-                        ),
-                        0
-                    )
-                    pygame.draw.rect(
-                        screen,
-                        (0, 0, 0),  # BLACK
-                        (
-                            eye_l_x,
-                            eye_l_y + eye_l_height - eyelids_closed_height,
-                            eye_l_width,
-                            eyelids_closed_height
-                        ),
-                        0
-                    )
-                # Right eye wink (only if not in cyclops mode)
-                elif not cyclops_mode:
-                    pygame.draw.rect(
-                        screen,
-                        (0, 0, 0),  # BLACK
-                        (
-                            eye_r_x,
-                            eye_r_y,
-                            eye_r_width,
-                            eyelids_closed_height
-                        ),
-                        0
-                    )
-                    pygame.draw.rect(
-                        screen,
-                        (0, 0, 0),  # BLACK
-                        (
-                            eye_r_x,
-                            eye_r_y + eye_r_height - eyelids_closed_height,
-                            eye_r_width,
-                            eyelids_closed_height
-                        ),
-                        0
-                    )
-            # Regular blink (both eyes or cyclops eye)
-            else:
-                # Left eye (always drawn)
-                pygame.draw.rect(
-                    screen,
-                    (0, 0, 0),  # BLACK
-                    (
-                        eye_l_x,
-                        eye_l_y,
-                        eye_l_width,
-                        eyelids_closed_height
-                    ),
-                    0
-                )
-                pygame.draw.rect(
-                    screen,
-                    (0, 0, 0),  # BLACK
-                    (
-                        eye_l_x,
-                        eye_l_y + eye_l_height - eyelids_closed_height,
-                        eye_l_width,
-                        eyelids_closed_height
-                    ),
-                    0
-                )
-                
-                # Right eye (only if not in cyclops mode)
-                if not cyclops_mode:
-                    pygame.draw.rect(
-                        screen,
-                        (0, 0, 0),  # BLACK
-                        (
-                            eye_r_x,
-                            eye_r_y,
-                            eye_r_width,
-                            eyelids_closed_height
-                        ),
-                        0
-                    )
-                    pygame.draw.rect(
-                        screen,
-                        (0, 0, 0),  # BLACK
-                        (
-                            eye_r_x,
-                            eye_r_y + eye_r_height - eyelids_closed_height,
-                            eye_r_width,
-                            eyelids_closed_height
-                        ),
-                        0
-                    )
+    def _schedule_blink(self, current_time):
+        """Pick when the auto blinker blinks next, a known deadline to sleep until"""
+        self.auto_blinker_next_time = (current_time + self.auto_blinker_interval
+                                       + self.parent.random.uniform(0, self.auto_blinker_variation))
+    
+    def reset_timers(self, current_time):
+        """Restart the auto blinker and idle timers (e.g. after a clock change)"""
+        self._schedule_blink(current_time)
+        self.idle_mode_last_time = current_time
+        self.idle_next_time = current_time
+        return True
+    
+    def get_closed_height(self, is_left_eye):
+        """Get how far the eyelids close one eye, from the top and from the bottom"""
+        # For winking, only close one eye
+        if self.is_winking and self.wink_left_eye != is_left_eye:
+            return 0
+        # Eyelid height, eased by the parent's interpolator
+        return max(0, int(self.parent.state.eyelids_closed_height))
@@ -0,0 +1,125 @@
+"""
+Background utilities for RoboEyes
+Handles what the face is drawn on: a flat color, an image (a logo, a photo)
+or a gradient. Images and gradients are rendered once into a surface in the
+screen's pixel format, so restoring the regions the face touched is a plain
+copy, about as cheap as filling them with a color.
+"""
+
+import pygame
+
+# How an image is fitted to the screen
+FIT_MODES = ("cover", "contain", "stretch", "center")
+
+
+class Background:
+    def __init__(self, color=(0, 0, 0)):
+        """Initialize a flat background of the given color"""
+        self.color = tuple(color)[:3]
+        self.image = None  # RGBA source image, fitted to the screen when cached
+        self.fit = "cover"
+        self.gradient = None  # (start color, end color, vertical)
+
+        # Screen-format copy of the background, None for a flat color
+        self.surface = None
+        self.dirty = True  # Rebuild the copy before the next restore
+
+    def set_color(self, color):
+        """Use a flat color (behind images with transparency, too)"""
+        self.color = tuple(color)[:3]
+        self.dirty = True
+        return True
+
+    def set_image(self, image, fit="cover"):
+        """Use an image file or surface, fitted to the screen (see FIT_MODES)"""
+        if fit not in FIT_MODES:
+            print(f"Warning: Invalid background fit '{fit}'. Valid fits are: {list(FIT_MODES)}")
+            return False
+        if isinstance(image, str):
+            try:
+                image = pygame.image.load(image)
+            except (pygame.error, OSError) as e:
+                print(f"Warning: Background image could not be loaded: {e}")
+                return False
+        # Plain RGBA, which scales smoothly and needs no display to convert
+        self.image = pygame.image.frombytes(pygame.image.tobytes(image, "RGBA"), image.get_size(), "RGBA")
+        self.fit = fit
+        self.gradient = None
+        self.dirty = True
+        return True
+
+    def set_gradient(self, start, end, vertical=True):
+        """Use a linear gradient, top to bottom (or left to right if not vertical)"""
+        self.gradient = (tuple(start)[:3], tuple(end)[:3], vertical)
+        self.image = None
+        self.dirty = True
+        return True
+
+    def clear(self):
+        """Go back to the flat color"""
+        self.image = None
+        self.gradient = None
+        self.dirty = True
+        return True
+
+    def invalidate(self):
+        """Rebuild the cached background on the next restore (e.g. new screen)"""
+        self.dirty = True
+        return True
+
+    def restore(self, screen, rect=None):
+        """Redraw the background over a region of the screen (all of it by default)"""
+        if self.dirty:
+            self._build(screen)
+        if self.surface is None:
+            screen.fill(self.color, rect)
+        elif rect is None:
+            screen.blit(self.surface, (0, 0))
+        else:
+            screen.blit(self.surface, rect, rect)
+
+    def _build(self, screen):
+        """Render the image or gradient once, in the screen's pixel format"""
+        self.dirty = False
+        if self.image is None and self.gradient is None:
+            self.surface = None
+            return
+        # A copy has exactly the screen's format, so restores are plain copies
+        surface = screen.copy()
+        surface.fill(self.color)
+        if self.gradient is not None:
+            self._draw_gradient(surface)
+        else:
+            image, position = self._fit_image(surface.get_size())
+            surface.blit(image, position)
+        self.surface = surface
+
+    def _draw_gradient(self, surface):
+        """Draw the gradient one line at a time"""
+        start, end, vertical = self.gradient
+        width, height = surface.get_size()
+        steps = height if vertical else width
+        for i in range(steps):
+            t = i / (steps - 1) if steps > 1 else 0.0
+            color = tuple(int(round(a + (b - a) * t)) for a, b in zip(start, end))
+            if vertical:
+                surface.fill(color, (0, i, width, 1))
+            else:
+                surface.fill(color, (i, 0, 1, height))
+
+    def _fit_image(self, size):
+        """Scale the image for the screen, returns it and where it goes"""
+        image = self.image
+        width, height = size
+        image_width, image_height = image.get_size()
+        if self.fit == "stretch":
+            return pygame.transform.smoothscale(image, size), (0, 0)
+        if self.fit == "center":
+            return image, ((width - image_width) // 2, (height - image_height) // 2)
+
+        # Cover fills the screen and crops, contain shows all of the image
+        scale_x, scale_y = width / image_width, height / image_height
+        scale = max(scale_x, scale_y) if self.fit == "cover" else min(scale_x, scale_y)
+        scaled_size = (max(1, round(image_width * scale)), max(1, round(image_height * scale)))
+        image = pygame.transform.smoothscale(image, scaled_size)
+        return image, ((width - scaled_size[0]) // 2, (height - scaled_size[1]) // 2)
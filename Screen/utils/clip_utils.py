@@ -0,0 +1,175 @@
+"""
+Clip utilities for RoboEyes
+Handles animation clip files: clips are authored as JSON, compiled into a
+binary table of per-step samples and cached next to the JSON files, so an
+unchanged clip is loaded without parsing or sampling it again.
+
+Clip file format:
+
+    {
+        "name": "nod",                  (optional, defaults to the file name)
+        "duration": 0.6,                (optional, defaults to the last keyframe)
+        "tracks": [
+            {
+                "property": "y",        (see timeline_utils.PROPERTIES)
+                "keyframes": [[0.0, 0], [0.2, 10], [0.4, 0]],
+                "interpolation": "cubic",   (linear, cubic or step; default linear)
+                "priority": 0,
+                "weight": 1.0,
+                "blend": "add"              (override or add; default override)
+            }
+        ]
+    }
+"""
+
+import glob
+import json
+import os
+import struct
+
+import numpy
+
+from utils.timeline_utils import PROPERTIES, BLENDS, Clip, CompiledClip, Track
+
+# Directory with the clips loaded at startup
+CLIP_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "clips")
+
+# Compiled table layout, little-endian:
+#   header   magic, version, step, source mtime (ns), source size, frames, tracks, name length
+#   name     UTF-8
+#   tracks   property index, priority, weight, blend index, then frames + 1 float32 samples
+TABLE_MAGIC = b"RECL"
+TABLE_VERSION = 1
+TABLE_HEADER = struct.Struct("<4sHdqqIIH")
+TABLE_TRACK = struct.Struct("<BhdB")
+PROPERTY_NAMES = tuple(PROPERTIES)
+
+
+def parse_clip(data, default_name):
+    """Build a Clip from parsed JSON data (raises ValueError if invalid)"""
+    if not isinstance(data, dict) or not isinstance(data.get("tracks"), list) or not data["tracks"]:
+        raise ValueError("a clip needs a non-empty 'tracks' list")
+    tracks = []
+    for entry in data["tracks"]:
+        if "property" not in entry or "keyframes" not in entry:
+            raise ValueError("every track needs 'property' and 'keyframes'")
+        tracks.append(Track(
+            entry["property"],
+            [(t, v) for t, v in entry["keyframes"]],
+            entry.get("interpolation", "linear"),
+            int(entry.get("priority", 0)),
+            float(entry.get("weight", 1.0)),
+            entry.get("blend", "override")
+        ))
+    return Clip(data.get("name", default_name), tracks, data.get("duration"))
+
+
+def write_table(path, compiled, source_mtime, source_size):
+    """Write a compiled clip as a binary table"""
+    name = compiled.name.encode("utf-8")
+    parts = [
+        TABLE_HEADER.pack(TABLE_MAGIC, TABLE_VERSION, compiled.step, source_mtime, source_size,
+                          compiled.frames, len(compiled.tracks), len(name)),
+        name
+    ]
+    for property, priority, weight, blend, curve in compiled.tracks:
+        parts.append(TABLE_TRACK.pack(PROPERTY_NAMES.index(property), priority, weight, BLENDS.index(blend)))
+        parts.append(numpy.asarray(curve, dtype="<f4").tobytes())
+    with open(path, "wb") as f:
+        f.write(b"".join(parts))
+
+
+def read_table(path):
+    """Read a binary table, returns (step, source mtime, source size, CompiledClip)"""
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, step, source_mtime, source_size, frames, count, name_length = TABLE_HEADER.unpack_from(data)
+    if magic != TABLE_MAGIC or version != TABLE_VERSION:
+        raise ValueError("not a compiled clip table")
+    offset = TABLE_HEADER.size
+    name = data[offset:offset + name_length].decode("utf-8")
+    offset += name_length
+
+    tracks = []
+    samples = frames + 1
+    for _ in range(count):
+        property, priority, weight, blend = TABLE_TRACK.unpack_from(data, offset)
+        offset += TABLE_TRACK.size
+        curve = numpy.frombuffer(data, dtype="<f4", count=samples, offset=offset)
+        offset += samples * 4
+        tracks.append((PROPERTY_NAMES[property], priority, weight, BLENDS[blend], curve))
+    return step, source_mtime, source_size, CompiledClip(name, frames, tracks, step)
+
+
+class ClipLoader:
+    def __init__(self, directory=CLIP_DIRECTORY):
+        """Initialize a loader for the JSON clips in a directory"""
+        self.directory = directory
+        self.cache_directory = os.path.join(directory, "__pycache__")
+
+        # Clips loaded by this loader: path -> (mtime, size, step, compiled)
+        self.loaded = {}
+
+        # Statistics
+        self.compiled_count = 0
+        self.table_hits = 0
+        self.memory_hits = 0
+
+    def load(self, path, step):
+        """Load one clip file sampled at step seconds, None if it can't be loaded"""
+        try:
+            stat = os.stat(path)
+        except OSError as e:
+            print(f"Warning: Could not load animation clip '{path}': {e}")
+            return None
+        key = (stat.st_mtime_ns, stat.st_size, step)
+
+        # Already loaded and unchanged
+        entry = self.loaded.get(path)
+        if entry is not None and entry[:3] == key:
+            self.memory_hits += 1
+            return entry[3]
+
+        # Compiled table from an earlier run
+        table_path = self._table_path(path)
+        try:
+            if os.path.exists(table_path):
+                table_step, mtime, size, compiled = read_table(table_path)
+                if (mtime, size, table_step) == key:
+                    self.table_hits += 1
+                    self.loaded[path] = key + (compiled,)
+                    return compiled
+        except (OSError, ValueError, struct.error):
+            pass  # Stale or damaged table, compile again
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            clip = parse_clip(data, os.path.splitext(os.path.basename(path))[0])
+        except (OSError, ValueError, TypeError) as e:
+            print(f"Warning: Could not load animation clip '{path}': {e}")
+            return None
+        compiled = clip.compile(step)
+        self.compiled_count += 1
+        self.loaded[path] = key + (compiled,)
+
+        # A read-only clip directory only costs the compile next time
+        try:
+            os.makedirs(self.cache_directory, exist_ok=True)
+            write_table(table_path, compiled, stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            pass
+        return compiled
+
+    def load_directory(self, step):
+        """Load every *.json clip in the directory, in name order"""
+        clips = []
+        for path in sorted(glob.glob(os.path.join(self.directory, "*.json"))):
+            compiled = self.load(path, step)
+            if compiled is not None:
+                clips.append(compiled)
+        return clips
+
+    def _table_path(self, path):
+        """Path of the compiled table for a clip file"""
+        return os.path.join(self.cache_directory, os.path.splitext(os.path.basename(path))[0] + ".clip")
@@ -0,0 +1,45 @@
+"""
+Clock utilities for RoboEyes
+Handles the time sources that drive the simulation, so animations can run
+in real time or on a deterministic, manually advanced clock.
+"""
+
+import time
+
+
+class MonotonicClock:
+    """Real time from time.monotonic() (the default)"""
+
+    # Real-time clocks are paced by the frame limiter
+    realtime = True
+
+    def now(self):
+        """Get the current time in seconds"""
+        return time.monotonic()
+
+
+class SimulationClock:
+    """Manually advanced clock for deterministic and faster-than-real-time runs"""
+
+    # Simulated clocks never sleep in the frame limiter
+    realtime = False
+
+    def __init__(self, start=0.0, frame_time=None):
+        """Start at the given time; frame_time advances the clock on every frame"""
+        self.time = start
+        self.frame_time = frame_time
+
+    def now(self):
+        """Get the current simulated time in seconds"""
+        return self.time
+
+    def advance(self, seconds):
+        """Move the clock forward by the given number of seconds"""
+        self.time += seconds
+        return self.time
+
+    def advance_frame(self):
+        """Move the clock forward by one frame (if a frame time is set)"""
+        if self.frame_time:
+            self.time += self.frame_time
+        return self.time
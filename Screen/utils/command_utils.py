@@ -0,0 +1,97 @@
+"""
+Command queue utilities for RoboEyes
+Handles handing setter calls from control threads (planner, sensors, a
+network thread) to the render loop, which applies them all at the start of
+the next frame so a frame never sees half of a change.
+
+RoboEyes methods marked with @render_thread_command run directly on the
+render thread and are queued when called from any other thread.
+"""
+
+import functools
+import threading
+import time
+from collections import deque
+
+
+def render_thread_command(method):
+    """Queue calls from other threads instead of running them right away"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        queue = self.commands
+        if queue.render_thread is not None and threading.get_ident() != queue.render_thread:
+            queue.put(method, self, args, kwargs)
+            return True
+        return method(self, *args, **kwargs)
+    return wrapper
+
+
+class CommandQueue:
+    def __init__(self):
+        """Initialize an empty queue; the render thread is set by RoboEyes"""
+        self.render_thread = None
+
+        # deque.append and deque.popleft are atomic, so no lock is needed
+        # with any number of producers and the render thread as consumer
+        self.pending = deque()
+
+        # Called after every put(), e.g. to end an idle sleep of the render loop
+        self.wakeup = None
+
+        # Statistics
+        self.commands_queued = 0
+        self.commands_applied = 0
+        self.commands_failed = 0
+        self.max_depth = 0
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+        self.total_latency = 0.0
+
+    def put(self, method, instance, args, kwargs):
+        """Queue a method call for the render thread (any thread)"""
+        self.pending.append((method, instance, args, kwargs, time.perf_counter()))
+        self.commands_queued += 1
+        depth = len(self.pending)
+        if depth > self.max_depth:
+            self.max_depth = depth
+        if self.wakeup is not None:
+            self.wakeup()
+
+    def apply_pending(self):
+        """Run every command queued so far, in order (render thread only)"""
+        pending = self.pending
+        if not pending:
+            return 0
+
+        # Only what is queued now belongs to this frame; later commands wait
+        count = len(pending)
+        now = time.perf_counter()
+        for _ in range(count):
+            method, instance, args, kwargs, queued_time = pending.popleft()
+            try:
+                method(instance, *args, **kwargs)
+            except Exception as e:
+                self.commands_failed += 1
+                print(f"Warning: Queued command {method.__name__} failed: {e}")
+
+            latency = now - queued_time
+            self.last_latency = latency
+            self.total_latency += latency
+            if latency > self.max_latency:
+                self.max_latency = latency
+        self.commands_applied += count
+        return count
+
+    def get_stats(self):
+        """Get queue depth and latency statistics (latencies in ms)"""
+        applied = self.commands_applied
+        return {
+            'depth': len(self.pending),
+            'max_depth': self.max_depth,
+            'queued': self.commands_queued,
+            'applied': applied,
+            'failed': self.commands_failed,
+            'last_latency_ms': self.last_latency * 1000.0,
+            'mean_latency_ms': self.total_latency / applied * 1000.0 if applied else 0.0,
+            'max_latency_ms': self.max_latency * 1000.0
+        }
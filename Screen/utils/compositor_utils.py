@@ -0,0 +1,181 @@
+"""
+Compositor utilities for RoboEyes
+Handles retained-mode drawing: the face is a stack of named layers (eyes,
+tears, mouth...), each keeping its rendered surface, the key of the inputs
+it was rendered from and a version stamp. A layer is only re-rendered when
+its key changes; moving it only changes its origin. Every frame the visible
+layers are composited in order.
+
+Content that is cheaper to draw than to blit (a few sparkle dots) goes in
+direct layers: they keep a key and version stamp too, but draw straight
+onto the target while compositing instead of caching pixels.
+
+Layers are rendered by ordinary blending onto a transparent surface, which
+leaves premultiplied colors, and composited with BLEND_PREMULTIPLIED, so the
+result matches drawing the same shapes straight onto the screen.
+"""
+
+import pygame
+
+from utils.sprites_utils import new_sprite
+
+
+class Layer:
+    def __init__(self, name):
+        """Initialize an empty, hidden layer"""
+        self.name = name
+        self.key = None
+        self.version = 0  # Bumped whenever the pixels change
+        self.surface = None
+        self.origin = (0, 0)
+        self.visible = False
+        self.premultiplied = True  # False for straight-alpha sprites
+        self.area = None  # Part of the surface shown, None for all of it
+        self.render = None  # Direct layers: (render, args, rects) drawn while compositing
+
+        # Statistics
+        self.renders = 0
+        self.reuses = 0
+
+
+class Compositor:
+    def __init__(self, names):
+        """Initialize the layer stack, bottom layer first"""
+        self.layers = [Layer(name) for name in names]
+        self.by_name = {layer.name: layer for layer in self.layers}
+        self.stamp = 0  # Bumped whenever any layer changes or moves
+
+    def update(self, name, key, origin, size, render, *args):
+        """Bring a layer up to date, calling render(surface, *args) only when key changed
+
+        A key of None hides the layer. Returns True if the layer was rendered.
+        """
+        layer = self.by_name[name]
+        if key is None:
+            self._hide(layer)
+            return False
+        self._move(layer, origin)
+        surface = layer.surface
+        if key == layer.key and layer.premultiplied and surface is not None and surface.get_size() == size:
+            layer.reuses += 1
+            return False
+
+        if surface is None or not layer.premultiplied or surface.get_size() != size:
+            surface = new_sprite(*size)
+        else:
+            surface.fill((0, 0, 0, 0))
+        render(surface, *args)
+        self._show(layer, key, surface, True)
+        return True
+
+    def set_sprite(self, name, key, origin, sprite, area=None):
+        """Show a cached straight-alpha sprite as a layer, without copying it
+
+        area limits the layer to part of the sprite (origin is where that
+        part goes), e.g. to clip an eye to its eyelids.
+        """
+        layer = self.by_name[name]
+        if key is None:
+            self._hide(layer)
+            return False
+        self._move(layer, origin)
+        if key == layer.key and layer.surface is sprite and area == layer.area:
+            layer.reuses += 1
+            return False
+        self._show(layer, key, sprite, False)
+        layer.area = area
+        return True
+
+    def draw(self, name, key, rects, render, *args):
+        """Draw a layer directly while compositing, calling render(surface, *args)
+
+        rects are the screen regions it covers beyond those of the layers
+        below it (often none); a key of None hides it.
+        Returns True if the layer changed.
+        """
+        layer = self.by_name[name]
+        if key is None:
+            self._hide(layer)
+            return False
+        layer.render = (render, args, rects)
+        if key == layer.key and layer.visible:
+            layer.reuses += 1
+            return False
+        self._show(layer, key, None, False)
+        layer.origin = None
+        return True
+
+    def hide(self, name):
+        """Hide a layer until its next update"""
+        self._hide(self.by_name[name])
+
+    def signature(self):
+        """Stamp of the whole stack; equal signatures mean equal frames"""
+        return self.stamp
+
+    def rects(self):
+        """Screen regions covered by the visible layers"""
+        rects = []
+        for layer in self.layers:
+            if not layer.visible:
+                continue
+            if layer.surface is None:
+                rects.extend(layer.render[2])
+            elif layer.area is not None:
+                rects.append(pygame.Rect(layer.origin, layer.area.size))
+            else:
+                rects.append(pygame.Rect(layer.origin, layer.surface.get_size()))
+        return rects
+
+    def composite(self, surface):
+        """Blit the visible layers onto a surface, bottom first"""
+        for layer in self.layers:
+            if not layer.visible:
+                continue
+            if layer.surface is None:
+                render, args, _ = layer.render
+                render(surface, *args)
+            elif layer.premultiplied:
+                surface.blit(layer.surface, layer.origin, special_flags=pygame.BLEND_PREMULTIPLIED)
+            else:
+                surface.blit(layer.surface, layer.origin, layer.area)
+
+    def invalidate(self):
+        """Re-render every layer on its next update (e.g. after a display change)"""
+        for layer in self.layers:
+            layer.key = None
+            layer.surface = None
+        self.stamp += 1
+        return True
+
+    def get_stats(self):
+        """Renders and reuses per layer"""
+        return {layer.name: {'renders': layer.renders, 'reuses': layer.reuses, 'version': layer.version}
+                for layer in self.layers}
+
+    def _show(self, layer, key, surface, premultiplied):
+        """Make a layer show new pixels"""
+        layer.key = key
+        layer.surface = surface
+        layer.premultiplied = premultiplied
+        layer.area = None
+        if surface is not None:
+            layer.render = None
+        layer.visible = True
+        layer.version += 1
+        layer.renders += 1
+        self.stamp += 1
+
+    def _hide(self, layer):
+        """Hide a layer, keeping its surface for reuse"""
+        if layer.visible:
+            layer.visible = False
+            layer.version += 1
+            self.stamp += 1
+        layer.key = None
+
+    def _move(self, layer, origin):
+        """Move a layer without changing its pixels"""
+        if origin != layer.origin:
+            layer.origin = origin
+            self.stamp += 1
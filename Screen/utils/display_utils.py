@@ -0,0 +1,409 @@
+"""
+Display utilities for RoboEyes
+Handles the display sinks the eyes render into: a pygame window, an
+offscreen surface, a memory-mapped Linux framebuffer or a numpy array, or
+several of them at once (MultiSink).
+
+Every sink hands RoboEyes a pygame Surface to draw on, so the drawing code
+in the handlers works unchanged against any of them.
+"""
+
+import mmap
+import os
+import queue
+import threading
+
+import pygame
+
+try:
+    import numpy
+except ImportError:  # numpy is only needed by ArraySink and scaled panels
+    numpy = None
+
+
+class WindowSink:
+    """Present frames in a pygame window (the default)"""
+
+    # Window sinks deliver keyboard and window events
+    interactive = True
+
+    def __init__(self, caption="RoboEyes Python"):
+        self.caption = caption
+        self.surface = None
+
+    def open(self, width, height):
+        """Open the window and return the surface to draw on"""
+        self.surface = pygame.display.set_mode((width, height))
+        pygame.display.set_caption(self.caption)
+        return self.surface
+
+    def present(self, rects=None):
+        """Show the frame, either completely or only the given regions"""
+        if rects is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(rects)
+
+    def close(self):
+        """Release the window (pygame.quit() closes it for good)"""
+        self.surface = None
+
+
+class SurfaceSink:
+    """Render into an offscreen pygame Surface (no window needed)"""
+
+    interactive = False
+
+    def __init__(self, surface=None):
+        self.surface = surface
+        self.frames_presented = 0
+
+    def open(self, width, height):
+        """Create the offscreen surface, or check the one that was passed in"""
+        if self.surface is None:
+            self.surface = pygame.Surface((width, height))
+        elif self.surface.get_size() != (width, height):
+            print(f"Warning: Offscreen surface is {self.surface.get_size()}, expected {(width, height)}")
+            return None
+        return self.surface
+
+    def present(self, rects=None):
+        """Nothing to show, the frame is already in the surface"""
+        self.frames_presented += 1
+
+    def close(self):
+        """Nothing to release"""
+        pass
+
+
+class FramebufferSink:
+    """Render straight to a memory-mapped Linux framebuffer like /dev/fb0"""
+
+    interactive = False
+
+    def __init__(self, device="/dev/fb0"):
+        self.device = device
+        self.surface = None
+        self.fd = None
+        self.map = None
+        self.stride = 0
+        self.bits_per_pixel = 0
+
+    def open(self, width, height):
+        """Map the framebuffer and return a surface in its pixel format"""
+        try:
+            fb_width, fb_height, self.bits_per_pixel, self.stride = self._read_geometry()
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not read framebuffer geometry for {self.device}: {e}")
+            return None
+
+        if width > fb_width or height > fb_height:
+            print(f"Warning: Framebuffer is {fb_width}x{fb_height}, too small for {width}x{height}")
+            return None
+
+        # Draw in the framebuffer's own pixel format so presenting is a plain copy
+        if self.bits_per_pixel == 16:
+            self.surface = pygame.Surface((width, height), 0, 16, (0xF800, 0x07E0, 0x001F, 0))
+        elif self.bits_per_pixel == 32:
+            self.surface = pygame.Surface((width, height), 0, 32, (0xFF0000, 0x00FF00, 0x0000FF, 0))
+        else:
+            print(f"Warning: Unsupported framebuffer depth {self.bits_per_pixel} bpp")
+            return None
+
+        try:
+            self.fd = os.open(self.device, os.O_RDWR)
+            self.map = mmap.mmap(self.fd, self.stride * fb_height, mmap.MAP_SHARED, mmap.PROT_WRITE | mmap.PROT_READ)
+        except OSError as e:
+            print(f"Warning: Could not map framebuffer {self.device}: {e}")
+            self.close()
+            return None
+        return self.surface
+
+    def present(self, rects=None):
+        """Copy the frame (or only the given regions) into the framebuffer"""
+        if rects is None:
+            rects = [self.surface.get_rect()]
+
+        bytes_per_pixel = self.bits_per_pixel // 8
+        pitch = self.surface.get_pitch()
+        pixels = memoryview(self.surface.get_view('0'))
+        try:
+            for rect in rects:
+                rect = self.surface.get_rect().clip(rect)
+                row_bytes = rect.width * bytes_per_pixel
+                for y in range(rect.top, rect.bottom):
+                    src = y * pitch + rect.left * bytes_per_pixel
+                    dst = y * self.stride + rect.left * bytes_per_pixel
+                    self.map[dst:dst + row_bytes] = pixels[src:src + row_bytes]
+        finally:
+            # Release the view so the surface is unlocked for drawing
+            pixels.release()
+
+    def close(self):
+        """Unmap and close the framebuffer device"""
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    def _read_geometry(self):
+        """Read width, height, depth and line length from sysfs"""
+        sysfs = os.path.join("/sys/class/graphics", os.path.basename(self.device))
+        with open(os.path.join(sysfs, "virtual_size")) as f:
+            fb_width, fb_height = (int(v) for v in f.read().strip().split(","))
+        with open(os.path.join(sysfs, "bits_per_pixel")) as f:
+            bits_per_pixel = int(f.read().strip())
+        with open(os.path.join(sysfs, "stride")) as f:
+            stride = int(f.read().strip())
+        return fb_width, fb_height, bits_per_pixel, stride
+
+
+class ArraySink:
+    """Render straight into a numpy array of shape (height, width, 3)"""
+
+    interactive = False
+
+    def __init__(self, array=None):
+        self.array = array
+        self.surface = None
+        self.frames_presented = 0
+
+    def open(self, width, height):
+        """Wrap the array memory in a surface, so drawing writes the array"""
+        if numpy is None:
+            print("Warning: ArraySink needs numpy, which is not installed")
+            return None
+
+        if self.array is None:
+            self.array = numpy.zeros((height, width, 3), dtype=numpy.uint8)
+        elif self.array.shape != (height, width, 3) or self.array.dtype != numpy.uint8:
+            print(f"Warning: Array must be uint8 with shape {(height, width, 3)}, got {self.array.dtype} {self.array.shape}")
+            return None
+        elif not self.array.flags['C_CONTIGUOUS']:
+            print("Warning: Array must be C-contiguous")
+            return None
+
+        self.surface = pygame.image.frombuffer(self.array, (width, height), 'RGB')
+        return self.surface
+
+    def present(self, rects=None):
+        """Nothing to copy, the surface shares the array's memory"""
+        self.frames_presented += 1
+
+    def close(self):
+        """Drop the surface (the array keeps the last frame)"""
+        self.surface = None
+
+
+class Panel:
+    """One display of a MultiSink, at its own resolution
+
+    The master frame is scaled into the panel through row and column lookup
+    tables computed once for the panel's resolution (nearest neighbour), and
+    only the regions that changed are scaled. Presenting runs on the panel's
+    own thread; while it is busy, new frames are skipped for this panel and
+    their regions merged into the next one, so a slow panel (e.g. over SPI)
+    never stalls the render loop or the other panels.
+    """
+
+    def __init__(self, sink, size=None, threaded=None):
+        self.sink = sink
+        self.size = size  # None: the master resolution
+        # Windows present on the thread that opened them (and deliver events)
+        self.threaded = not sink.interactive if threaded is None else threaded
+        self.surface = None
+        self.scaled = None  # Master-format surface at the panel resolution
+        self.columns = None
+        self.rows = None
+
+        self.backlog = []   # Regions of skipped frames, None for the whole frame
+        self.idle = threading.Event()
+        self.idle.set()
+        self.pending = queue.Queue(maxsize=1)
+        self.thread = None
+
+        # Statistics
+        self.frames_presented = 0
+        self.frames_skipped = 0
+
+    def open(self, master):
+        """Open the panel's sink and build its scale tables for the master surface"""
+        width, height = master.get_size()
+        panel_width, panel_height = self.size or (width, height)
+        self.surface = self.sink.open(panel_width, panel_height)
+        if self.surface is None:
+            return False
+
+        if (panel_width, panel_height) != (width, height):
+            if numpy is None:
+                print("Warning: Scaled panels need numpy, which is not installed")
+                return False
+            # Panel pixel i shows the master pixel under its center
+            self.columns = ((numpy.arange(panel_width) + 0.5) * width / panel_width).astype(numpy.intp)
+            self.rows = ((numpy.arange(panel_height) + 0.5) * height / panel_height).astype(numpy.intp)
+            self.scaled = pygame.Surface((panel_width, panel_height), 0, master)
+
+        if self.threaded:
+            self.thread = threading.Thread(target=self._present_frames, name="RoboEyesPanel", daemon=True)
+            self.thread.start()
+        return True
+
+    @property
+    def behind(self):
+        """Regions of skipped frames are still waiting to be presented"""
+        return bool(self.backlog)
+
+    def submit(self, master, rects):
+        """Copy the changed regions of a master frame and present them (render thread)"""
+        if rects is not None and not rects and not self.backlog:
+            return True
+        if not self.idle.is_set():
+            # Still presenting an older frame: catch up on the next one
+            self.frames_skipped += 1
+            self.backlog.append(None if rects is None else [pygame.Rect(rect) for rect in rects])
+            return False
+
+        if self.backlog:
+            self.backlog.append(rects)
+            rects = None if any(r is None for r in self.backlog) else [r for group in self.backlog for r in group]
+            self.backlog = []
+        panel_rects = self._copy(master, rects)
+
+        if self.thread is None:
+            self.sink.present(panel_rects)
+            self.frames_presented += 1
+        else:
+            self.idle.clear()
+            self.pending.put((panel_rects,))
+        return True
+
+    def close(self):
+        """Finish the frame being presented, stop the thread and close the sink"""
+        if self.thread is not None:
+            self.idle.wait()
+            self.pending.put(None)
+            self.thread.join()
+            self.thread = None
+        self.sink.close()
+
+    def _copy(self, master, rects):
+        """Copy (and scale) master regions into the panel, returns the panel regions"""
+        if self.scaled is None:
+            if rects is None:
+                self.surface.blit(master, (0, 0))
+            else:
+                for rect in rects:
+                    self.surface.blit(master, rect, rect)
+            # The panel thread gets its own list, the caller's is reused
+            return None if rects is None else [pygame.Rect(rect) for rect in rects]
+
+        if rects is None:
+            rects = [master.get_rect()]
+        panel_rects = []
+        source = pygame.surfarray.pixels2d(master)
+        target = pygame.surfarray.pixels2d(self.scaled)
+        try:
+            for rect in rects:
+                # Panel pixels whose source pixel lies inside the master region
+                left, right = (int(i) for i in numpy.searchsorted(self.columns, (rect.left, rect.right)))
+                top, bottom = (int(i) for i in numpy.searchsorted(self.rows, (rect.top, rect.bottom)))
+                if left >= right or top >= bottom:
+                    continue
+                target[left:right, top:bottom] = source[numpy.ix_(self.columns[left:right], self.rows[top:bottom])]
+                panel_rects.append(pygame.Rect(left, top, right - left, bottom - top))
+        finally:
+            # Release the arrays so both surfaces are unlocked for blitting
+            del source, target
+
+        # One blit per region converts to the panel's pixel format
+        for rect in panel_rects:
+            self.surface.blit(self.scaled, rect, rect)
+        return panel_rects
+
+    def _present_frames(self):
+        """Panel thread: present frames until close() queues None"""
+        while True:
+            item = self.pending.get()
+            if item is None:
+                return
+            rects, = item
+            try:
+                self.sink.present(rects)
+                self.frames_presented += 1
+            finally:
+                self.idle.set()
+
+
+class MultiSink:
+    """Render once and present the frame on several displays
+
+    RoboEyes draws into an offscreen master surface; every panel gets a
+    copy at its own resolution, e.g. a face panel and a small status panel:
+
+        MultiSink(FramebufferSink("/dev/fb0"), (FramebufferSink("/dev/fb1"), (320, 160)))
+
+    Each panel is a sink, a (sink, (width, height)) pair or a Panel.
+    """
+
+    def __init__(self, *panels):
+        self.panels = []
+        for panel in panels:
+            self.add_panel(panel)
+        self.surface = None
+
+    @property
+    def interactive(self):
+        """Events come from whichever panel is a window"""
+        return any(panel.sink.interactive for panel in self.panels)
+
+    @property
+    def behind(self):
+        """Some panel skipped frames and needs present() even if nothing changed"""
+        return any(panel.behind for panel in self.panels)
+
+    def add_panel(self, panel, size=None):
+        """Add a display (before begin())"""
+        if isinstance(panel, tuple):
+            panel, size = panel
+        if not isinstance(panel, Panel):
+            panel = Panel(panel, size)
+        self.panels.append(panel)
+        return panel
+
+    def open(self, width, height):
+        """Open every panel, returns the master surface to draw on"""
+        if not self.panels:
+            print("Warning: MultiSink has no panels")
+            return None
+        # A window has to be opened before surfaces can match the display format
+        self.panels.sort(key=lambda panel: not panel.sink.interactive)
+        self.surface = pygame.Surface((width, height))
+        for panel in self.panels:
+            if not panel.open(self.surface):
+                print(f"Warning: Panel {type(panel.sink).__name__} could not be opened")
+                self.close()
+                return None
+        return self.surface
+
+    def present(self, rects=None):
+        """Hand the frame (or only the given regions) to every panel"""
+        for panel in self.panels:
+            panel.submit(self.surface, rects)
+
+    def close(self):
+        """Stop and close every panel"""
+        for panel in self.panels:
+            if panel.surface is not None:
+                panel.close()
+                panel.surface = None
+
+    def get_stats(self):
+        """Frames presented and skipped per panel"""
+        return [{
+            'sink': type(panel.sink).__name__,
+            'size': panel.surface.get_size() if panel.surface is not None else panel.size,
+            'presented': panel.frames_presented,
+            'skipped': panel.frames_skipped
+        } for panel in self.panels]
@@ -0,0 +1,173 @@
+"""
+Easing utilities for RoboEyes
+Handles moving every animated value of the EyeState towards its target in
+one vectorized step per simulation tick, with a per-property easing:
+
+    exponential   close a fixed fraction of the gap per second (half_life)
+    spring        critically damped spring, no overshoot (omega in rad/s)
+    cubic         smoothstep from the value at the last target change (duration)
+"""
+
+import numpy
+
+from utils.state_utils import FIELDS, TARGET, CURRENT
+
+EXPONENTIAL = "exponential"
+SPRING = "spring"
+CUBIC = "cubic"
+EASINGS = (EXPONENTIAL, SPRING, CUBIC)
+
+# Channels are the fields of the TARGET block, in order
+CHANNELS = FIELDS[TARGET]
+
+
+def _channels(*names):
+    """Channel indices of the given target fields"""
+    return tuple(CHANNELS.index(name) for name in names)
+
+
+# Properties that can be given their own easing
+GROUPS = {
+    "size": _channels("eye_l_width", "eye_l_height", "eye_r_width", "eye_r_height"),
+    "border_radius": _channels("eye_l_border_radius", "eye_r_border_radius"),
+    "position": _channels("eye_l_x_next", "eye_l_y_next", "eye_r_x_next", "eye_r_y_next"),
+    "eyelids_closed": _channels("eyelids_closed_height_next"),
+    "eyelids_tired": _channels("eyelids_tired_height_next"),
+}
+
+# (easing, parameter) per group. Halving per 60 Hz step matches the
+# original "current = (current + target) / 2" smoothing.
+DEFAULT_EASINGS = {
+    "size": (EXPONENTIAL, 1.0 / 60),
+    "border_radius": (EXPONENTIAL, 1.0 / 60),
+    "position": (SPRING, 30.0),
+    "eyelids_closed": (EXPONENTIAL, 1.0 / 60),
+    "eyelids_tired": (CUBIC, 0.25),
+}
+
+# Gaps smaller than this snap to the target, so values settle exactly
+SNAP_DISTANCE = 1e-3
+
+
+class Interpolator:
+    def __init__(self, state):
+        """Initialize with the EyeState whose CURRENT block follows its TARGET block"""
+        self.state = state
+        count = len(CHANNELS)
+
+        # Per-channel easing parameters
+        self.easing = [EXPONENTIAL] * count
+        self.parameter = numpy.zeros(count)
+
+        # Per-channel motion state
+        self.velocity = numpy.zeros(count)        # spring
+        self.start = numpy.zeros(count)           # cubic: value at the target change
+        self.progress = numpy.ones(count)         # cubic: 0..1 through the duration
+        self.last_target = numpy.zeros(count)     # cubic: detects target changes
+
+        # Channel index arrays per easing, built from the per-channel settings
+        self.channels = {}
+        self.alpha = None  # Exponential step fractions, cached per step size
+        self.alpha_dt = None
+
+        for group, (easing, parameter) in DEFAULT_EASINGS.items():
+            self.set_easing(group, easing, parameter)
+
+    def set_easing(self, group, easing, parameter):
+        """Set the easing of a property group (see GROUPS and EASINGS)
+
+        parameter is the half-life in seconds (exponential), the natural
+        frequency in rad/s (spring) or the duration in seconds (cubic).
+        """
+        if group not in GROUPS:
+            print(f"Warning: Invalid easing group '{group}'. Valid groups are: {list(GROUPS)}")
+            return False
+        if easing not in EASINGS:
+            print(f"Warning: Invalid easing '{easing}'. Valid easings are: {list(EASINGS)}")
+            return False
+        if parameter <= 0:
+            print(f"Warning: Easing parameter must be positive, got {parameter}")
+            return False
+
+        channels = list(GROUPS[group])
+        for channel in channels:
+            self.easing[channel] = easing
+            self.parameter[channel] = parameter
+        # Only this group starts over, from where it is now; the other groups
+        # keep their motion
+        self.velocity[channels] = 0.0
+        self.start[channels] = self.state.array[CURRENT][channels]
+        self.progress[channels] = 0.0
+        self.last_target[channels] = self.state.array[TARGET][channels]
+        self.channels = {
+            name: numpy.array([i for i, e in enumerate(self.easing) if e == name], dtype=numpy.intp)
+            for name in EASINGS
+        }
+        self.alpha_dt = None
+        return True
+
+    def snap(self, group=None):
+        """Jump the current values of a group (default: all) to their targets"""
+        channels = list(GROUPS[group]) if group is not None else slice(None)
+        current = self.state.array[CURRENT]
+        target = self.state.array[TARGET]
+        current[channels] = target[channels]
+        self.velocity[channels] = 0.0
+        self.progress[channels] = 1.0
+        self.last_target[channels] = target[channels]
+        return True
+
+    def is_settled(self):
+        """Check if every current value rests at its target"""
+        array = self.state.array
+        return not (array[TARGET] != array[CURRENT]).any() and not self.velocity.any()
+
+    def step(self, dt):
+        """Move all current values towards their targets by dt seconds"""
+        array = self.state.array
+        current = array[CURRENT]
+        target = array[TARGET]
+
+        # Nothing to do once everything has settled
+        if not (target != current).any() and not self.velocity.any():
+            return False
+
+        channels = self.channels[EXPONENTIAL]
+        if channels.size:
+            if dt != self.alpha_dt:
+                self.alpha = 1.0 - numpy.exp2(-dt / self.parameter[channels])
+                self.alpha_dt = dt
+            current[channels] += (target[channels] - current[channels]) * self.alpha
+
+        channels = self.channels[SPRING]
+        if channels.size:
+            # Exact critically damped spring step, stable for any dt
+            omega = self.parameter[channels]
+            decay = numpy.exp(-omega * dt)
+            goal = target[channels]
+            delta = current[channels] - goal
+            velocity = self.velocity[channels]
+            temp = (velocity + omega * delta) * dt
+            self.velocity[channels] = (velocity - omega * temp) * decay
+            current[channels] = goal + (delta + temp) * decay
+
+        channels = self.channels[CUBIC]
+        if channels.size:
+            goal = target[channels]
+            changed = goal != self.last_target[channels]
+            if changed.any():
+                restarted = channels[changed]
+                self.start[restarted] = current[restarted]
+                self.progress[restarted] = 0.0
+                self.last_target[restarted] = target[restarted]
+            progress = numpy.minimum(self.progress[channels] + dt / self.parameter[channels], 1.0)
+            self.progress[channels] = progress
+            start = self.start[channels]
+            current[channels] = start + (goal - start) * (progress * progress * (3.0 - 2.0 * progress))
+
+        # Settle exactly (also stops the springs)
+        settled = numpy.abs(target - current) < SNAP_DISTANCE
+        current[settled] = target[settled]
+        self.velocity[settled] = 0.0
+        return True
+
@@ -0,0 +1,138 @@
+"""
+Gaze utilities for RoboEyes
+Handles continuous gaze targeting: a normalized look-at target that any
+thread may set, critically damped smoothing towards it on the render
+thread, and a precomputed linear mapping from gaze to per-eye offsets.
+"""
+
+import math
+
+import numpy
+
+# Rows of the gaze mapping, in the order map_gaze returns them
+OFFSET_ROWS = ("left_x", "left_y", "right_x", "right_y", "left_height", "right_height")
+
+
+def gaze_features(x, y):
+    """Feature vector(s) the mapping is linear in: x, y, max(x, 0), max(-x, 0), 1
+
+    x and y may be floats or equally shaped arrays.
+    """
+    x = numpy.asarray(x, dtype=numpy.float64)
+    y = numpy.asarray(y, dtype=numpy.float64)
+    return numpy.stack((x, y, numpy.maximum(x, 0.0), numpy.maximum(-x, 0.0), numpy.ones_like(x)), axis=-1)
+
+
+class GazeController:
+    def __init__(self, parent):
+        """Initialize gaze with reference to parent RoboEyes object"""
+        self.parent = parent
+
+        # Target in normalized coordinates, x and y in [-1, 1]. A single tuple
+        # assignment is atomic, so other threads may set it at any time.
+        self.target = (0.0, 0.0)
+
+        # Smoothed gaze and its velocity (render thread only)
+        self.x = 0.0
+        self.y = 0.0
+        self.velocity_x = 0.0
+        self.velocity_y = 0.0
+        self.omega = 15.0  # Natural frequency in rad/s, settles in about 0.3 s
+
+        # Mapping parameters
+        self.range = 0.25  # Largest offset as a fraction of the default eye size
+        self.curiosity_scale = 0.2  # Extra height of the outer eye at full sideways gaze
+
+        # Precomputed mapping, rebuilt only when the parameters behind it change
+        self.mapping = None
+        self.mapping_key = None
+        self.offsets = (0.0, 0.0, 0.0, 0.0, 1.0, 1.0)
+
+    def look_at(self, x, y):
+        """Set the gaze target, x and y in [-1, 1] (safe from any thread)"""
+        self.target = (max(-1.0, min(1.0, float(x))), max(-1.0, min(1.0, float(y))))
+        return True
+
+    def is_at_rest(self):
+        """Check if the gaze has reached its target and stopped"""
+        return (self.target == (self.x, self.y)
+                and self.velocity_x == 0.0 and self.velocity_y == 0.0)
+
+    def step(self, dt):
+        """Move the gaze towards its target by one step of dt seconds"""
+        target_x, target_y = self.target
+        if (self.x == target_x and self.y == target_y
+                and self.velocity_x == 0.0 and self.velocity_y == 0.0):
+            # At rest: only new eye sizes or curiosity change the offsets
+            if self._check_mapping():
+                self._update_offsets()
+            return False
+
+        # Exact critically damped spring step, stable for any dt
+        omega = self.omega
+        decay = math.exp(-omega * dt)
+
+        delta = self.x - target_x
+        temp = (self.velocity_x + omega * delta) * dt
+        self.velocity_x = (self.velocity_x - omega * temp) * decay
+        self.x = target_x + (delta + temp) * decay
+
+        delta = self.y - target_y
+        temp = (self.velocity_y + omega * delta) * dt
+        self.velocity_y = (self.velocity_y - omega * temp) * decay
+        self.y = target_y + (delta + temp) * decay
+
+        # Settle exactly, so unchanged frames can be skipped
+        if (abs(self.x - target_x) < 1e-4 and abs(self.y - target_y) < 1e-4
+                and abs(self.velocity_x) < 1e-3 and abs(self.velocity_y) < 1e-3):
+            self.x, self.y = target_x, target_y
+            self.velocity_x = self.velocity_y = 0.0
+
+        self._update_offsets()
+        return True
+
+    def build_mapping(self):
+        """Precompute the (6, 5) matrix from gaze features to eye offsets"""
+        parent = self.parent
+        range_x = self.range * parent.state.eye_l_width_default
+        range_y = self.range * parent.state.eye_l_height_default
+        curiosity = self.curiosity_scale if parent.curiosity else 0.0
+
+        # Columns: x, y, max(x, 0), max(-x, 0), 1
+        self.mapping = numpy.array((
+            (range_x, 0.0, 0.0, 0.0, 0.0),        # left_x
+            (0.0, range_y, 0.0, 0.0, 0.0),        # left_y
+            (range_x, 0.0, 0.0, 0.0, 0.0),        # right_x
+            (0.0, range_y, 0.0, 0.0, 0.0),        # right_y
+            (0.0, 0.0, 0.0, curiosity, 1.0),      # left_height: grows looking left
+            (0.0, 0.0, curiosity, 0.0, 1.0),      # right_height: grows looking right
+        ))
+        return self.mapping
+
+    def map_gaze(self, x, y):
+        """Map gaze point(s) to the six values named in OFFSET_ROWS
+
+        For arrays of N points the result has shape (N, 6), so a whole
+        trajectory maps in one matrix product.
+        """
+        self._check_mapping()
+        return gaze_features(x, y) @ self.mapping.T
+
+    def _check_mapping(self):
+        """Rebuild the mapping if the eye sizes or curiosity changed, True if rebuilt"""
+        parent = self.parent
+        key = (parent.state.eye_l_width_default, parent.state.eye_l_height_default, parent.curiosity,
+               self.range, self.curiosity_scale)
+        if key != self.mapping_key:
+            self.mapping_key = key
+            self.build_mapping()
+            return True
+        return False
+
+    def _update_offsets(self):
+        """Cache the offsets for the current smoothed gaze"""
+        self._check_mapping()
+        x = self.x
+        # Same as map_gaze for a single point, without the array setup
+        features = (x, self.y, max(x, 0.0), max(-x, 0.0), 1.0)
+        self.offsets = tuple(self.mapping.dot(features).tolist())
@@ -0,0 +1,65 @@
+"""
+Layout utilities for RoboEyes
+Handles resolution-independent geometry: every fixed length of the face is
+given once for a reference screen of 640x320, and a Layout scales all of
+them to the actual screen in one go. Layouts are cached per resolution, so
+drawing only reads precomputed pixel values.
+"""
+
+from utils.moods_utils import DEFAULT, TIRED, SAD, EXCITED, ANGRY
+
+# The face was designed on this screen; lengths below are in its pixels
+REFERENCE_WIDTH = 640
+REFERENCE_HEIGHT = 320
+
+LENGTHS = {
+    'eye_size': 80,            # Default eye width and height
+    'space_between': 40,       # Gap between the two eyes
+    'mouth_gap': 100,          # From the top of the eyes to the top of the mouth
+    'laugh_mouth_width': 75,
+    'laugh_mouth_height': 18,
+    'tear_gap': 5,             # From the bottom of an eye to its tear
+    'tear_radius': 3,
+    'tear_glow': 4,            # Half size of the glow square around a tear
+    'manual_offset_max': 50,   # Farthest the arrow keys move the eyes
+}
+
+# Mouth of each mood: (width, height, curve, y_offset); curves have no unit
+MOUTHS = {
+    DEFAULT: (50, 10, 0.2, 3),
+    TIRED: (42, 8, -0.4, 5),
+    SAD: (38, 7, -0.8, 8),
+    EXCITED: (58, 14, 0.6, 2),
+    ANGRY: (46, 9, -1.0, 10),
+}
+
+
+class Layout:
+    def __init__(self, width, height):
+        """Scale the reference lengths to a width x height screen"""
+        self.width = width
+        self.height = height
+        # Uniform scale keeps the face's proportions on any aspect ratio
+        self.scale = min(width / REFERENCE_WIDTH, height / REFERENCE_HEIGHT)
+
+        for name, length in LENGTHS.items():
+            setattr(self, name, self.length(length))
+        self.mouths = {
+            mood: (self.length(mouth_width), self.length(mouth_height), curve, y_offset * self.scale)
+            for mood, (mouth_width, mouth_height, curve, y_offset) in MOUTHS.items()
+        }
+
+    def length(self, reference):
+        """Scale a reference length to whole pixels (at least 1)"""
+        return max(1, int(round(reference * self.scale)))
+
+
+_layouts = {}
+
+
+def get_layout(width, height):
+    """Get the layout for a resolution, computed once per resolution"""
+    layout = _layouts.get((width, height))
+    if layout is None:
+        layout = _layouts[(width, height)] = Layout(width, height)
+    return layout
@@ -17,208 +17,179 @@ class MoodsHandler:
     def __init__(self, parent):
         """Initialize moods with reference to parent RoboEyes object"""
         self.parent = parent
-        self.current_mood = DEFAULT
+        self.current_mood = None  # Set to DEFAULT by RoboEyes.begin()
         
-        # Eyelid properties for mood expressions
-        self.eyelids_tired_height = 0
-        self.eyelids_tired_height_next = 0
+        # Tired eyelid heights live in the parent's EyeState
         
-        # Mouth properties for mood expressions
-        self.mouth_width = 40
-        self.mouth_height = 8
-        self.mouth_curve = 0.0
-        self.mouth_y_offset = 0
+        # Mood transitions cross-fade the eye shape and the mouth
+        self.transition_duration = 0.3  # seconds, 0 switches instantly
+        self.transition_start = 0.0
+        self.transition_progress = 1.0  # 1 when no transition is running
+        self.previous_mouth = None  # Mouth properties the transition starts from
+    
+    def set_transition_duration(self, duration):
+        """Set how long mood transitions take (0 switches instantly)"""
+        if duration < 0:
+            print(f"Warning: Transition duration must not be negative, got {duration}")
+            return False
+        self.transition_duration = duration
+        return True
     
     def set_mood(self, mood):
         """Set the mood expression"""
+        # Repeating the current mood is free, so callers may set it every frame
+        if mood == self.current_mood:
+            return True
+        
+        # Start from what is on screen now, even in the middle of a transition
+        previous_mood = self.current_mood
+        if previous_mood is not None and self.transition_duration > 0:
+            previous_mouth = self.get_mouth()
+            previous_shape = self.parent.shapes.eye_shape
+            if self.parent.shapes.fade_from is not None and self.transition_progress < 0.5:
+                previous_shape = self.parent.shapes.fade_from
+        
         self.current_mood = mood
         
         # Reset all mood-related properties
-        self.eyelids_tired_height_next = 0
+        self.parent.state.eyelids_tired_height_next = 0
         
         # Set the appropriate mood properties and eye shapes
         if mood == TIRED:
-            self.eyelids_tired_height_next = int(self.parent.eye_l_height * 0.3)
+            self.parent.state.eyelids_tired_height_next = int(self.parent.state.eye_l_height * 0.3)
             self.parent.shapes.set_eye_shape("square")
         elif mood == SAD:
             # Sad shape for SAD mood
             self.parent.shapes.set_eye_shape("angry")
             # Make eyes smaller and narrower for sad look
             self.parent.shapes.set_width(
-                int(self.parent.eye_l_width_default * 0.8), 
-                int(self.parent.eye_r_width_default * 0.8)
+                int(self.parent.state.eye_l_width_default * 0.8), 
+                int(self.parent.state.eye_r_width_default * 0.8)
             )
             self.parent.shapes.set_height(
-                int(self.parent.eye_l_height_default * 0.85), 
-                int(self.parent.eye_r_height_default * 0.85)
+                int(self.parent.state.eye_l_height_default * 0.85), 
+                int(self.parent.state.eye_r_height_default * 0.85)
             )
         elif mood == EXCITED:
             self.parent.shapes.set_eye_shape("pill")
             # Make eyes wider for excited look
             self.parent.shapes.set_width(
-                int(self.parent.eye_l_width_default * 1.3), 
-                int(self.parent.eye_r_width_default * 1.3)
+                int(self.parent.state.eye_l_width_default * 1.3), 
+                int(self.parent.state.eye_r_width_default * 1.3)
             )
             self.parent.shapes.set_height(
-                int(self.parent.eye_l_height_default * 0.8), 
-                int(self.parent.eye_r_height_default * 0.8)
+                int(self.parent.state.eye_l_height_default * 0.8), 
+                int(self.parent.state.eye_r_height_default * 0.8)
             )
             # Add asymmetry for more character
-            self.parent.eye_r_width = int(self.parent.eye_r_width * 0.9)  # Right eye slightly narrower
+            self.parent.state.eye_r_width = int(self.parent.state.eye_r_width * 0.9)  # Right eye slightly narrower
         elif mood == ANGRY:
             # Angry shape for ANGRY mood
             self.parent.shapes.set_eye_shape("angry")
             # Make eyes narrower and more intense
             self.parent.shapes.set_width(
-                int(self.parent.eye_l_width_default * 0.8), 
-                int(self.parent.eye_r_width_default * 0.8)
+                int(self.parent.state.eye_l_width_default * 0.8), 
+                int(self.parent.state.eye_r_width_default * 0.8)
             )
             self.parent.shapes.set_height(
-                int(self.parent.eye_l_height_default * 0.9), 
-                int(self.parent.eye_r_height_default * 0.9)
+                int(self.parent.state.eye_l_height_default * 0.9), 
+                int(self.parent.state.eye_r_height_default * 0.9)
             )
         else:  # DEFAULT
             # Reset to default eye shape and size with slight asymmetry
             self.parent.shapes.set_eye_shape("square")
             self.parent.shapes.set_width(
-                self.parent.eye_l_width_default, 
-                int(self.parent.eye_r_width_default * 0.95)
+                self.parent.state.eye_l_width_default, 
+                int(self.parent.state.eye_r_width_default * 0.95)
             )
             self.parent.shapes.set_height(
-                self.parent.eye_l_height_default, 
-                int(self.parent.eye_r_height_default * 1.05)
+                self.parent.state.eye_l_height_default, 
+                int(self.parent.state.eye_r_height_default * 1.05)
             )
         
+        # Sizes ease on their own; the shape and mouth are cross-faded
+        if previous_mood is not None and self.transition_duration > 0:
+            self.previous_mouth = previous_mouth
+            self.parent.shapes.start_fade(previous_shape)
+            self.transition_start = self.parent.sim_time
+            self.transition_progress = 0.0
+        else:
+            self.transition_progress = 1.0
+            self.previous_mouth = None
+        return True
+    
+    def update_transition(self, current_time):
+        """Advance a running mood transition"""
+        if self.transition_progress >= 1.0:
+            return False
+        if self.transition_duration > 0:
+            progress = (current_time - self.transition_start) / self.transition_duration
+        else:
+            progress = 1.0
+        self.transition_progress = min(1.0, max(0.0, progress))
+        self.parent.shapes.set_fade(self.transition_progress)
+        if self.transition_progress >= 1.0:
+            self.previous_mouth = None
         return True
 
-    def draw_tears(self, screen, eye_l_x_current, eye_l_y_current, eye_r_x_current, eye_r_y_current, 
-                   eye_l_width_current, eye_l_height_current, eye_r_width_current, eye_r_height_current):
-        """Draw tears for SAD mood"""
-        if self.current_mood == SAD:
-            # Draw tear drops below each eye
-            tear_color = (0, 255, 255)  # Cyan color to match the eyes
-            
-            # Left eye tear
-            tear_l_x = eye_l_x_current + eye_l_width_current // 2
-            tear_l_y = eye_l_y_current + eye_l_height_current + 5
-            
-            # Draw tear drop (teardrop shape using circle and triangle)
-            pygame.draw.circle(
-                screen,
-                tear_color,
-                (tear_l_x, tear_l_y),
-                3,  # Tear radius
-                0
-            )
-            
-            # Right eye tear
-            tear_r_x = eye_r_x_current + eye_r_width_current // 2
-            tear_r_y = eye_r_y_current + eye_r_height_current + 5
-            
-            pygame.draw.circle(
-                screen,
-                tear_color,
-                (tear_r_x, tear_r_y),
-                3,  # Tear radius
-                0
-            )
-            
-            # Add subtle glow effect to tears
-            glow_surface = pygame.Surface((8, 8))
-            glow_surface.set_alpha(40)
-            glow_surface.fill(tear_color)
-            
-            # Left tear glow
-            screen.blit(glow_surface, (tear_l_x - 4, tear_l_y - 4))
-            # Right tear glow
-            screen.blit(glow_surface, (tear_r_x - 4, tear_r_y - 4))
+    def draw_tear(self, screen, tear_x, tear_y):
+        """Draw one tear drop with its glow, centered on (tear_x, tear_y)"""
+        tear_color = (0, 255, 255)  # Cyan color to match the eyes
+        
+        layout = self.parent.layout
+        
+        # Draw tear drop (teardrop shape using circle and triangle)
+        pygame.draw.circle(
+            screen,
+            tear_color,
+            (tear_x, tear_y),
+            layout.tear_radius,
+            0
+        )
+        
+        # Add subtle glow effect to tears
+        glow = layout.tear_glow
+        glow_surface = pygame.Surface((2 * glow, 2 * glow))
+        glow_surface.set_alpha(40)
+        glow_surface.fill(tear_color)
+        screen.blit(glow_surface, (tear_x - glow, tear_y - glow))
 
     def get_current_mood(self):
         """Get the current mood value"""
         return self.current_mood
     
+    def get_mouth(self):
+        """Get (width, height, curve, y_offset) of the mouth, blended during transitions
+        
+        Widths and heights are whole pixels and curves are rounded to 0.1, so
+        the blended mouths stay few enough to be cached as sprites.
+        """
+        mouths = self.parent.layout.mouths
+        width, height, curve, y_offset = mouths.get(self.current_mood, mouths[DEFAULT])
+        if self.previous_mouth is not None:
+            t = self.transition_progress
+            t = t * t * (3.0 - 2.0 * t)
+            from_width, from_height, from_curve, from_y_offset = self.previous_mouth
+            width = int(round(from_width + (width - from_width) * t))
+            height = int(round(from_height + (height - from_height) * t))
+            curve = round(from_curve + (curve - from_curve) * t, 1)
+            y_offset = from_y_offset + (y_offset - from_y_offset) * t
+        return (width, height, curve, y_offset)
+    
     def get_mouth_properties(self):
-        """Get mouth properties for the current mood"""
-        if self.current_mood == TIRED:
-            return {
-                'width': 42,
-                'height': 8,
-                'curve': -0.4,
-                'y_offset': 5
-            }
-        elif self.current_mood == SAD:
-            return {
-                'width': 38,
-                'height': 7,
-                'curve': -0.8,
-                'y_offset': 8
-            }
-        elif self.current_mood == EXCITED:
-            return {
-                'width': 58,
-                'height': 14,
-                'curve': 0.6,
-                'y_offset': 2
-            }
-        elif self.current_mood == ANGRY:
-            return {
-                'width': 46,
-                'height': 9,
-                'curve': -1.0,
-                'y_offset': 10
-            }
-        else:  # DEFAULT
-            return {
-                'width': 50,
-                'height': 10,
-                'curve': 0.2,
-                'y_offset': 3
-            }
+        """Get mouth properties for the current mood, in pixels of the current layout"""
+        mouths = self.parent.layout.mouths
+        width, height, curve, y_offset = mouths.get(self.current_mood, mouths[DEFAULT])
+        return {
+            'width': width,
+            'height': height,
+            'curve': curve,
+            'y_offset': y_offset
+        }
     
-    def draw_mood_elements(self, screen, eye_l_x_current, eye_l_y_current, eye_r_x_current, eye_r_y_current, 
-                          eye_l_width_current, eye_l_height_current, eye_r_width_current, eye_r_height_current):
-        """Draw mood-specific elements"""
-        # Convert all position and size values to integers to avoid float errors
-        eye_l_x = int(eye_l_x_current)
-        eye_l_y = int(eye_l_y_current)
-        eye_r_x = int(eye_r_x_current)
-        eye_r_y = int(eye_r_y_current)
-        eye_l_width = int(eye_l_width_current)
-        eye_l_height = int(eye_l_height_current)
-        eye_r_width = int(eye_r_width_current)
-        eye_r_height = int(eye_r_height_current)
-        
-        # Check if we're in cyclops mode
-        cyclops_mode = getattr(self.parent, 'cyclops', False)
-        
-        # Smooth transitions for eyelids
-        eyelids_tired_height = int((self.eyelids_tired_height + self.eyelids_tired_height_next) / 2)
-        
-        # Draw tired eyelids if in TIRED mood
-        if self.current_mood == TIRED and eyelids_tired_height > 0:
-            # Left eye (always drawn)
-            pygame.draw.rect(
-                screen,
-                (0, 0, 0),  # BLACK
-                (
-                    eye_l_x,
-                    eye_l_y,
-                    eye_l_width,
-                    eyelids_tired_height
-                ),
-                0
-            )
-            
-            # Right eye (only if not in cyclops mode)
-            if not cyclops_mode:
-                pygame.draw.rect(
-                    screen,
-                    (0, 0, 0),  # BLACK
-                    (
-                        eye_r_x,
-                        eye_r_y,
-                        eye_r_width,
-                        eyelids_tired_height
-                    ),
-                    0
-                )
+    def get_tired_height(self):
+        """Get how far the tired eyelids cover the top of the eyes (TIRED only)"""
+        if self.current_mood != TIRED:
+            return 0
+        # Eyelid height, eased by the parent's interpolator
+        return max(0, int(self.parent.state.eyelids_tired_height))
@@ -0,0 +1,266 @@
+"""
+Panel utilities for RoboEyes
+Handles small SPI displays (ST7789, ILI9341, ...), where the bus and not the
+CPU limits the frame rate. PanelSink is a display sink: each presented frame
+is converted to the panel's native pixel format in one vectorized pass into
+reused buffers, compared tile by tile with the previous frame, and only the
+changed tiles are sent, as window address + pixel packets, to a transport.
+A mostly static face sends a small fraction of the full-frame bytes.
+
+A transport is any object with open(), send(x0, y0, x1, y1, payload),
+end_frame() and close(); FileTransport writes the packets to a file or pipe,
+so another process (or a test) can stand in for the bus.
+
+Packets are a big-endian header (x0, y0, x1, y1 as uint16, payload length
+as uint32) followed by the pixels of the inclusive window, row by row, as
+the panel's column/row address set and memory write commands take them. A
+header with all coordinates 0xFFFF and no payload ends a frame.
+"""
+
+import struct
+import sys
+
+import numpy
+import pygame
+
+# Native pixel formats and their bytes per pixel
+#   rgb565    16 bit, big-endian (the byte order SPI panels expect)
+#   rgb565le  16 bit, little-endian (panels or drivers that swap bytes)
+#   rgb666    18 bit, one byte per channel with the low two bits unused
+PIXEL_FORMATS = {"rgb565": 2, "rgb565le": 2, "rgb666": 3}
+
+PACKET_HEADER = struct.Struct(">HHHHI")
+FRAME_END = 0xFFFF
+
+
+class FileTransport:
+    """Write packets to a file or pipe, a stand-in for the SPI bus
+
+    A path of "-" writes to stdout, e.g. into a process driving the panel.
+    """
+
+    def __init__(self, path="-"):
+        self.path = path
+        self.stream = None
+
+    def open(self):
+        """Open the file, returns False if it can't be written"""
+        if self.path == "-":
+            self.stream = sys.stdout.buffer
+            return True
+        try:
+            self.stream = open(self.path, "wb")
+        except OSError as e:
+            print(f"Warning: Could not open panel transport {self.path}: {e}")
+            return False
+        return True
+
+    def send(self, x0, y0, x1, y1, payload):
+        """Write one window (inclusive corners) and its pixels"""
+        self.stream.write(PACKET_HEADER.pack(x0, y0, x1, y1, len(payload)))
+        self.stream.write(payload)
+
+    def end_frame(self):
+        """Mark the end of a frame and hand it to the reader"""
+        self.stream.write(PACKET_HEADER.pack(FRAME_END, FRAME_END, FRAME_END, FRAME_END, 0))
+        self.stream.flush()
+
+    def close(self):
+        """Close the file (stdout stays open)"""
+        if self.stream is not None and self.stream is not sys.stdout.buffer:
+            self.stream.close()
+        self.stream = None
+
+
+def read_packets(stream):
+    """Read the packets FileTransport wrote, yields ((x0, y0, x1, y1), payload)
+
+    The end of a frame is yielded as (None, b"").
+    """
+    while True:
+        header = stream.read(PACKET_HEADER.size)
+        if len(header) < PACKET_HEADER.size:
+            return
+        x0, y0, x1, y1, length = PACKET_HEADER.unpack(header)
+        payload = stream.read(length)
+        if x0 == FRAME_END and y0 == FRAME_END:
+            yield None, b""
+        else:
+            yield (x0, y0, x1, y1), payload
+
+
+class PanelSink:
+    """Present frames on an SPI panel as tile-based delta updates
+
+        eyes.begin(320, 240, 30, sink=PanelSink(FileTransport("panel.bin")))
+
+    tile_size is the side of the square tiles that are compared; changed
+    tiles next to each other in a row are sent as one window. offset moves
+    every window, for controllers whose memory is larger than the glass
+    (e.g. a 240x240 ST7789 with a row offset of 80).
+    """
+
+    interactive = False
+
+    def __init__(self, transport, pixel_format="rgb565", tile_size=16, offset=(0, 0)):
+        self.transport = transport
+        self.pixel_format = pixel_format
+        self.tile_size = tile_size
+        self.offset = offset
+        self.surface = None
+        self.size = (0, 0)
+
+        # Native pixels of the frame being sent and of the last frame sent,
+        # padded to whole tiles; both are reused for every frame
+        self.current = None
+        self.previous = None
+        self.previous_valid = False  # The panel's contents are unknown until the first full frame
+        self.changed = None  # Changed tiles of a region
+        self.scratch = None  # Channel work buffers for the RGB565 conversion
+        self.accumulator = None
+
+        # Statistics
+        self.frames_presented = 0
+        self.packets_sent = 0
+        self.bytes_sent = 0
+        self.tiles_sent = 0
+        self.tiles_compared = 0
+
+    def open(self, width, height):
+        """Allocate the buffers, open the transport and return the surface to draw on"""
+        if self.pixel_format not in PIXEL_FORMATS:
+            print(f"Warning: Invalid panel pixel format '{self.pixel_format}'. Valid formats are: {list(PIXEL_FORMATS)}")
+            return None
+        if self.tile_size < 1:
+            print(f"Warning: Panel tile size must be positive, got {self.tile_size}")
+            return None
+        if not self.transport.open():
+            return None
+
+        # 32 bit, so surfarray can read the channels directly
+        self.surface = pygame.Surface((width, height), 0, 32)
+        self.size = (width, height)
+        tile = self.tile_size
+        padded = (-(-height // tile) * tile, -(-width // tile) * tile)
+        if self.pixel_format == "rgb666":
+            self.current = numpy.zeros(padded + (3,), dtype=numpy.uint8)
+        else:
+            byte_order = ">" if self.pixel_format == "rgb565" else "<"
+            self.current = numpy.zeros(padded, dtype=numpy.dtype(byte_order + "u2"))
+            self.scratch = numpy.zeros(padded, dtype=numpy.uint16)
+            self.accumulator = numpy.zeros(padded, dtype=numpy.uint16)
+        self.previous = numpy.zeros_like(self.current)
+        self.changed = numpy.zeros((padded[0] // tile, padded[1] // tile), dtype=bool)
+        self.previous_valid = False
+        return self.surface
+
+    def refresh(self):
+        """Send the whole next frame, e.g. after the panel was reset"""
+        self.previous_valid = False
+        return True
+
+    def present(self, rects=None):
+        """Convert the frame (or only the given regions) and send the changed tiles"""
+        bounds = self.surface.get_rect()
+        if rects is None or not self.previous_valid:
+            # The panel needs every pixel at least once
+            rects = [bounds]
+        tile = self.tile_size
+        pixels = pygame.surfarray.pixels3d(self.surface).transpose(1, 0, 2)
+        try:
+            for rect in rects:
+                rect = bounds.clip(rect)
+                if not rect.width or not rect.height:
+                    continue
+                # Grow the region to whole tiles
+                left, top = rect.left // tile * tile, rect.top // tile * tile
+                right = min(-(-rect.right // tile) * tile, bounds.width)
+                bottom = min(-(-rect.bottom // tile) * tile, bounds.height)
+                self._encode(pixels, left, top, right, bottom)
+                self._send_changes(left, top, -(-right // tile) * tile, -(-bottom // tile) * tile)
+        finally:
+            # Release the array so the surface is unlocked for drawing
+            del pixels
+        self.previous_valid = True
+        self.transport.end_frame()
+        self.frames_presented += 1
+
+    def close(self):
+        """Close the transport"""
+        if self.surface is not None:
+            self.transport.close()
+        self.surface = None
+
+    def get_stats(self):
+        """Get the bytes sent against what full frames would have needed"""
+        width, height = self.size
+        full_bytes = self.frames_presented * width * height * PIXEL_FORMATS.get(self.pixel_format, 0)
+        return {
+            'frames': self.frames_presented,
+            'packets': self.packets_sent,
+            'tiles_sent': self.tiles_sent,
+            'tiles_compared': self.tiles_compared,
+            'bytes_sent': self.bytes_sent,
+            'full_frame_bytes': full_bytes,
+            'fraction': self.bytes_sent / full_bytes if full_bytes else 0.0
+        }
+
+    def _encode(self, pixels, left, top, right, bottom):
+        """Convert a region of the surface into the native pixel buffer"""
+        source = pixels[top:bottom, left:right]
+        target = self.current[top:bottom, left:right]
+        if self.pixel_format == "rgb666":
+            numpy.bitwise_and(source, 0xFC, out=target)
+            return
+
+        # RRRRRGGG GGGBBBBB, built in the work buffers without allocating
+        value = self.accumulator[top:bottom, left:right]
+        channel = self.scratch[top:bottom, left:right]
+        numpy.copyto(value, source[..., 0])
+        value &= 0xF8
+        value <<= 8
+        numpy.copyto(channel, source[..., 1])
+        channel &= 0xFC
+        channel <<= 3
+        value |= channel
+        numpy.copyto(channel, source[..., 2])
+        channel >>= 3
+        value |= channel
+        # Storing converts to the panel's byte order
+        numpy.copyto(target, value)
+
+    def _send_changes(self, left, top, right, bottom):
+        """Send the changed tiles of a tile-aligned region and remember them as sent"""
+        tile = self.tile_size
+        rows, columns = (bottom - top) // tile, (right - left) // tile
+        changed = self.changed[:rows, :columns]
+        current = self.current[top:bottom, left:right]
+        previous = self.previous[top:bottom, left:right]
+        if self.previous_valid:
+            # A tile changed if any of its pixels (or channels) differs
+            difference = (current != previous).reshape(rows, tile, columns, -1)
+            numpy.any(difference, axis=(1, 3), out=changed)
+        else:
+            changed[...] = True
+        self.tiles_compared += rows * columns
+
+        width, height = self.size
+        offset_x, offset_y = self.offset
+        for row in range(rows):
+            # Runs of changed tiles in the row become one window each
+            flags = changed[row]
+            if not flags.any():
+                continue
+            edges = numpy.flatnonzero(numpy.diff(numpy.concatenate(([False], flags, [False])).astype(numpy.int8)))
+            y0 = top + row * tile
+            y1 = min(y0 + tile, height)
+            for start, end in zip(edges[::2], edges[1::2]):
+                x0 = left + int(start) * tile
+                x1 = min(left + int(end) * tile, width)
+                payload = self.current[y0:y1, x0:x1].tobytes()
+                self.transport.send(x0 + offset_x, y0 + offset_y, x1 - 1 + offset_x, y1 - 1 + offset_y, payload)
+                self.packets_sent += 1
+                self.tiles_sent += int(end - start)
+                self.bytes_sent += PACKET_HEADER.size + len(payload)
+
+        numpy.copyto(previous, current)
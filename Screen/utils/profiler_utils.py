@@ -0,0 +1,145 @@
+"""
+Profiler utilities for RoboEyes
+Handles per-stage frame timing for the render loop: rolling percentiles,
+dropped-frame counting, an on-screen overlay and JSON/CSV export.
+"""
+
+import csv
+import json
+import time
+from collections import deque
+
+import pygame
+
+# Render loop stages in the order they run within a frame
+STAGES = (
+    "events",          # pygame event polling and key state
+    "manual_control",  # arrow key physics
+    "animations",      # _update_animations and size smoothing
+    "draw_eyes",       # eye layers (cached shape sprites clipped by the eyelids)
+    "tears",           # tear layers (moods.draw_tear)
+    "mouth",           # mouth and sparkle layers
+    "composite",       # blitting the visible layers
+    "present",         # display flip / dirty rect update, frame recording
+    "tick",            # clock.tick frame limiter sleep (or power save sleep)
+)
+
+
+class FrameProfiler:
+    def __init__(self, max_fps, window=300):
+        """Initialize with the target frame rate and rolling window size (frames)"""
+        self.frame_budget = 1.0 / max_fps
+        self.window = window
+
+        # Rolling per-frame samples in seconds
+        self.frame_times = deque(maxlen=window)
+        self.work_times = deque(maxlen=window)
+        self.stage_times = {stage: deque(maxlen=window) for stage in STAGES}
+
+        # Counters
+        self.frames = 0
+        self.dropped_frames = 0
+
+        # Current frame bookkeeping
+        self.current = dict.fromkeys(STAGES, 0.0)
+        self.frame_start = 0.0
+        self.last_time = 0.0
+
+        # On-screen overlay
+        self.overlay = False
+        self.overlay_font = None
+        self.overlay_text = None
+        self.overlay_rect = pygame.Rect(4, 4, 0, 0)
+        self.overlay_interval = 0.5  # Seconds between overlay text refreshes
+        self.overlay_last_refresh = 0.0
+
+    def begin_frame(self):
+        """Start timing a new frame"""
+        now = time.perf_counter()
+        self.frame_start = now
+        self.last_time = now
+        current = self.current
+        for stage in STAGES:
+            current[stage] = 0.0
+
+    def lap(self, stage):
+        """Charge the time since the previous lap to a stage"""
+        now = time.perf_counter()
+        self.current[stage] += now - self.last_time
+        self.last_time = now
+
+    def end_frame(self):
+        """Finish the frame and record its samples"""
+        total = self.last_time - self.frame_start
+        work = total - self.current["tick"]
+        self.frame_times.append(total)
+        self.work_times.append(work)
+        for stage in STAGES:
+            self.stage_times[stage].append(self.current[stage])
+
+        self.frames += 1
+        # A frame is dropped when its work alone does not fit the budget
+        if work > self.frame_budget:
+            self.dropped_frames += 1
+
+    def percentiles(self, samples):
+        """Get p50/p95/p99 of a sample window in milliseconds"""
+        if not samples:
+            return {'p50': 0.0, 'p95': 0.0, 'p99': 0.0}
+        ordered = sorted(samples)
+        last = len(ordered) - 1
+        return {
+            'p50': ordered[int(last * 0.50)] * 1000.0,
+            'p95': ordered[int(last * 0.95)] * 1000.0,
+            'p99': ordered[int(last * 0.99)] * 1000.0
+        }
+
+    def get_stats(self):
+        """Get rolling percentiles for the frame, its work and every stage"""
+        return {
+            'frames': self.frames,
+            'dropped_frames': self.dropped_frames,
+            'frame_budget_ms': self.frame_budget * 1000.0,
+            'frame': self.percentiles(self.frame_times),
+            'work': self.percentiles(self.work_times),
+            'stages': {stage: self.percentiles(self.stage_times[stage]) for stage in STAGES}
+        }
+
+    def export_json(self, path):
+        """Write the current statistics to a JSON file"""
+        with open(path, "w") as f:
+            json.dump(self.get_stats(), f, indent=2)
+        return True
+
+    def export_csv(self, path):
+        """Write the per-frame samples of the rolling window to a CSV file (ms)"""
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(("frame", "total", "work") + STAGES)
+            first = self.frames - len(self.frame_times)
+            for i in range(len(self.frame_times)):
+                row = [first + i, self.frame_times[i] * 1000.0, self.work_times[i] * 1000.0]
+                row.extend(self.stage_times[stage][i] * 1000.0 for stage in STAGES)
+                writer.writerow(row)
+        return True
+
+    def draw_overlay(self, surface, background):
+        """Draw the stats overlay, returns True if its text changed this frame"""
+        changed = False
+        now = time.perf_counter()
+        if self.overlay_text is None or now - self.overlay_last_refresh > self.overlay_interval:
+            if self.overlay_font is None:
+                self.overlay_font = pygame.font.Font(None, 18)
+            work = self.percentiles(self.work_times)
+            text = "work p50 {:.2f}  p95 {:.2f}  p99 {:.2f} ms  dropped {}".format(
+                work['p50'], work['p95'], work['p99'], self.dropped_frames)
+            self.overlay_text = self.overlay_font.render(text, True, (255, 255, 255))
+            self.overlay_last_refresh = now
+            changed = True
+
+        # Restore the background under the old and new text area, then draw the text
+        new_rect = self.overlay_text.get_rect(topleft=self.overlay_rect.topleft)
+        background.restore(surface, self.overlay_rect.union(new_rect))
+        self.overlay_rect = self.overlay_rect.union(new_rect)
+        surface.blit(self.overlay_text, new_rect)
+        return changed
@@ -0,0 +1,310 @@
+"""
+Recorder utilities for RoboEyes
+Handles recording rendered frames without stalling the render loop: each
+frame is copied as raw surface bytes into a buffer from a fixed pool, and
+background writer threads convert and write it as a PNG sequence, a raw
+RGB stream or a y4m stream (both can be piped into ffmpeg or another encoder).
+
+    png   frame_000000.png, ... in a directory
+    rgb   raw rgb24 frames, e.g. ffmpeg -f rawvideo -pix_fmt rgb24 -s 640x320 -r 60 -i out.rgb
+    y4m   YUV4MPEG2 4:4:4, e.g. ffmpeg -i out.y4m out.mp4
+
+A path of "-" writes rgb and y4m streams to stdout.
+"""
+
+import os
+import queue
+import shutil
+import struct
+import sys
+import threading
+import time
+import zlib
+
+import numpy
+
+FORMATS = ("png", "rgb", "y4m")
+
+
+def surface_to_rgb(raw, width, height, pitch, bytesize, shifts):
+    """Convert raw surface bytes to an RGB array of shape (height, width, 3)"""
+    if bytesize == 2:
+        # 16 bpp is RGB565; expand every channel to 8 bits
+        pixels = numpy.frombuffer(raw, dtype="<u2").reshape(height, pitch // 2)[:, :width].astype(numpy.uint32)
+        rgb = numpy.empty((height, width, 3), dtype=numpy.uint8)
+        rgb[..., 0] = ((pixels >> 11) & 0x1F) * 255 // 31
+        rgb[..., 1] = ((pixels >> 5) & 0x3F) * 255 // 63
+        rgb[..., 2] = (pixels & 0x1F) * 255 // 31
+        return rgb
+    # 24/32 bpp: every channel is one byte, found from its shift
+    pixels = numpy.frombuffer(raw, dtype=numpy.uint8).reshape(height, pitch)[:, :width * bytesize]
+    pixels = pixels.reshape(height, width, bytesize)
+    return pixels[..., [shifts[0] // 8, shifts[1] // 8, shifts[2] // 8]]
+
+
+def encode_png(rgb, level=6):
+    """Encode an RGB array as a PNG file in memory
+
+    zlib releases the GIL while compressing, so several writer threads
+    encode frames in parallel (pygame.image.save would hold it).
+    """
+    height, width, _ = rgb.shape
+    # Every row starts with filter type 0 (none)
+    rows = numpy.empty((height, width * 3 + 1), dtype=numpy.uint8)
+    rows[:, 0] = 0
+    rows[:, 1:] = rgb.reshape(height, width * 3)
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    return b"".join((
+        b"\x89PNG\r\n\x1a\n",
+        chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)),
+        chunk(b"IDAT", zlib.compress(rows.tobytes(), level)),
+        chunk(b"IEND", b"")
+    ))
+
+
+# Limited range BT.601 RGB to YUV, and the offsets (plus 0.5 for rounding)
+YUV_MATRIX = numpy.array((
+    (0.257, 0.504, 0.098),
+    (-0.148, -0.291, 0.439),
+    (0.439, -0.368, -0.071),
+), dtype=numpy.float32)
+YUV_OFFSET = numpy.array((16.5, 128.5, 128.5), dtype=numpy.float32).reshape(3, 1)
+
+
+def rgb_to_yuv444(rgb):
+    """Convert RGB to limited range BT.601 Y, U and V planes, shape (3, height, width)"""
+    height, width, _ = rgb.shape
+    # One matrix product over all pixels
+    planes = YUV_MATRIX @ rgb.reshape(-1, 3).T.astype(numpy.float32)
+    planes += YUV_OFFSET
+    numpy.clip(planes, 0, 255, out=planes)
+    return planes.astype(numpy.uint8).reshape(3, height, width)
+
+
+class FrameRecorder:
+    def __init__(self, path, format="png", fps=60, pool_size=8, blocking=False, writers=None):
+        """Initialize a recorder writing to path (a directory for png)
+
+        With blocking=False a frame is dropped when all pool buffers are
+        still waiting to be written, so the render loop never waits. Offline
+        rendering uses blocking=True and keeps every frame. PNG frames are
+        written by several threads (default: one per CPU, up to 4); streams
+        need their frames in order and always use one.
+        """
+        self.path = path
+        self.format = format
+        self.fps = fps
+        self.pool_size = pool_size
+        self.blocking = blocking
+        if format != "png":
+            writers = 1
+        elif writers is None:
+            writers = min(4, os.cpu_count() or 1)
+        self.writers = max(1, writers)
+
+        self.width = 0
+        self.height = 0
+        self.pitch = 0
+        self.bytesize = 0
+        self.shifts = None
+
+        self.free = queue.Queue()      # Buffers ready to be filled
+        self.pending = queue.Queue()   # Filled buffers waiting for the writer
+        self.threads = []
+        self.lock = threading.Lock()   # Guards the writer statistics
+        self.stream = None
+        self.error = None
+
+        # Unchanged frames are not copied or encoded again
+        self.last_index = None    # Index of the last captured frame
+        self.last_payload = None  # Last stream frame as written (writer thread)
+        self.repeats = []         # (index, source index) of repeated PNG frames
+
+        # Statistics
+        self.frames_captured = 0
+        self.frames_written = 0
+        self.frames_dropped = 0
+        self.frames_repeated = 0
+        self.capture_time = 0.0
+        self.write_time = 0.0
+
+    def start(self, surface):
+        """Allocate the buffer pool for a surface and start the writer threads"""
+        if self.format not in FORMATS:
+            print(f"Warning: Invalid recording format '{self.format}'. Valid formats are: {list(FORMATS)}")
+            return False
+        if surface.get_bytesize() not in (2, 3, 4):
+            print(f"Warning: Cannot record {surface.get_bitsize()} bpp surfaces")
+            return False
+
+        self.width, self.height = surface.get_size()
+        self.pitch = surface.get_pitch()
+        self.bytesize = surface.get_bytesize()
+        self.shifts = surface.get_shifts()
+
+        try:
+            if self.format == "png":
+                os.makedirs(self.path, exist_ok=True)
+            elif self.path == "-":
+                self.stream = sys.stdout.buffer
+            else:
+                self.stream = open(self.path, "wb")
+            if self.format == "y4m":
+                header = f"YUV4MPEG2 W{self.width} H{self.height} F{self.fps}:1 Ip A1:1 C444\n"
+                self.stream.write(header.encode("ascii"))
+        except OSError as e:
+            print(f"Warning: Could not open recording output {self.path}: {e}")
+            return False
+
+        # The whole pool is allocated once, capturing never allocates
+        for _ in range(max(self.pool_size, self.writers)):
+            self.free.put(bytearray(self.pitch * self.height))
+
+        for i in range(self.writers):
+            thread = threading.Thread(target=self._write_frames, name=f"RoboEyesRecorder-{i}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        return True
+
+    def capture(self, surface, changed=True):
+        """Copy a frame into a pool buffer and queue it (render thread)
+
+        changed=False says the frame is the same as the previous one, which
+        is then repeated without copying or encoding it again.
+        """
+        start = time.perf_counter()
+        if not changed and self.last_index is not None:
+            self.pending.put((self.frames_captured, None))
+            self.frames_captured += 1
+            self.frames_repeated += 1
+            return True
+        try:
+            buffer = self.free.get(block=self.blocking)
+        except queue.Empty:
+            self.frames_dropped += 1
+            # The next frame can't repeat one that was never written
+            self.last_index = None
+            return False
+
+        # A plain memory copy; conversion happens on the writer thread
+        view = surface.get_view('0')
+        pixels = memoryview(view).cast('B')
+        try:
+            buffer[:] = pixels
+        finally:
+            # Release the view so the surface is unlocked for drawing
+            pixels.release()
+            del view
+
+        self.last_index = self.frames_captured
+        self.pending.put((self.frames_captured, buffer))
+        self.frames_captured += 1
+        self.capture_time += time.perf_counter() - start
+        return True
+
+    def stop(self):
+        """Write all queued frames, then stop the writers and close the output"""
+        for _ in self.threads:
+            self.pending.put(None)
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
+
+        # Repeated PNG frames link to (or copy) the file they repeat, in
+        # frame order so repeats of repeats find their source
+        for index, source in sorted(self.repeats):
+            if self.error is not None:
+                break
+            try:
+                self._repeat_png(index, source)
+                self.frames_written += 1
+            except OSError as e:
+                self.error = str(e)
+                print(f"Warning: Recording stopped writing at frame {index}: {e}")
+        self.repeats = []
+        if self.stream is not None:
+            try:
+                self.stream.flush()
+                if self.stream is not sys.stdout.buffer:
+                    self.stream.close()
+            except OSError:
+                pass
+            self.stream = None
+        return True
+
+    def get_stats(self):
+        """Get frame counters and mean capture/write times in ms"""
+        captured = self.frames_captured
+        written = self.frames_written
+        return {
+            'captured': captured,
+            'written': written,
+            'dropped': self.frames_dropped,
+            'repeated': self.frames_repeated,
+            'queued': self.pending.qsize(),
+            'mean_capture_ms': self.capture_time / captured * 1000.0 if captured else 0.0,
+            'mean_write_ms': self.write_time / written * 1000.0 if written else 0.0,
+            'error': self.error
+        }
+
+    def _write_frames(self):
+        """Writer thread: convert and write frames until stop() queues None"""
+        while True:
+            item = self.pending.get()
+            if item is None:
+                return
+            index, buffer = item
+            if buffer is None and self.format == "png":
+                # Files of other threads may not exist yet, so link them at stop()
+                with self.lock:
+                    self.repeats.append((index, index - 1))
+                continue
+            start = time.perf_counter()
+            # After a write error frames are only drained, so capture never waits forever
+            written = False
+            if self.error is None:
+                try:
+                    self._write_frame(index, buffer)
+                    written = True
+                except OSError as e:
+                    with self.lock:
+                        if self.error is None:
+                            self.error = str(e)
+                            print(f"Warning: Recording stopped writing at frame {index}: {e}")
+            with self.lock:
+                self.frames_written += written
+                self.write_time += time.perf_counter() - start
+            if buffer is not None:
+                self.free.put(buffer)
+
+    def _write_frame(self, index, buffer):
+        """Convert one raw frame and write it in the recording format"""
+        if buffer is None:
+            # Streams have one writer, so the last payload is the previous frame
+            self.stream.write(self.last_payload)
+            return
+        rgb = surface_to_rgb(buffer, self.width, self.height, self.pitch, self.bytesize, self.shifts)
+        if self.format == "png":
+            data = encode_png(rgb)
+            with open(os.path.join(self.path, f"frame_{index:06d}.png"), "wb") as f:
+                f.write(data)
+        else:
+            if self.format == "rgb":
+                self.last_payload = numpy.ascontiguousarray(rgb).tobytes()
+            else:
+                self.last_payload = b"FRAME\n" + rgb_to_yuv444(rgb).tobytes()
+            self.stream.write(self.last_payload)
+
+    def _repeat_png(self, index, source):
+        """Write a repeated PNG frame as a hard link to the one it repeats"""
+        target = os.path.join(self.path, f"frame_{index:06d}.png")
+        source = os.path.join(self.path, f"frame_{source:06d}.png")
+        if os.path.exists(target):
+            os.remove(target)
+        try:
+            os.link(source, target)
+        except OSError:
+            shutil.copyfile(source, target)
@@ -0,0 +1,68 @@
+"""
+Rendering utilities for RoboEyes
+Handles dirty-rectangle bookkeeping so a frame only clears, redraws and
+presents the screen regions that the face actually touched.
+"""
+
+import pygame
+
+
+class DirtyRectTracker:
+    def __init__(self, bounds):
+        """Initialize the tracker for a screen of the given bounds"""
+        self.bounds = pygame.Rect(bounds)
+
+        # Regions covered by the face on the last drawn frame
+        self.last_rects = []
+        self.last_signature = None
+
+        # Regions to clear before drawing and to present after drawing
+        self.clear_rects = []
+        self.update_rects = []
+
+        # Whether the current frame needs to be drawn at all
+        self.changed = True
+
+        # Force a full-screen redraw on the first frame
+        self.full_redraw = True
+
+    def invalidate(self):
+        """Force the next frame to clear and present the whole screen"""
+        self.full_redraw = True
+        return True
+
+    def begin_frame(self, signature, rects):
+        """Start a frame from its draw signature and the regions it will cover.
+
+        Returns True if the frame has to be drawn, False if it is identical
+        to the last drawn frame and can be skipped entirely. rects may also be
+        a function returning them, called only for frames that are drawn.
+        """
+        if not self.full_redraw and signature == self.last_signature:
+            self.changed = False
+            self.clear_rects = []
+            self.update_rects = []
+            return False
+
+        # Clip the new regions to the screen and drop empty ones
+        if callable(rects):
+            rects = rects()
+        current_rects = []
+        for rect in rects:
+            rect = self.bounds.clip(rect)
+            if rect.width > 0 and rect.height > 0:
+                current_rects.append(rect)
+
+        if self.full_redraw:
+            self.clear_rects = [self.bounds.copy()]
+            self.update_rects = [self.bounds.copy()]
+            self.full_redraw = False
+        else:
+            # Old regions must be cleared, old and new regions presented
+            self.clear_rects = self.last_rects
+            self.update_rects = self.last_rects + current_rects
+
+        self.last_rects = current_rects
+        self.last_signature = signature
+        self.changed = True
+        return True
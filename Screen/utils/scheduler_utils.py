@@ -0,0 +1,175 @@
+"""
+Scheduler utilities for RoboEyes
+Handles power saving for a parked robot: instead of rendering the same face
+at max_fps, the render loop runs at full rate only while something is
+animating, at a low rate while the eyes just drift (idle wandering, easing
+tails), and sleeps while nothing can change until the next deadline (auto
+blink, idle retarget, auto-centering) or until a command arrives.
+
+Steps slept through change nothing, so they are skipped rather than
+simulated on wake-up; the face is the same as if every frame had rendered.
+"""
+
+import math
+import threading
+
+# Frame modes, from most to least work
+BUSY = "busy"          # Animating: render at max_fps
+DRIFT = "drift"        # Only slow idle motion: render at idle_fps
+SETTLED = "settled"    # Nothing moves: sleep until the next deadline
+
+
+class FrameScheduler:
+    def __init__(self, parent):
+        """Initialize a disabled scheduler for the given RoboEyes"""
+        self.parent = parent
+        self.enabled = False
+        self.idle_fps = 15
+        self.hold = 1.0  # Seconds of full frame rate after commands or look_at
+        self.max_sleep = 0.5  # Longest single sleep, so quit() from other threads is seen
+
+        # Set by the command queue when another thread queues a command
+        self.wakeup = threading.Event()
+        self.commands_seen = 0
+        self.server_commands_seen = 0
+        self.last_command_time = float("-inf")
+
+        # Statistics
+        self.frames = {BUSY: 0, DRIFT: 0, SETTLED: 0}
+        self.time_slept = 0.0
+        self.steps_skipped = 0
+
+    def set_enabled(self, state, idle_fps=15, hold=1.0):
+        """Enable/disable power saving (it only applies to real-time clocks)"""
+        parent = self.parent
+        # Drifting frames must stay below the catch-up steps one frame may run
+        # (with a step to spare for timing jitter), or simulation time is lost
+        min_fps = int(math.ceil(1.0 / (parent.sim_step * (parent.max_sim_steps - 1))))
+        if idle_fps < min_fps:
+            print(f"Warning: idle_fps {idle_fps} is below the {min_fps} fps the simulation needs, using {min_fps}")
+            idle_fps = min_fps
+        self.enabled = state
+        self.idle_fps = idle_fps
+        self.hold = hold
+        parent.commands.wakeup = self._wake if state else None
+        return True
+
+    def get_mode(self):
+        """Decide how much rendering the current state needs"""
+        parent = self.parent
+        animations = parent.animations
+
+        # Commands and looks from outside ask for a responsive face
+        commands = parent.commands.commands_applied
+        server = parent.command_server
+        server_commands = server.commands_applied if server is not None else 0
+        if commands != self.commands_seen or server_commands != self.server_commands_seen:
+            self.commands_seen = commands
+            self.server_commands_seen = server_commands
+            self.last_command_time = parent.sim_time
+        recent = parent.sim_time - max(self.last_command_time, parent.gaze_last_look_time) < self.hold
+
+        if (recent or animations.timeline.active or animations.timeline.driven
+                or parent.moods.transition_progress < 1.0
+                or parent.h_flicker or parent.v_flicker
+                or parent.manual_x_velocity or parent.manual_y_velocity
+                or parent.recorder is not None
+                or (parent.profiler is not None and parent.profiler.overlay)):
+            return BUSY
+
+        if (not parent.gaze.is_at_rest() or not parent.interpolator.is_settled()
+                or getattr(parent.sink, "behind", False)
+                or self._auto_centering()):
+            return DRIFT
+        return SETTLED
+
+    def next_deadline(self):
+        """Simulation time of the next change nobody has to ask for"""
+        parent = self.parent
+        animations = parent.animations
+        deadlines = []
+        if animations.auto_blinker:
+            deadlines.append(animations.auto_blinker_next_time)
+        if animations.idle_mode:
+            deadlines.append(animations.idle_next_time)
+        if parent.manual_x_offset or parent.manual_y_offset:
+            deadlines.append(parent.last_key_press_time + parent.auto_center_delay)
+        return min(deadlines) if deadlines else float("inf")
+
+    def wait(self):
+        """Limit the frame rate like clock.tick(), sleeping as long as the face allows"""
+        parent = self.parent
+        mode = self.get_mode()
+        self.frames[mode] += 1
+        if mode == BUSY:
+            parent.clock.tick(parent.max_fps)
+            return mode
+        if mode == DRIFT:
+            parent.clock.tick(self.idle_fps)
+            return mode
+
+        deadline = self.next_deadline()
+        # Simulation time trails the clock by the unsimulated remainder
+        lag = parent.time_source.now() - parent.sim_last_time + parent.sim_accumulator
+        timeout = min(deadline - parent.sim_time - lag, self.max_sleep)
+        if parent.sink.interactive:
+            # Windows deliver key presses only when polled
+            timeout = min(timeout, 1.0 / self.idle_fps)
+        if timeout <= 1.0 / parent.max_fps:
+            parent.clock.tick(parent.max_fps)
+            return mode
+
+        start = parent.time_source.now()
+        self._sleep(timeout)
+        self.time_slept += parent.time_source.now() - start
+        self._skip_steps(deadline)
+        return mode
+
+    def get_stats(self):
+        """Frames per mode, seconds slept and simulation steps skipped"""
+        return {
+            'busy': self.frames[BUSY],
+            'drift': self.frames[DRIFT],
+            'settled': self.frames[SETTLED],
+            'slept_s': self.time_slept,
+            'skipped_steps': self.steps_skipped
+        }
+
+    def _auto_centering(self):
+        """Check if manual offsets are gliding back to the center"""
+        parent = self.parent
+        return ((parent.manual_x_offset or parent.manual_y_offset)
+                and parent.sim_time - parent.last_key_press_time > parent.auto_center_delay)
+
+    def _sleep(self, timeout):
+        """Block until a command arrives or timeout seconds pass"""
+        parent = self.parent
+        self.wakeup.clear()
+        # Commands queued before the clear are already pending
+        if parent.commands.pending:
+            return
+        if parent.command_server is not None:
+            parent.command_server.wait(timeout)
+        else:
+            self.wakeup.wait(timeout)
+
+    def _wake(self):
+        """End a sleep early (any thread, called by the command queue)"""
+        self.wakeup.set()
+        server = self.parent.command_server
+        if server is not None:
+            server.wake()
+
+    def _skip_steps(self, deadline):
+        """Jump simulation time over the slept steps, stopping short of the deadline"""
+        parent = self.parent
+        step = parent.sim_step
+        skip = int((parent.time_source.now() - parent.sim_last_time + parent.sim_accumulator) / step)
+        # The step that reaches the deadline is simulated, so the blink or
+        # retarget happens exactly as if no frame had been skipped
+        if deadline != float("inf"):
+            skip = min(skip, int((deadline - parent.sim_time) / step) - 1)
+        if skip > 0:
+            parent.sim_time += skip * step
+            parent.sim_last_time += skip * step
+            self.steps_skipped += skip
@@ -0,0 +1,163 @@
+"""
+Signed distance field utilities for RoboEyes
+Handles rasterizing eye shapes: every shape is a parameter set for one of a
+few signed distance functions (superellipse, rounded rectangle, teardrop),
+optionally cut by a slanted line (the angry brow). The distance of every
+pixel center is computed in one vectorized NumPy pass and turned into
+anti-aliased coverage, so a new shape is a new entry in SHAPES, not new
+drawing code.
+
+Distances are in pixels, negative inside the shape.
+"""
+
+import numpy
+
+# Parameters of every eye shape:
+#   sdf       superellipse, rounded_rect or teardrop
+#   exponent  superellipse exponent (2 is an ellipse, larger gets squarer)
+#   circle    superellipse fitted to the smaller side instead of the box
+#   corner    rounded_rect corner radius as a fraction of the smaller side
+#             (0.5 makes a capsule)
+#   bulb      teardrop bottom radius as a fraction of the height (the
+#             drop is stretched sideways to fill the width)
+#   tip       teardrop tip radius as a fraction of the bottom radius
+#   cut       fraction of the height the inner top corner is cut down to;
+#             cut shapes differ between the left and the right eye
+SHAPES = {
+    "round": {"sdf": "superellipse", "exponent": 2.0, "circle": True},
+    "oval": {"sdf": "superellipse", "exponent": 2.0},
+    "squircle": {"sdf": "superellipse", "exponent": 4.0},
+    "square": {"sdf": "rounded_rect", "corner": 1.0 / 3.0},
+    "pill": {"sdf": "rounded_rect", "corner": 0.5},
+    "angry": {"sdf": "rounded_rect", "corner": 1.0 / 3.0, "cut": 0.5},
+    "teardrop": {"sdf": "teardrop", "bulb": 0.36, "tip": 0.15},
+}
+
+SDF_FUNCTIONS = ("superellipse", "rounded_rect", "teardrop")
+
+NUMERIC_PARAMETERS = ("exponent", "corner", "bulb", "tip", "cut")
+
+
+def validate_shape(params):
+    """Check a shape parameter set, returns an error message or None"""
+    sdf = params.get("sdf")
+    if sdf not in SDF_FUNCTIONS:
+        return f"unknown sdf '{sdf}', valid ones are: {list(SDF_FUNCTIONS)}"
+    for name in NUMERIC_PARAMETERS:
+        value = params.get(name, 0.0)
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return f"{name} must be a number, got {value!r}"
+    if params.get("exponent", 2.0) <= 0:
+        return "exponent must be positive"
+    if not 0 <= params.get("corner", 0.0) <= 0.5:
+        return "corner must be between 0 and 0.5"
+    if not 0 <= params.get("cut", 0.0) <= 1:
+        return "cut must be between 0 and 1"
+    if not 0 < params.get("bulb", 0.5) <= 0.5:
+        return "bulb must be between 0 and 0.5"
+    if not 0 <= params.get("tip", 0.0) <= 1:
+        return "tip must be between 0 and 1"
+    return None
+
+
+def is_sided(params):
+    """Check if a shape differs between the left and the right eye"""
+    return params.get("cut", 0.0) > 0
+
+
+def render_coverage(params, width, height, margin, is_left_eye):
+    """Rasterize a shape filling a width x height box inside a transparent margin
+
+    Returns an (width + 2 * margin, height + 2 * margin) uint8 array of
+    coverage in surfarray (x, y) order.
+    """
+    # Pixel centers relative to the center of the eye box
+    # (single precision is plenty for sub-pixel coverage, and twice as fast)
+    xs = numpy.arange(width + 2 * margin, dtype=numpy.float32) + numpy.float32(0.5 - margin - width / 2.0)
+    ys = numpy.arange(height + 2 * margin, dtype=numpy.float32) + numpy.float32(0.5 - margin - height / 2.0)
+    x = xs[:, numpy.newaxis]
+    y = ys[numpy.newaxis, :]
+
+    sdf = params["sdf"]
+    if sdf == "superellipse":
+        distance = _superellipse(x, y, width, height, params.get("exponent", 2.0), params.get("circle", False))
+    elif sdf == "rounded_rect":
+        distance = _rounded_rect(x, y, width, height, params.get("corner", 0.0))
+    else:
+        distance = _teardrop(x, y, width, height, params.get("bulb", 0.5), params.get("tip", 0.0))
+
+    cut = params.get("cut", 0.0)
+    if cut > 0:
+        distance = numpy.maximum(distance, _cut(x, y, width, height, cut, is_left_eye))
+
+    # One pixel wide anti-aliased edge
+    coverage = numpy.clip(0.5 - distance, 0.0, 1.0)
+    return (coverage * 255.0 + 0.5).astype(numpy.uint8)
+
+
+def _superellipse(x, y, width, height, exponent, circle):
+    """Approximate distance to |x/a|^n + |y/b|^n = 1, exact for circles"""
+    a, b = width / 2.0, height / 2.0
+    if circle:
+        a = b = min(width, height) // 2
+    a, b = max(a, 0.5), max(b, 0.5)
+    # Per-axis terms are computed on the row and column before broadcasting
+    u = numpy.abs(x) / a
+    v = numpy.abs(y) / b
+    un = u ** exponent
+    vn = v ** exponent
+    rho = (un + vn) ** (1.0 / exponent)
+    # First-order distance: the field divided by the length of its gradient
+    scale = numpy.maximum(rho, 1e-6) ** (1.0 - exponent)
+    gradient_x = un / numpy.maximum(u, 1e-6) / a
+    gradient_y = vn / numpy.maximum(v, 1e-6) / b
+    gradient = numpy.maximum(scale * numpy.sqrt(gradient_x * gradient_x + gradient_y * gradient_y), 1e-6)
+    return (rho - 1.0) / gradient
+
+
+def _rounded_rect(x, y, width, height, corner):
+    """Exact distance to a box with rounded corners"""
+    radius = min(width, height) * corner
+    qx = numpy.abs(x) - width / 2.0 + radius
+    qy = numpy.abs(y) - height / 2.0 + radius
+    outside = numpy.hypot(numpy.maximum(qx, 0.0), numpy.maximum(qy, 0.0))
+    inside = numpy.minimum(numpy.maximum(qx, qy), 0.0)
+    return outside + inside - radius
+
+
+def _teardrop(x, y, width, height, bulb, tip):
+    """Distance to a teardrop: a round bottom narrowing to a tip at the top"""
+    # A circle at the bottom and a small one at the top, joined by tangents,
+    # stretched sideways so the bottom circle fills the width
+    bottom = max(height * bulb, 0.5)
+    top = bottom * tip
+    length = height - bottom - top
+    px = numpy.abs(x) * (2.0 * bottom / max(width, 1))
+    py = (height / 2.0 - bottom) - y  # Up from the center of the bottom circle
+    if length <= bottom - top:
+        # Too short for a tip, just the bottom circle
+        field = numpy.hypot(px, py) - bottom
+    else:
+        slope = (bottom - top) / length
+        along = numpy.sqrt(1.0 - slope * slope)
+        k = py * along - px * slope
+        field = numpy.where(
+            k < 0.0, numpy.hypot(px, py) - bottom,
+            numpy.where(k > along * length, numpy.hypot(px, py - length) - top,
+                        px * along + py * slope - bottom))
+    # Stretching skews distances, so bring them back to pixels by the gradient
+    gradient_x, gradient_y = numpy.gradient(field)
+    return field / numpy.maximum(numpy.hypot(gradient_x, gradient_y), 1e-9)
+
+
+def _cut(x, y, width, height, cut, is_left_eye):
+    """Distance to the slanted line cutting the inner top corner, negative below it"""
+    # Left eyes are cut from the top outer corner down to the inner side at
+    # cut * height, right eyes mirrored
+    if not is_left_eye:
+        x = -x
+    drop = height * cut
+    # Line through (-width/2, -height/2) and (width/2, -height/2 + drop)
+    dx, dy = float(width), drop
+    length = max((dx * dx + dy * dy) ** 0.5, 1e-9)
+    return -((y + height / 2.0) * dx - (x + width / 2.0) * dy) / length
@@ -0,0 +1,295 @@
+"""
+Command server utilities for RoboEyes
+Handles a UDP and Unix-socket command server so external processes (planner,
+LLM, sensors) can drive the eyes without pygame keyboard events.
+
+The server runs on its own asyncio event loop which RoboEyes steps once per
+frame without blocking. Commands are plain text, one per line (or separated
+by ';'), and everything that arrives within one frame is applied as a batch:
+
+    set_mood SAD            mood by name or number
+    set_position NE         position by compass name or number
+    set_eye_shape pill
+    wink L                  L or R (default L)
+    blink | laugh | confused
+    play nod                animation clip by name (see utils.clip_utils)
+    toggle_cyclops
+    gaze 0.5 -0.2           normalized gaze, x and y in [-1, 1]
+    /joystick x=700 y=300   WifiHandler::parseJoystickCommand convention (0-1023)
+"""
+
+import asyncio
+import os
+import re
+import socket
+
+from utils.moods_utils import DEFAULT, TIRED, SAD, EXCITED, ANGRY
+from utils.shapes_utils import N, NE, E, SE, S, SW, W, NW
+
+MOOD_NAMES = {"DEFAULT": DEFAULT, "TIRED": TIRED, "SAD": SAD, "EXCITED": EXCITED, "ANGRY": ANGRY}
+POSITION_NAMES = {"DEFAULT": DEFAULT, "C": DEFAULT, "N": N, "NE": NE, "E": E, "SE": SE,
+                  "S": S, "SW": SW, "W": W, "NW": NW}
+
+# Commands that set state: only the last one within a frame is applied
+COALESCED_COMMANDS = ("set_mood", "set_position", "set_eye_shape", "gaze")
+
+# Joystick values as sent to the robot base (analogRead range, centered)
+JOYSTICK_CENTER = 512
+JOYSTICK_RANGE = 512
+
+# Like Arduino's String.toInt() on the 4 characters after "x=" / "y="
+JOYSTICK_VALUE = re.compile(r"\s*(-?\d+)")
+
+
+def parse_joystick_command(command):
+    """Parse '/joystick x=.. y=..' into raw (x, y) integers, None if invalid"""
+    if not command.startswith("/joystick"):
+        return None
+    x_index = command.find("x=")
+    y_index = command.find("y=")
+    if x_index == -1 or y_index == -1:
+        return None
+    x_match = JOYSTICK_VALUE.match(command[x_index + 2:x_index + 6])
+    y_match = JOYSTICK_VALUE.match(command[y_index + 2:y_index + 6])
+    x = int(x_match.group(1)) if x_match else 0
+    y = int(y_match.group(1)) if y_match else 0
+    return x, y
+
+
+def _named_value(value, names):
+    """Look up a name or a number among the values of names, None if it isn't one"""
+    value = value.upper()
+    if value in names:
+        return names[value]
+    number = int(value)
+    # A number that isn't a known value would quietly set a state that doesn't exist
+    return number if number in names.values() else None
+
+
+def parse_command(line):
+    """Parse one command line into a (name, args) tuple, None if invalid"""
+    line = line.strip()
+    if not line:
+        return None
+
+    joystick = parse_joystick_command(line)
+    if joystick is not None:
+        x = (joystick[0] - JOYSTICK_CENTER) / JOYSTICK_RANGE
+        y = (joystick[1] - JOYSTICK_CENTER) / JOYSTICK_RANGE
+        return ("gaze", (max(-1.0, min(1.0, x)), max(-1.0, min(1.0, y))))
+
+    parts = line.split()
+    name = parts[0].lower()
+    args = parts[1:]
+    try:
+        if name == "set_mood" and len(args) == 1:
+            value = _named_value(args[0], MOOD_NAMES)
+            return None if value is None else (name, (value,))
+        if name == "set_position" and len(args) == 1:
+            value = _named_value(args[0], POSITION_NAMES)
+            return None if value is None else (name, (value,))
+        if name == "set_eye_shape" and len(args) == 1:
+            return (name, (args[0].lower(),))
+        if name == "wink" and len(args) <= 1:
+            return (name, (not args or args[0].upper() != "R",))
+        if name in ("blink", "laugh", "confused", "toggle_cyclops") and not args:
+            return (name, ())
+        if name == "play" and len(args) == 1:
+            return (name, (args[0],))
+        if name == "gaze" and len(args) == 2:
+            x, y = float(args[0]), float(args[1])
+            return (name, (max(-1.0, min(1.0, x)), max(-1.0, min(1.0, y))))
+    except ValueError:
+        return None
+    return None
+
+
+def apply_command(eyes, name, args):
+    """Run a single parsed command on a RoboEyes instance"""
+    if name == "set_mood":
+        eyes.set_mood(*args)
+    elif name == "set_position":
+        eyes.set_position(*args)
+    elif name == "set_eye_shape":
+        eyes.set_eye_shape(*args)
+    elif name == "wink":
+        eyes.wink(left_eye=args[0])
+    elif name == "blink":
+        eyes.blink()
+    elif name == "laugh":
+        eyes.anim_laugh()
+    elif name == "confused":
+        eyes.anim_confused()
+    elif name == "toggle_cyclops":
+        eyes.toggle_cyclops()
+    elif name == "play":
+        eyes.play_animation(*args)
+    elif name == "gaze":
+        eyes.look_at(*args)
+
+
+class _CommandProtocol(asyncio.Protocol, asyncio.DatagramProtocol):
+    """Receives datagrams or stream data and hands lines to the server"""
+
+    def __init__(self, server):
+        self.server = server
+        self.buffer = b""
+
+    def datagram_received(self, data, addr):
+        self.server.receive(data)
+
+    def data_received(self, data):
+        # Stream sockets may split lines, so only complete lines are handed on
+        self.buffer += data
+        lines = self.buffer.split(b"\n")
+        self.buffer = lines.pop()
+        for line in lines:
+            self.server.receive(line)
+
+    def eof_received(self):
+        # A last line without a newline still counts when the sender closes
+        if self.buffer:
+            self.server.receive(self.buffer)
+            self.buffer = b""
+
+
+class CommandServer:
+    def __init__(self, parent, host="127.0.0.1", udp_port=5005, unix_path=None):
+        """Initialize the server for the given RoboEyes; start() opens the sockets"""
+        self.parent = parent
+        self.host = host
+        self.udp_port = udp_port
+        self.unix_path = unix_path
+
+        self.loop = None
+        # Accepting a stream connection takes a few loop iterations
+        self.iterations_per_poll = 4
+        self.transports = []
+        self.unix_server = None
+        self.pending = []
+        self.waiting = False  # Inside wait(), a command ends it early
+
+        # Statistics
+        self.commands_received = 0
+        self.commands_applied = 0
+        self.invalid_commands = 0
+
+    def start(self):
+        """Open the UDP and/or Unix sockets on a private event loop"""
+        self.loop = asyncio.new_event_loop()
+        try:
+            if self.udp_port is not None:
+                transport, _ = self.loop.run_until_complete(self.loop.create_datagram_endpoint(
+                    lambda: _CommandProtocol(self),
+                    local_addr=(self.host, self.udp_port),
+                    family=socket.AF_INET
+                ))
+                self.transports.append(transport)
+            if self.unix_path is not None:
+                if os.path.exists(self.unix_path):
+                    os.unlink(self.unix_path)
+                self.unix_server = self.loop.run_until_complete(self.loop.create_unix_server(
+                    lambda: _CommandProtocol(self),
+                    path=self.unix_path
+                ))
+        except OSError as e:
+            print(f"Warning: Command server could not open its sockets: {e}")
+            self.stop()
+            return False
+        return True
+
+    def receive(self, data):
+        """Queue all commands from a received packet or line"""
+        text = data.decode("utf-8", errors="replace")
+        for line in re.split(r"[;\n]", text):
+            if not line.strip():
+                continue
+            self.commands_received += 1
+            command = parse_command(line)
+            if command is None:
+                self.invalid_commands += 1
+            else:
+                self.pending.append(command)
+                if self.waiting:
+                    self.loop.stop()
+
+    def poll(self):
+        """Process ready socket I/O without blocking and apply the batch"""
+        if self.loop is None:
+            return 0
+        self._run_iterations(self.iterations_per_poll)
+        return self.apply_pending()
+
+    def wait(self, timeout):
+        """Block until a command arrives, wake() is called or timeout seconds pass"""
+        if self.loop is None or self.pending:
+            return bool(self.pending)
+        timer = self.loop.call_later(timeout, self.loop.stop)
+        self.waiting = True
+        try:
+            self.loop.run_forever()
+        finally:
+            self.waiting = False
+            timer.cancel()
+        return bool(self.pending)
+
+    def wake(self):
+        """End a wait() early (any thread)"""
+        loop = self.loop
+        if loop is not None and not loop.is_closed():
+            # A stop queued while not waiting only ends one later iteration early
+            loop.call_soon_threadsafe(loop.stop)
+
+    def _run_iterations(self, count):
+        """Run the event loop for a few iterations without ever blocking"""
+        # A loop stopped from its own first callback runs exactly one
+        # iteration, and polls the sockets with a zero timeout
+        for _ in range(count):
+            self.loop.call_soon(self.loop.stop)
+            self.loop.run_forever()
+
+    def apply_pending(self):
+        """Apply every queued command, keeping only the last of each setter"""
+        if not self.pending:
+            return 0
+        batch = self.pending
+        self.pending = []
+
+        last_index = {}
+        for i, (name, _) in enumerate(batch):
+            if name in COALESCED_COMMANDS:
+                last_index[name] = i
+
+        applied = 0
+        for i, (name, args) in enumerate(batch):
+            if name in last_index and last_index[name] != i:
+                continue
+            self._apply(name, args)
+            applied += 1
+        self.commands_applied += applied
+        return applied
+
+    def _apply(self, name, args):
+        """Run a single parsed command on the parent RoboEyes"""
+        apply_command(self.parent, name, args)
+
+    def stop(self):
+        """Close all sockets and the event loop"""
+        if self.loop is None:
+            return True
+        for transport in self.transports:
+            transport.close()
+        self.transports = []
+        if self.unix_server is not None:
+            self.unix_server.close()
+            self.unix_server = None
+            if os.path.exists(self.unix_path):
+                os.unlink(self.unix_path)
+        # Let the closing transports finish before the loop goes away
+        self._run_iterations(self.iterations_per_poll)
+        for task in asyncio.all_tasks(self.loop):
+            task.cancel()
+        self._run_iterations(1)
+        self.loop.close()
+        self.loop = None
+        return True
@@ -5,7 +5,9 @@ their rendering, and size/position adjustments.
 """
 
 import pygame
-import math
+
+from utils.sprites_utils import SpriteCache, new_sprite
+from utils.sdf_utils import SHAPES, validate_shape, is_sided, render_coverage
 
 # Direction constants
 N = 1   # north, top center
@@ -18,279 +20,158 @@ W = 7   # west, left center
 NW = 8  # northwest, top left
 DEFAULT = 0  # center
 
+# Unit gaze vectors for the directions (screen y points down)
+DIRECTION_VECTORS = {
+    DEFAULT: (0.0, 0.0),
+    N: (0.0, -1.0),
+    NE: (1.0, -1.0),
+    E: (1.0, 0.0),
+    SE: (1.0, 1.0),
+    S: (0.0, 1.0),
+    SW: (-1.0, 1.0),
+    W: (-1.0, 0.0),
+    NW: (-1.0, -1.0),
+}
+
+# Transparent border around eye sprites, room for the anti-aliased edges
+SPRITE_MARGIN = 2
+
+# Cross-fades between shapes use this many cached intermediate sprites
+FADE_STEPS = 8
+
 class ShapesHandler:
     def __init__(self, parent):
         """Initialize shapes with reference to parent RoboEyes object"""
         self.parent = parent
         self.eye_shape = "square"  # Default eye shape
-        # Define valid shapes
-        self.valid_shapes = ["round", "square", "pill", "oval", "angry"]
+        # Parameter sets of the shapes (see utils.sdf_utils), add_shape() adds more
+        self.shapes = {name: dict(params) for name, params in SHAPES.items()}
+        self.valid_shapes = list(self.shapes)
+        # Pre-rendered eye sprites keyed by (shape, width, height, color, side)
+        self.sprite_cache = SpriteCache()
+        
+        # Shape being faded out during a mood transition, and how far the
+        # fade is (0 shows only fade_from, FADE_STEPS only eye_shape)
+        self.fade_from = None
+        self.fade_level = FADE_STEPS
 
     def set_eye_shape(self, shape):
         """Set the shape of the eyes"""
         if shape in self.valid_shapes:
             self.eye_shape = shape
-            # Trigger redraw or update if necessary in parent
-            # self.parent.request_update() 
+            # An explicit shape change ends any cross-fade
+            self.fade_from = None
+            self.fade_level = FADE_STEPS
             return True
         print(f"Warning: Invalid eye shape '{shape}'. Valid shapes are: {self.valid_shapes}")
         return False
 
+    def add_shape(self, name, **params):
+        """Add (or replace) an eye shape given as SDF parameters (see utils.sdf_utils)"""
+        error = validate_shape(params)
+        if error is not None:
+            print(f"Warning: Invalid parameters for eye shape '{name}': {error}")
+            return False
+        self.shapes[name] = params
+        if name not in self.valid_shapes:
+            self.valid_shapes.append(name)
+        # Sprites rendered with the old parameters are stale
+        self.sprite_cache.clear()
+        return True
+
     def set_width(self, left_eye, right_eye):
         """Set the width of both eyes"""
-        # Consider adding validation (e.g., width > 0)
-        self.parent.eye_l_width = left_eye
-        self.parent.eye_r_width = right_eye
-        # Recalculate default positions after size change
-        self.set_position(self.parent.current_position if hasattr(self.parent, 'current_position') else DEFAULT)
+        if left_eye <= 0 or right_eye <= 0:
+            print(f"Warning: Eye width must be positive, got {left_eye} and {right_eye}")
+            return False
+        self.parent.state.eye_l_width = left_eye
+        self.parent.state.eye_r_width = right_eye
+        # Recenter the eyes once before the next frame, however many sizes change
+        self.parent.layout_dirty = True
         return True
 
     def set_height(self, left_eye, right_eye):
         """Set the height of both eyes"""
-        # Consider adding validation (e.g., height > 0)
-        self.parent.eye_l_height = left_eye
-        self.parent.eye_r_height = right_eye
-        # Recalculate default positions after size change
-        self.set_position(self.parent.current_position if hasattr(self.parent, 'current_position') else DEFAULT)
+        if left_eye <= 0 or right_eye <= 0:
+            print(f"Warning: Eye height must be positive, got {left_eye} and {right_eye}")
+            return False
+        self.parent.state.eye_l_height = left_eye
+        self.parent.state.eye_r_height = right_eye
+        # Recenter the eyes once before the next frame, however many sizes change
+        self.parent.layout_dirty = True
         return True
 
     def set_position(self, position):
         """Set the target eye position (where the eyes should look)"""
-        # Ensure parent attributes needed are initialized
-        if not all(hasattr(self.parent, attr) for attr in ['screen_width', 'screen_height', 'eye_l_width', 'eye_r_width', 'eye_l_height', 'eye_r_height', 'eye_gap']):
-            print("Warning: Parent object missing required attributes for set_position.")
-            # Set defaults or return if critical attributes are missing
-            # Example: set default values if they don't exist
-            self.parent.screen_width = getattr(self.parent, 'screen_width', 800)
-            self.parent.screen_height = getattr(self.parent, 'screen_height', 480)
-            self.parent.eye_l_width = getattr(self.parent, 'eye_l_width', 100)
-            self.parent.eye_r_width = getattr(self.parent, 'eye_r_width', 100)
-            self.parent.eye_l_height = getattr(self.parent, 'eye_l_height', 100)
-            self.parent.eye_r_height = getattr(self.parent, 'eye_r_height', 100)
-            self.parent.eye_gap = getattr(self.parent, 'eye_gap', 50)
-            # return False # Optionally stop if setup is incomplete
-
-        center_x = self.parent.screen_width / 2
-        center_y = self.parent.screen_height / 2
-
-        # Calculate default position (centered)
-        # Ensure these are calculated correctly based on current width/height/gap
-        self.parent.eye_l_x_default = center_x - self.parent.eye_l_width - self.parent.eye_gap / 2
-        self.parent.eye_r_x_default = center_x + self.parent.eye_gap / 2
-        self.parent.eye_l_y_default = center_y - self.parent.eye_l_height / 2
-        self.parent.eye_r_y_default = center_y - self.parent.eye_r_height / 2
-
-        # Initialize _next positions to default if they don't exist
-        if not hasattr(self.parent, 'eye_l_x_next'): self.parent.eye_l_x_next = self.parent.eye_l_x_default
-        if not hasattr(self.parent, 'eye_l_y_next'): self.parent.eye_l_y_next = self.parent.eye_l_y_default
-        if not hasattr(self.parent, 'eye_r_x_next'): self.parent.eye_r_x_next = self.parent.eye_r_x_default
-        if not hasattr(self.parent, 'eye_r_y_next'): self.parent.eye_r_y_next = self.parent.eye_r_y_default
-
-
-        # Apply offset based on position - Consider making offset proportional
-        # offset_x = self.parent.eye_l_width * 0.1 # Example: 10% of width
-        # offset_y = self.parent.eye_l_height * 0.1 # Example: 10% of height
-        offset_x = 10 # Keep fixed offset for now
-        offset_y = 10 # Keep fixed offset for now
-        
-        # Calculate target next positions based on direction
-        target_l_x = self.parent.eye_l_x_default
-        target_l_y = self.parent.eye_l_y_default
-        target_r_x = self.parent.eye_r_x_default
-        target_r_y = self.parent.eye_r_y_default
-
-        if position == N:
-            target_l_y -= offset_y
-            target_r_y -= offset_y
-        elif position == NE:
-            target_l_x += offset_x
-            target_l_y -= offset_y
-            target_r_x += offset_x
-            target_r_y -= offset_y
-        elif position == E:
-            target_l_x += offset_x
-            target_r_x += offset_x
-        elif position == SE:
-            target_l_x += offset_x
-            target_l_y += offset_y
-            target_r_x += offset_x
-            target_r_y += offset_y
-        elif position == S:
-            target_l_y += offset_y
-            target_r_y += offset_y
-        elif position == SW:
-            target_l_x -= offset_x
-            target_l_y += offset_y
-            target_r_x -= offset_x
-            target_r_y += offset_y
-        elif position == W:
-            target_l_x -= offset_x
-            target_r_x -= offset_x
-        elif position == NW:
-            target_l_x -= offset_x
-            target_l_y -= offset_y
-            target_r_x -= offset_x
-            target_r_y -= offset_y
-        # Else: DEFAULT, targets remain as default calculated above
-
-        # Set the calculated target positions
-        self.parent.eye_l_x_next = target_l_x
-        self.parent.eye_l_y_next = target_l_y
-        self.parent.eye_r_x_next = target_r_x
-        self.parent.eye_r_y_next = target_r_y
-        
-        # Store the current direction
-        self.parent.current_position = position
-
+        if position not in DIRECTION_VECTORS:
+            print(f"Warning: Invalid eye position '{position}'. Valid positions are 0-8")
+            return False
+        self.parent.position = position
+        return self.parent.look_at(*DIRECTION_VECTORS[position])
+
+    def start_fade(self, from_shape):
+        """Cross-fade from another shape to the current one (see set_fade)"""
+        if from_shape != self.eye_shape:
+            self.fade_from = from_shape
+            self.fade_level = 0
         return True
 
-    def draw_eyes(self, screen, eye_l_x_current, eye_l_y_current, eye_r_x_current, eye_r_y_current,
-                  eye_l_width_current, eye_l_height_current, eye_r_width_current, eye_r_height_current,
-                  eye_color):
-        """Draw eyes based on selected shape"""
-        # Convert all position and size values to integers to avoid float errors
-        eye_l_x = int(eye_l_x_current)
-        eye_l_y = int(eye_l_y_current)
-        eye_r_x = int(eye_r_x_current)
-        eye_r_y = int(eye_r_y_current)
-        eye_l_width = int(eye_l_width_current)
-        eye_l_height = int(eye_l_height_current)
-        eye_r_width = int(eye_r_width_current)
-        eye_r_height = int(eye_r_height_current)
-
-        # Check if we're in cyclops mode
-        cyclops_mode = getattr(self.parent, 'cyclops', False)
-
-        if self.eye_shape == "round":
-            # Calculate radii for circular eyes (use min dimension for perfect circle)
-            radius_l = min(eye_l_width, eye_l_height) // 2
-            radius_r = min(eye_r_width, eye_r_height) // 2
-
-            # Calculate circle centers based on the actual bounding box
-            center_l_x = eye_l_x + eye_l_width // 2
-            center_l_y = eye_l_y + eye_l_height // 2
-            center_r_x = eye_r_x + eye_r_width // 2
-            center_r_y = eye_r_y + eye_r_height // 2
-
-            # Draw circular eyes
-            pygame.draw.circle(screen, eye_color, (center_l_x, center_l_y), radius_l)
-            if not cyclops_mode:
-                pygame.draw.circle(screen, eye_color, (center_r_x, center_r_y), radius_r)
-
-        elif self.eye_shape == "square":
-            # Draw square eyes with rounded corners (radius ~30% of the smaller dimension)
-            # Ensure width/height are treated correctly if not equal
-            corner_radius_l = min(eye_l_width, eye_l_height) // 3
-            corner_radius_r = min(eye_r_width, eye_r_height) // 3
-
-            # Left eye rounded rect
-            pygame.draw.rect(screen, eye_color, (eye_l_x, eye_l_y, eye_l_width, eye_l_height), border_radius=corner_radius_l)
-            # Right eye rounded rect (only if not cyclops)
-            if not cyclops_mode:
-                pygame.draw.rect(screen, eye_color, (eye_r_x, eye_r_y, eye_r_width, eye_r_height), border_radius=corner_radius_r)
-
-        elif self.eye_shape == "pill":
-            # Draw pill-shaped eyes (capsule shape)
-            # Rounded rectangle with radius = half of the height (for horizontal pills)
-            # Ensure height > 0 to avoid negative radius
-            radius_l = max(1, eye_l_height // 2)
-            radius_r = max(1, eye_r_height // 2)
-            pygame.draw.rect(screen, eye_color, (eye_l_x, eye_l_y, eye_l_width, eye_l_height), border_radius=radius_l)
-            if not cyclops_mode:
-                pygame.draw.rect(screen, eye_color, (eye_r_x, eye_r_y, eye_r_width, eye_r_height), border_radius=radius_r)
-
-        elif self.eye_shape == "angry":
-            # Draw angry-shaped eyes (angled eyes from image)
-            # Ensure parent has a bgcolor attribute for the cut-out
-            if not hasattr(self.parent, 'bgcolor'):
-                 # Default background if not set in parent - Use black or your actual default
-                 print("Warning: Parent object missing 'bgcolor' attribute. Defaulting to black for angry eye cut-out.")
-                 self.parent.bgcolor = (0, 0, 0)
-
-            bg_color = self.parent.bgcolor
-
-            # Left eye
-            self._draw_angry(
-                screen,
-                eye_color,
-                bg_color, # Pass background color
-                eye_l_x,
-                eye_l_y,
-                eye_l_width,
-                eye_l_height,
-                is_left_eye=True  # Pass flag for left eye
-            )
-
-            # Right eye (only if not cyclops)
-            if not cyclops_mode:
-                self._draw_angry(
-                    screen,
-                    eye_color,
-                    bg_color, # Pass background color
-                    eye_r_x,
-                    eye_r_y,
-                    eye_r_width,
-                    eye_r_height,
-                    is_left_eye=False # Pass flag for right eye
-                )
-
-        elif self.eye_shape == "oval":
-            # Draw oval-shaped eyes (ellipses) using the bounding box
-            # Left eye
-            pygame.draw.ellipse(screen, eye_color, (eye_l_x, eye_l_y, eye_l_width, eye_l_height))
-            # Right eye (only if not cyclops)
-            if not cyclops_mode:
-                pygame.draw.ellipse(screen, eye_color, (eye_r_x, eye_r_y, eye_r_width, eye_r_height))
-
-    def _draw_angry(self, screen, color, bg_color, x, y, width, height, is_left_eye):
-        # ... (parameter validation, radius calculations as before) ...
-        
-        # --- NEW: Use a common radius for all corners initially ---
-        common_radius = min(width, height) // 3
-        common_radius = min(common_radius, width // 2, height // 2)
-        common_radius = max(0, common_radius)
-
-        # Angle properties (using user's preferred values)
-        angle_height = height // 2 
-        angle_width = width // 1 # width
-        angle_height = max(0, angle_height)
-        angle_width = max(0, angle_width)
-        # --- End of Parameters ---
-
-        # 1. Draw the base rectangle with ALL corners rounded (initially)
-        try:
-            # Pygame >= 2.0.0 needed for border_radius
-            pygame.draw.rect(
-                screen,
-                color,
-                (x, y, width, height),
-                border_radius=common_radius # Apply radius to ALL corners
-            )
-        except TypeError:
-            # Fallback for older Pygame versions - More complex to do all corners
-            print("Warning: Fallback rendering for angry eyes might not show rounded top corners.")
-            # Basic rect as fallback placeholder - won't have rounded top corners
-            pygame.draw.rect(screen, color, (x, y, width, height)) 
-            # Could attempt manual corner drawing here if needed, but gets complex
-
-        # 2. Define points for the triangle to "cut out" the top inner corner
-        #    These points remain the same, they define the area to be overlaid with bg_color
-        cut_points = []
-        if is_left_eye:
-            # Left eye: Cut top-right (inner)
-            cut_points = [
-                (x + width - angle_width, y), # Effectively (x, y) since angle_width = width
-                (x + width + 1, y),
-                (x + width + 1, y + angle_height)
-            ]
-        else: # Right eye
-            # Right eye: Cut top-left (inner)
-            cut_points = [
-                (x - 1, y),
-                (x + angle_width, y), # Effectively (x + width, y)
-                (x - 1, y + angle_height)
-            ]
+    def set_fade(self, progress):
+        """Set how far the cross-fade is, progress from 0 to 1"""
+        if self.fade_from is not None:
+            self.fade_level = min(FADE_STEPS, int(progress * FADE_STEPS))
+            if self.fade_level == FADE_STEPS:
+                self.fade_from = None
+        return True
 
-        # 3. Draw the cutting triangle with the background color
-        if angle_width > 0 and angle_height > 0 and width > 0 and height > 0:
-             pygame.draw.polygon(screen, bg_color, cut_points)
\ No newline at end of file
+    def get_fade_sprite(self, width, height, eye_color, is_left_eye):
+        """Get the sprite for an eye, mid-fade if a cross-fade is running"""
+        if self.fade_from is None:
+            return self.get_eye_sprite(self.eye_shape, width, height, eye_color, is_left_eye)
+        if self.fade_level == 0:
+            return self.get_eye_sprite(self.fade_from, width, height, eye_color, is_left_eye)
+        key = ("fade", self.fade_from, self.eye_shape, self.fade_level, width, height, tuple(eye_color), is_left_eye)
+        return self.sprite_cache.get(key, self._render_fade_sprite, self.fade_from, self.eye_shape,
+                                     self.fade_level / FADE_STEPS, width, height, eye_color, is_left_eye)
+
+    def get_eye_area(self, width, height, top, bottom):
+        """Get the part of an eye sprite that eyelids covering top/bottom rows leave open
+
+        Returns None when the eye is fully open (blit the whole sprite) and an
+        empty rect when it is closed. Covered rows are simply not blitted, so
+        eyelids work on any background.
+        """
+        if top <= 0 and bottom <= 0:
+            return None
+        m = SPRITE_MARGIN
+        # An uncovered edge keeps the sprite margin (the angry cut-out reaches into it)
+        area_top = m + top if top > 0 else 0
+        area_bottom = m + height - bottom if bottom > 0 else height + 2 * m
+        return pygame.Rect(0, area_top, width + 2 * m, max(0, area_bottom - area_top))
+
+    def _render_fade_sprite(self, from_shape, to_shape, amount, width, height, eye_color, is_left_eye):
+        """Mix the coverage of two shapes; the color stays the eye color"""
+        alpha_from = pygame.surfarray.array_alpha(self.get_eye_sprite(from_shape, width, height, eye_color, is_left_eye))
+        alpha_to = pygame.surfarray.array_alpha(self.get_eye_sprite(to_shape, width, height, eye_color, is_left_eye))
+        sprite = new_sprite(width + 2 * SPRITE_MARGIN, height + 2 * SPRITE_MARGIN)
+        sprite.fill(tuple(eye_color)[:3] + (0,))
+        alpha = pygame.surfarray.pixels_alpha(sprite)
+        alpha[...] = (alpha_from * (1.0 - amount) + alpha_to * amount).astype(alpha.dtype)
+        del alpha  # Unlock the sprite
+        return sprite
+
+    def get_eye_sprite(self, shape, width, height, eye_color, is_left_eye):
+        """Get the cached sprite for an eye, rendering it on a cache miss"""
+        # Only cut shapes (angry) differ between the left and right eye
+        key = (shape, width, height, tuple(eye_color), is_left_eye if is_sided(self.shapes[shape]) else None)
+        return self.sprite_cache.get(key, self._render_eye_sprite, shape, width, height, eye_color, is_left_eye)
+
+    def _render_eye_sprite(self, shape, width, height, eye_color, is_left_eye):
+        """Rasterize one eye of the given shape into a transparent sprite"""
+        sprite = new_sprite(width + 2 * SPRITE_MARGIN, height + 2 * SPRITE_MARGIN)
+        # The color is uniform, the anti-aliased shape is all in the alpha channel
+        sprite.fill(tuple(eye_color)[:3] + (0,))
+        alpha = pygame.surfarray.pixels_alpha(sprite)
+        alpha[...] = render_coverage(self.shapes[shape], width, height, SPRITE_MARGIN, is_left_eye)
+        del alpha  # Unlock the sprite
+        return sprite
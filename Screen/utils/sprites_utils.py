@@ -0,0 +1,88 @@
+"""
+Sprite utilities for RoboEyes
+Handles a bounded LRU cache of pre-rendered sprites so repeated shapes are
+rasterized once and then only blitted.
+"""
+
+from collections import OrderedDict
+
+import pygame
+
+
+class SpriteCache:
+    def __init__(self, max_entries=256, max_bytes=8 * 1024 * 1024):
+        """Initialize an empty cache bounded by entry count and memory"""
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sprites = OrderedDict()
+        self.bytes_used = 0
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, render, *args):
+        """Return the sprite for key, calling render(*args) on a miss"""
+        sprite = self.sprites.get(key)
+        if sprite is not None:
+            self.hits += 1
+            self.sprites.move_to_end(key)
+            return sprite
+
+        self.misses += 1
+        sprite = render(*args)
+        self.put(key, sprite)
+        return sprite
+
+    def put(self, key, sprite):
+        """Store a sprite, evicting least recently used ones over the caps"""
+        old = self.sprites.pop(key, None)
+        if old is not None:
+            self.bytes_used -= self._sprite_bytes(old)
+
+        size = self._sprite_bytes(sprite)
+        # A sprite bigger than the whole cap is still returned, just not kept
+        if size > self.max_bytes:
+            return sprite
+
+        self.sprites[key] = sprite
+        self.bytes_used += size
+        while len(self.sprites) > self.max_entries or self.bytes_used > self.max_bytes:
+            _, evicted = self.sprites.popitem(last=False)
+            self.bytes_used -= self._sprite_bytes(evicted)
+            self.evictions += 1
+        return sprite
+
+    def clear(self):
+        """Drop all cached sprites (statistics are kept)"""
+        self.sprites.clear()
+        self.bytes_used = 0
+        return True
+
+    def get_stats(self):
+        """Get hit/miss/eviction counters and memory usage"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': len(self.sprites),
+            'bytes': self.bytes_used,
+            'max_bytes': self.max_bytes
+        }
+
+    def _sprite_bytes(self, sprite):
+        """Approximate memory used by a sprite surface"""
+        return sprite.get_width() * sprite.get_height() * sprite.get_bytesize()
+
+
+def new_sprite(width, height):
+    """Create a transparent per-pixel alpha surface for a sprite"""
+    sprite = pygame.Surface((width, height), pygame.SRCALPHA)
+    # Match the display pixel format for faster blits when a display exists
+    if pygame.display.get_init() and pygame.display.get_surface() is not None:
+        sprite = sprite.convert_alpha()
+        sprite.fill((0, 0, 0, 0))
+    return sprite
@@ -0,0 +1,96 @@
+"""
+State utilities for RoboEyes
+Handles the eye state record: every animated number of both eyes lives in
+one contiguous float array, read and written by RoboEyes and all handlers.
+Named attributes give scalar access, EyeState.array gives a numpy view of
+the same memory for vectorized updates, and snapshots are a single copy.
+"""
+
+from array import array
+
+import numpy
+
+# Field names in array order. Every animated target and its current value
+# sit at the same position in the TARGET and CURRENT blocks, so one vectorized
+# step can move all current values towards their targets.
+FIELDS = (
+    # Targets
+    "eye_l_width", "eye_l_height", "eye_l_border_radius",
+    "eye_r_width", "eye_r_height", "eye_r_border_radius",
+    "eye_l_x_next", "eye_l_y_next", "eye_r_x_next", "eye_r_y_next",
+    "eyelids_closed_height_next", "eyelids_tired_height_next",
+    # Current values, eased towards the targets
+    "eye_l_width_current", "eye_l_height_current", "eye_l_border_radius_current",
+    "eye_r_width_current", "eye_r_height_current", "eye_r_border_radius_current",
+    "eye_l_x_current", "eye_l_y_current", "eye_r_x_current", "eye_r_y_current",
+    "eyelids_closed_height", "eyelids_tired_height",
+    # Default sizes (used for resetting)
+    "eye_l_width_default", "eye_l_height_default", "eye_l_border_radius_default",
+    "eye_r_width_default", "eye_r_height_default", "eye_r_border_radius_default",
+    # Resting positions from the layout
+    "eye_l_x", "eye_l_y", "eye_r_x", "eye_r_y",
+)
+INDEX = {name: i for i, name in enumerate(FIELDS)}
+
+# Groups of fields, for vectorized access through EyeState.array
+TARGET = slice(0, 12)
+SIZE = slice(0, 6)
+POSITION_NEXT = slice(6, 10)
+EYELIDS_NEXT = slice(10, 12)
+CURRENT = slice(12, 24)
+SIZE_CURRENT = slice(12, 18)
+POSITION_CURRENT = slice(18, 22)
+EYELIDS = slice(22, 24)
+SIZE_DEFAULT = slice(24, 30)
+POSITION = slice(30, 34)
+
+
+def _field(index):
+    """Property for one slot of the state array"""
+    def get(self):
+        return self.values[index]
+
+    def set(self, value):
+        self.values[index] = value
+    return property(get, set)
+
+
+def state_property(name):
+    """Property that forwards an attribute to the owner's EyeState"""
+    def get(self):
+        return getattr(self.state, name)
+
+    def set(self, value):
+        setattr(self.state, name, value)
+    return property(get, set)
+
+
+class EyeState:
+    __slots__ = ("values", "array")
+
+    def __init__(self):
+        """Initialize all fields to zero"""
+        self.values = array('d', bytes(8 * len(FIELDS)))
+        # Shares memory with values, so both always agree
+        self.array = numpy.frombuffer(self.values, dtype=numpy.float64)
+
+    def snapshot(self):
+        """Copy all fields (restore() and diff() take the copy)"""
+        return self.values[:]
+
+    def restore(self, snapshot):
+        """Set all fields from a snapshot"""
+        self.array[:] = numpy.frombuffer(snapshot, dtype=numpy.float64)
+
+    def diff(self, snapshot):
+        """Get the names of the fields that changed since a snapshot"""
+        changed = numpy.flatnonzero(self.array != numpy.frombuffer(snapshot, dtype=numpy.float64))
+        return [FIELDS[i] for i in changed]
+
+    def as_dict(self):
+        """Get all fields by name"""
+        return dict(zip(FIELDS, self.values))
+
+
+for _index, _name in enumerate(FIELDS):
+    setattr(EyeState, _name, _field(_index))
@@ -0,0 +1,239 @@
+"""
+Timeline utilities for RoboEyes
+Handles keyframed animation clips: each clip is a set of declarative tracks
+(keyframes on one property), compiled once into curves sampled at the
+simulation rate, so playing a clip is a table lookup per active track.
+
+Tracks that drive the same property are blended in priority order: an
+"override" track moves the value towards its own by its weight, an "add"
+track adds its weighted offset from the neutral value.
+"""
+
+import math
+
+import numpy
+
+# Animatable properties and their neutral values
+PROPERTIES = {
+    "x": 0.0,        # horizontal offset of both eyes in pixels
+    "y": 0.0,        # vertical offset of both eyes in pixels
+    "scale": 1.0,    # eye size multiplier
+    "eyelids": 0.0,  # closed eyelid height as a fraction of the eye height
+    "mouth_x": 0.0,  # horizontal mouth offset in pixels
+    "mouth_y": 0.0,  # vertical mouth offset in pixels
+    "mouth_scale": 1.0,  # mouth size multiplier
+    "mouth_curve": 0.0,  # added to the mood's mouth curve (-1 frown .. 1 smile)
+}
+
+INTERPOLATIONS = ("linear", "cubic", "step")
+BLENDS = ("override", "add")
+
+
+def sample_keyframes(keyframes, interpolation, times):
+    """Sample (time, value) keyframes at the given times, vectorized
+
+    Before the first and after the last keyframe the value is held.
+    """
+    key_times = numpy.array([t for t, _ in keyframes], dtype=numpy.float64)
+    key_values = numpy.array([v for _, v in keyframes], dtype=numpy.float64)
+    times = numpy.asarray(times, dtype=numpy.float64)
+    if len(keyframes) == 1:
+        return numpy.full(times.shape, key_values[0])
+
+    # Segment index and position within it for every sample
+    segment = numpy.clip(numpy.searchsorted(key_times, times, side="right") - 1, 0, len(keyframes) - 2)
+    t0 = key_times[segment]
+    t1 = key_times[segment + 1]
+    span = numpy.where(t1 > t0, t1 - t0, 1.0)
+    u = numpy.clip((times - t0) / span, 0.0, 1.0)
+    if interpolation == "cubic":
+        u = u * u * (3.0 - 2.0 * u)
+    elif interpolation == "step":
+        u = numpy.where(u >= 1.0, 1.0, 0.0)
+    v0 = key_values[segment]
+    return v0 + (key_values[segment + 1] - v0) * u
+
+
+def oscillation_keyframes(amplitude, angular_rate, duration, truncate=False):
+    """Keyframes at the extremes of amplitude * sin(angular_rate * t / duration)
+
+    Sampled with cubic interpolation, the half waves between extremes follow
+    the sine closely. truncate rounds the extremes towards zero like int().
+    """
+    keyframes = [(0.0, 0.0)]
+    k = 0
+    while True:
+        phase = math.pi / 2 + k * math.pi
+        if phase >= angular_rate:
+            break
+        value = amplitude * math.sin(phase)
+        keyframes.append((phase / angular_rate * duration, float(int(value)) if truncate else value))
+        k += 1
+    end = amplitude * math.sin(angular_rate)
+    keyframes.append((duration, float(int(end)) if truncate else end))
+    return keyframes
+
+
+class Track:
+    def __init__(self, property, keyframes, interpolation="linear", priority=0, weight=1.0, blend="override"):
+        """Keyframes [(time, value), ...] for one property of PROPERTIES"""
+        if property not in PROPERTIES:
+            raise ValueError(f"Invalid track property '{property}'. Valid properties are: {list(PROPERTIES)}")
+        if interpolation not in INTERPOLATIONS:
+            raise ValueError(f"Invalid interpolation '{interpolation}'. Valid interpolations are: {list(INTERPOLATIONS)}")
+        if blend not in BLENDS:
+            raise ValueError(f"Invalid blend '{blend}'. Valid blends are: {list(BLENDS)}")
+        if not keyframes:
+            raise ValueError(f"Track for '{property}' has no keyframes")
+        self.property = property
+        self.keyframes = sorted((float(t), float(v)) for t, v in keyframes)
+        self.interpolation = interpolation
+        self.priority = priority
+        self.weight = weight
+        self.blend = blend
+
+
+class Clip:
+    def __init__(self, name, tracks, duration=None):
+        """A named set of tracks; the duration defaults to the last keyframe"""
+        self.name = name
+        self.tracks = tracks
+        if duration is None:
+            duration = max(track.keyframes[-1][0] for track in tracks)
+        self.duration = duration
+
+    def compile(self, step):
+        """Sample every track once per step, returns a CompiledClip"""
+        frames = max(1, int(round(self.duration / step)))
+        times = numpy.arange(frames + 1) * step
+        tracks = [(track.property, track.priority, track.weight, track.blend,
+                   sample_keyframes(track.keyframes, track.interpolation, times))
+                  for track in self.tracks]
+        return CompiledClip(self.name, frames, tracks, step)
+
+
+class CompiledClip:
+    def __init__(self, name, frames, tracks, step):
+        """Sampled curves of a clip, frames steps of step seconds long
+
+        tracks holds (property, priority, weight, blend, samples) with
+        frames + 1 samples per track.
+        """
+        self.name = name
+        self.frames = frames
+        self.step = step
+        # Curves as lists, indexing those is faster than numpy scalars
+        self.tracks = [(property, priority, weight, blend, numpy.asarray(samples, dtype=numpy.float64).tolist())
+                       for property, priority, weight, blend, samples in tracks]
+
+
+class Timeline:
+    def __init__(self, step):
+        """Initialize with the simulation step the curves are sampled at"""
+        self.step = step
+        self.clips = {}
+        self.sources = {}  # Clip definitions, to recompile for a new step
+
+        # Playing clips: [compiled clip, start time, on_end callback]
+        self.active = []
+        # Tracks of the playing clips, sorted by priority
+        self.active_tracks = []
+        self.driven = set()
+
+    def add_clip(self, clip):
+        """Compile and register a clip (replaces one with the same name)"""
+        self.sources[clip.name] = clip
+        self.clips[clip.name] = clip.compile(self.step)
+        self._rebind(clip.name)
+        return True
+
+    def add_compiled(self, compiled):
+        """Register an already compiled clip"""
+        self.sources.pop(compiled.name, None)
+        self.clips[compiled.name] = compiled
+        self._rebind(compiled.name)
+        return True
+
+    def set_step(self, step):
+        """Resample all clip definitions for a new simulation step"""
+        self.step = step
+        for name, clip in self.sources.items():
+            self.clips[name] = clip.compile(step)
+        self.active = [[self.clips[entry[0].name], entry[1], entry[2]] for entry in self.active]
+        self._sort_tracks()
+        return True
+
+    def play(self, name, start_time, on_end=None):
+        """Start a clip at the given time, returns False if unknown or already playing"""
+        if name not in self.clips:
+            print(f"Warning: Unknown animation clip '{name}'")
+            return False
+        if self.is_playing(name):
+            return False
+        self.active.append([self.clips[name], start_time, on_end])
+        self._sort_tracks()
+        return True
+
+    def stop(self, name):
+        """Stop a playing clip without calling its on_end callback"""
+        self.active = [entry for entry in self.active if entry[0].name != name]
+        self._sort_tracks()
+        return True
+
+    def is_playing(self, name):
+        """Check if a clip is playing"""
+        return any(entry[0].name == name for entry in self.active)
+
+    def evaluate(self, current_time):
+        """Blend the playing clips at the given time
+
+        Returns (values, released): the value of every driven property and
+        the properties that were driven before but are not any more.
+        """
+        if not self.active and not self.driven:
+            return {}, ()
+
+        # Finish clips that reached their end
+        finished = []
+        for entry in self.active:
+            if int(round((current_time - entry[1]) / self.step)) >= entry[0].frames:
+                finished.append(entry)
+        if finished:
+            self.active = [entry for entry in self.active if entry not in finished]
+            self._sort_tracks()
+
+        values = {}
+        for property, priority, weight, blend, curve, start in self.active_tracks:
+            index = int(round((current_time - start) / self.step))
+            sample = curve[index if index < len(curve) else -1]
+            value = values.get(property, PROPERTIES[property])
+            if blend == "add":
+                values[property] = value + weight * (sample - PROPERTIES[property])
+            else:
+                values[property] = value + weight * (sample - value)
+
+        released = self.driven.difference(values)
+        self.driven = set(values)
+
+        # Callbacks last, so they see the state after this step
+        for entry in finished:
+            if entry[2] is not None:
+                entry[2]()
+        return values, released
+
+    def _rebind(self, name):
+        """Let a playing clip continue with its replaced curves"""
+        if self.is_playing(name):
+            for entry in self.active:
+                if entry[0].name == name:
+                    entry[0] = self.clips[name]
+            self._sort_tracks()
+
+    def _sort_tracks(self):
+        """Flatten the tracks of the playing clips, ordered by priority"""
+        tracks = []
+        for clip, start, _ in self.active:
+            for property, priority, weight, blend, curve in clip.tracks:
+                tracks.append((property, priority, weight, blend, curve, start))
+        tracks.sort(key=lambda track: track[1])  # Stable: equal priorities keep play order
+        self.active_tracks = tracks